@@ -0,0 +1,414 @@
+"""Cópia congelada das rotinas originais de ircode (máquina de estados char-a-char
+e compactação sir,4 O(n²)).
+
+Usada apenas como referência pelos benchmarks e para regenerar o corpus
+golden dos testes. NÃO usar no aplicativo.
+"""
+from iluflex_tools.core.ircode import CompressError, DEBUG, convASCIIToInt, iluflex_to_compatibility
+
+
+# Conversor fiel do comando sir (2, 3, 4, 5, 6, 7) para vetor de pulsos em Python
+# Lembrar que precisa ter \r ou \n no final do comandos !
+def conversion_legacy(buffer: str) -> list[int]:
+    pulso = [0] * 1000
+    pulsosfinal = [0] * 1000
+    buf = [0] * 6
+    state = 0
+    contBuf = 0
+    contPulso = 0
+    formato = None
+
+    if len(buffer) < 5:
+        if (DEBUG): print("[Debug] Buffer muito curto")
+        return []
+
+    pos = 0
+    while pos < len(buffer):
+        x = buffer[pos]
+        pos += 1
+
+        # print(f"[Debug] State: {state}, Char: {x}, Pos: {pos}")
+
+        match state:
+            case 0:
+                state = 1 if x == 's' else 0
+            case 1:
+                state = 2 if x == 'i' else 0
+            case 2:
+                state = 3 if x == 'r' else 0
+            case 3:
+                state = 4
+            case 4:
+                if x == '2':
+                    state = 5
+                    formato = '2'
+                elif x == '3':
+                    state = 20
+                    formato = '3'
+                elif x == '4':
+                    state = 10
+                    formato = '4'
+                elif x == '5':
+                    state = 5
+                    formato = '5'
+                elif x == '6':
+                    state = 5
+                    formato = '6'
+                elif x == '7':
+                    state = 15
+                    formato = '7'
+                if (DEBUG): print(f"[Debug] Detected formato: {formato}")
+            case 5:
+                if x == ',':
+                    state = 6
+                    buf = [0] * 6
+                    contBuf = contPulso = 0
+            case 6:
+                if x in ('\r', '\n', ' ', '\\'):
+                    valor = int(''.join([chr(b) for b in buf if b != 0]))
+                    if (DEBUG): print(f"[Debug] Fim de pulsos [{contPulso}]: {valor}")
+                    pulso[contPulso] = valor
+                    if pulso[contPulso] > 65500:
+                        if (DEBUG): print("[Debug] Valor de pulso acima do permitido")
+                        return []
+                    if formato == '2':
+                        pulsosfinal = iluflex_to_compatibility(pulso)
+                        # print(f"pulsosfinal ({pulsosfinal[0]}):", ",".join(map(str, pulsosfinal[0:])))
+                        return pulsosfinal[0:(pulsosfinal[0]+6)]
+                    state = 30
+                elif x == ',':
+                    valor = int(''.join([chr(b) for b in buf if b != 0]))
+                    # if (DEBUG): print(f"[Debug] Novo pulso[{contPulso}]: {valor}")
+                    pulso[contPulso] = valor
+                    if pulso[contPulso] > 65500:
+                        if (DEBUG): print("[Debug] Valor de pulso acima do permitido")
+                        return []
+                    contPulso += 1
+                    if contPulso > 900:
+                        if (DEBUG): print("[Debug] pulso excede limite")
+                        return []
+                    buf = [0] * 6
+                    contBuf = 0
+                elif '0' <= x <= '9':
+                    buf[contBuf] = ord(x)
+                    contBuf += 1
+                    if contBuf > 5:
+                        if (DEBUG): print("[Debug] contBuf excede 5")
+                        return []
+                else:
+                    if (DEBUG): print("[Debug] Caractere inválido no estado 6")
+                    return []
+            
+            # monitorar mensagem sir,4
+            case 10:
+                if x == ',':
+                    state = 11
+                    buf = [0] * 6
+                    contBuf = 0
+                    contPulso = 0
+                else:
+                    if (DEBUG): print('[Debug] Falha no estado 10 (esperava vírgula)')
+                    return []
+
+
+            case 11:
+                if x == ',':
+                    # normaliza para convASCIIToInt (direita→esquerda)
+                    tmp = [0] * 6
+                    for i in range(contBuf):
+                        tmp[i] = buf[6 - contBuf + i]
+                    for i in range(contBuf, 6):
+                        tmp[i] = 48
+                    valor = convASCIIToInt(tmp)
+                    if (DEBUG): print(f"[sir4][header] pulso[{contPulso}] = {valor}")
+                    if valor > 65500 or valor <= 0:
+                        return []
+                    pulso[contPulso] = valor
+                    contPulso += 1
+                    if contPulso > 900:
+                        return []
+                    buf = [0] * 6
+                    contBuf = 0
+                    if contPulso == 8:
+                        state = 12
+                elif '0' <= x <= '9':
+                    # direita→esquerda
+                    if contBuf > 5:
+                        return []
+                    buf[5 - contBuf] = ord(x)
+                    contBuf += 1
+                else:
+                    return []
+            case 12:
+                if x == ',':
+                    buf = [0] * 6
+                    contBuf = 0
+                    state = 13
+                else:
+                    ox = ord(x)
+                    if 65 <= ox <= 90:  # A-Z
+                        pulso[contPulso] = ox
+                        contPulso += 1
+                        if contPulso > 900:
+                            return []
+                    elif 97 <= ox <= 122:  # a-z (4x)
+                        for _ in range(4):
+                            pulso[contPulso] = ox
+                            contPulso += 1
+                            if contPulso > 900:
+                                return []
+                    else:
+                        return []
+            case 13: # inicio da recepcao do buffer footer
+                if x == ',':
+                    tmp = [0] * 6
+                    for i in range(contBuf):
+                        tmp[i] = buf[6 - contBuf + i]
+                    for i in range(contBuf, 6):
+                        tmp[i] = 48
+                    valor = convASCIIToInt(tmp)
+                    if (DEBUG): print(f"[sir4][footer] pulso[{contPulso}] = {valor}")
+                    if valor > 65500 or valor <= 0:
+                        return []
+                    pulso[contPulso] = valor
+                    contPulso += 1
+                    if contPulso > 900:
+                        return []
+                    buf = [0] * 6
+                    contBuf = 0
+                elif '0' <= x <= '9':
+                    if contBuf > 5:
+                        return []
+                    buf[5 - contBuf] = ord(x)
+                    contBuf += 1
+                else:
+                    # fim (0x0d ou ponto)
+                    tmp = [0] * 6
+                    for i in range(contBuf):
+                        tmp[i] = buf[6 - contBuf + i]
+                    for i in range(contBuf, 6):
+                        tmp[i] = 48
+                    valor = convASCIIToInt(tmp)
+                    if valor > 65500 or valor <= 0:
+                        return []
+                    pulso[contPulso] = valor
+                    contPulso += 1
+                    if contPulso > 900:
+                        return []
+                    pulso[contPulso] = 0
+                    contPulso += 1
+                    state = 30
+
+            # ---------------- sir,7 ----------------
+            case 15:
+                if x == ',':
+                    state = 16
+                    buf = [0] * 6
+                    contBuf = 0
+                    contPulso = 0
+                else:
+                    return []
+            case 16:
+                if x == ',':
+                    tmp = [0] * 6
+                    for i in range(contBuf):
+                        tmp[i] = buf[6 - contBuf + i]
+                    for i in range(contBuf, 6):
+                        tmp[i] = 48
+                    valor = convASCIIToInt(tmp)
+                    if valor > 65500:
+                        return []
+                    pulso[contPulso] = valor
+                    contPulso += 1
+                    if contPulso > 900:
+                        return []
+                    buf = [0] * 6
+                    contBuf = 0
+                    if contPulso == 6:
+                        state = 17
+                elif '0' <= x <= '9':
+                    if contBuf > 5:
+                        return []
+                    buf[5 - contBuf] = ord(x)
+                    contBuf += 1
+                else:
+                    return []
+            case 17:
+                ox = ord(x)
+                if (97 <= ox <= 122) or (48 <= ox <= 57):
+                    pulso[contPulso] = ox
+                    contPulso += 1
+                    if contPulso > 900:
+                        return []
+                else:
+                    if contPulso == 26:
+                        state = 30
+                    else:
+                        return []
+
+            # ---------------- sir,3 ----------------
+            case 20:
+                if x == ',':
+                    state = 21
+                else:
+                    return []
+                buf = [0] * 6
+                contBuf = 0
+                contPulso = 0
+                zip = 0
+            case 21:
+                ox = ord(x)
+                if x in ('\r', '\n', ' ', '\\'):
+                    valor = int(''.join([chr(b) for b in buf if b != 0])) if contBuf > 0 else 0
+                    pulso[contPulso] = valor
+                    state = 30
+                elif x == ',' and zip == 0:
+                    valor = int(''.join([chr(b) for b in buf if b != 0])) if contBuf > 0 else 0
+                    pulso[contPulso] = valor
+                    if pulso[contPulso] > 65500 or pulso[contPulso] <= 0:
+                        return []
+                    contPulso += 1
+                    if contPulso > 900:
+                        return []
+                    if contPulso == 12:
+                        zip = 1
+                        msbByte = 1
+                    buf = [0] * 6
+                    contBuf = 0
+                elif x == ',' and zip == 1:
+                    zip = 0
+                    contBuf = 0
+                elif zip == 1 and msbByte == 1:
+                    pulso[contPulso] = ox << 8
+                    msbByte = 0
+                elif zip == 1 and msbByte == 0:
+                    pulso[contPulso] = pulso[contPulso] + ox
+                    contPulso += 1
+                    if contPulso > 900:
+                        return []
+                    msbByte = 1
+                else:
+                    if not (33 <= ox <= 126):
+                        return []
+                    buf[contBuf] = ox
+                    contBuf += 1
+                    if contBuf > 5:
+                        return []
+
+            case 30:
+                break
+
+    if state == 30:
+        if contPulso > 900:
+            if (DEBUG): print("[Debug] pulso excede 900 no final")
+            return []
+        if (DEBUG): print(f"[Debug] Conversão finalizada com {contPulso} pulsos")
+        return pulso[:contPulso + 1]
+
+    if (DEBUG): print("[Debug] Estado final não chegou a 30")
+    return []
+
+
+# Converte pulsos em formato sir,4
+def CompatibilityToCompressII_legacy(pulso: list[int]) -> str | int:
+
+    # if (DEBUG): print(f"Pulsos recebidos ({pulso[0]}):", ",".join(map(str, pulso[0:])))
+
+    if pulso[0] < 12:
+        raise CompressError("PULSE_COUNT_TOO_SMALL", f"Quantidade de pulsos < 12 (valor: {pulso[0]})")
+
+    different_times_arr = [0] * 20
+    number_of_different_times = 0
+    out_buffer = "sir,4"
+
+    # Header: pulso[0] is the count, then next 7 elements
+    for i in range(8):
+        out_buffer += f",{pulso[i]}"
+    
+    out_buffer += ","
+
+    # Identify different pulse lengths
+    # starting position 8 keep 2 first pulses and 2 last out
+    for i in range(8, pulso[0] - 2):
+        if pulso[i] < 2:
+            raise CompressError("PULSE_TIME_TOO_SMALL", f"Tempo pulso muito curto < 2 (valor: {pulso[i]})")
+
+        number_of_different_times += 1
+        different_times_arr[number_of_different_times] = pulso[i]
+        if (DEBUG): print(f"[DEBUG] Scan pulse {i}: {pulso[i]} at index {number_of_different_times}, array: {different_times_arr[:20]}")
+
+        # Find other pulses with similar time
+        number_of_equal_times = 0
+        for j in range(8, pulso[0] - 2):
+            toln = pulso[j] - (2 + 0.01 * pulso[j])
+            tolp = pulso[j] + (2 + 0.01 * pulso[j])
+            if toln < pulso[i] < tolp:
+                number_of_equal_times += 1
+              
+        #  Verify if pulse time is already stored in DifferentTimesArr
+        if number_of_equal_times > 1:
+            rp = 0
+            for j in range(1, number_of_different_times + 1):
+                toln = different_times_arr[j] - (2 + 0.01 * different_times_arr[j])
+                tolp = different_times_arr[j] + (2 + 0.01 * different_times_arr[j])
+                if toln < pulso[i] < tolp:
+                    rp += 1
+            if rp > 1:
+                number_of_different_times -= 1
+
+        if number_of_different_times > 17:
+            print(f"Erro, ultrapassou 16 references, numberOfDifferentTimes = {number_of_different_times}, numberOfEqualTimes = {number_of_equal_times}")
+            return 0
+
+    # Compression
+    buffer3 = ['\0'] * 10
+    char_position = 0
+    cp = 0
+
+    for i in range(8, pulso[0] - 2):
+        c = chr(0x58)  # default 'X'
+        # compress level I
+        for j in range(1, number_of_different_times + 1):
+            toln = different_times_arr[j] - (2 + 0.01 * different_times_arr[j])
+            tolp = different_times_arr[j] + (2 + 0.01 * different_times_arr[j])
+            if toln < pulso[i] < tolp:
+                c = chr(0x40 + j)  # '@'+j from ascii: 0x40 = @ , 0x41 = A , 0x42 = B ...
+
+        # compress level II
+        # cp guarda a posição sendo bit 0 para A e bit 1 para B
+        buffer3[char_position] = c
+        char_position += 1
+
+        if c == 'A':
+            cp = cp & 0xFF
+        elif c == 'B':
+            cp = cp | (0x01 << (char_position - 1))
+        else:
+            # Adiciona os caracteres quando tiver tempo diferente do A ou B
+            for j in range(char_position):
+                out_buffer += buffer3[j]
+            char_position = 0
+            cp = 0
+
+        if char_position > 3:
+            out_buffer += chr(0x61 + cp) # 0x61 = 'a'
+            char_position = 0
+            cp = 0
+    
+    # guarda as poisções finais se ainda tiver.
+    if char_position > 0:
+        for j in range(char_position):
+            out_buffer += buffer3[j]
+
+    # Last two pulses
+    for i in range(pulso[0] - 2, pulso[0]):
+        if pulso[i] < 2:
+            raise CompressError("PULSE_TIME_TOO_SMALL", f"Tempo pulso muito curto < 2 (valor: {pulso[i]})")
+        
+        out_buffer += f",{pulso[i]}"
+
+    # add reference values to the end of command.
+    for i in range(1, number_of_different_times + 1):
+        out_buffer += f",{different_times_arr[i]}"
+
+    return out_buffer
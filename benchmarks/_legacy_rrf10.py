@@ -0,0 +1,93 @@
+"""Cópia congelada do parser RRF,10 original de services (um dict por
+dispositivo). Usada apenas como referência pelo bench_rrf10. NÃO usar no
+aplicativo.
+"""
+import re
+
+DEBUG = False
+
+_MAC = re.compile(r'^[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5}$')
+
+def parse_rrf10_line(line: str) -> dict | None:
+    """
+    Converte UMA linha 'RRF,10,...' no dicionário com todos os campos.
+    Campos:
+      slave_id (int)
+      mac (str)
+      sinal_db (int)
+      parent_mac (str)
+      modelo (str)
+      versao_hw (int)
+      versao_fw (int)
+      data_producao (str, ex.: '20250814')
+      n_saidas (int)
+      n_entradas (int)
+      nome (str)
+      raw (str)
+    """
+    if not line:
+        return None
+    line = line.strip()
+    if not line.startswith("RRF,10,"):
+        return None
+
+    parts = [p.strip() for p in line.split(",")]
+    # layout mínimo: 13 campos
+    if len(parts) < 13:
+        if DEBUG: print(f"parse_rrf10_line faltou elementos, tem só {len(parts)}")
+        return None
+
+    try:
+        # índices fixos pelo protocolo
+        # 0:'RRF' 1:'10'
+        slave_id      = int(parts[2])
+        mac           = parts[3]
+        sinal_db      = int(parts[4])   # pode ser negativo (RSSI) ou positivo
+        parent_mac    = parts[5]
+        modelo        = parts[6]
+        versao_hw     = int(parts[7])
+        versao_fw     = int(parts[8])
+        data_producao = parts[9]
+        n_saidas      = int(parts[10])
+        n_entradas    = int(parts[11])
+        # nome pode conter vírgulas? por segurança, junta o resto:
+        nome          = ",".join(parts[12:]).strip()
+
+        # valida MACs quando possível (não reprova; só corrige se inválido)
+        if not _MAC.match(mac):
+            # às vezes vem em minúsculas/sem padding — normalizamos pra minúsculas
+            mac = mac.lower()
+        if not _MAC.match(parent_mac):
+            parent_mac = parent_mac.lower()
+
+        return {
+            "slave_id": slave_id,
+            "mac": mac,
+            "sinal_db": sinal_db,
+            "parent_mac": parent_mac,
+            "modelo": modelo,
+            "versao_hw": versao_hw,
+            "versao_fw": versao_fw,
+            "data_producao": data_producao,
+            "n_saidas": n_saidas,
+            "n_entradas": n_entradas,
+            "nome": nome,
+            "raw": line,
+        }
+    except Exception as e:
+        if DEBUG: print("parse_rrf10_line error:", e)
+        return None
+
+
+def parse_rrf10_lines(texto: str) -> list[dict]:
+    """Aceita um blob com várias linhas e retorna só as válidas RRF,10."""
+    dispositivos = []
+    if not texto:
+        return dispositivos
+    for raw in texto.splitlines():
+        # print(f"services.parse_rrf10_lines line: {raw} !") # até aqui vem bem
+        d = parse_rrf10_line(raw)
+        if d:
+            dispositivos.append(d)
+    return dispositivos
+
@@ -0,0 +1,124 @@
+"""Benchmark do framer RX: bytearray + del (antigo _recv_loop) x RxFramer.
+
+Empurra 100k frames mistos (linhas RRF,10 e frames binários A5) pelos dois
+caminhos, em blocos do tamanho de um recv, e também por um socketpair
+(recv + extend x recv_into).
+
+Uso: python -m benchmarks.bench_framer
+"""
+from __future__ import annotations
+import random
+import socket
+import threading
+import time
+
+from iluflex_tools.core.framer import RxFramer
+
+N_FRAMES = 100_000
+CHUNK = 4096
+
+
+def mixed_frames(n: int, seed: int = 0) -> list[bytes]:
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        if rng.random() < 0.2:
+            payload = bytes(rng.randrange(256) for _ in range(rng.randint(0, 32)))
+            out.append(bytes([0xA5, 0x01, len(payload)]) + payload + b"\xCD")
+        else:
+            out.append(f"RRF,10,{i % 250},AABBCCDD{i % 100:04d},1,{i % 7},-61,3,1.0.{i % 9}\r".encode())
+    return out
+
+
+def legacy_frames(buf: bytearray, out: list) -> None:
+    """Laço de framing do _recv_loop original (del no início a cada frame)."""
+    while buf:
+        if buf[0] == 0xA5:
+            if len(buf) < 3:
+                break
+            total_len = 4 + buf[2]
+            if len(buf) < total_len:
+                break
+            msg = bytes(buf[:total_len])
+            del buf[:total_len]
+        else:
+            idx = buf.find(b"\r")
+            if idx == -1:
+                break
+            msg = bytes(buf[:idx + 1])
+            del buf[:idx + 1]
+        out.append(msg)
+
+
+def bench_memory(data: bytes, chunk: int) -> tuple[float, float]:
+    chunks = [data[i:i + chunk] for i in range(0, len(data), chunk)]
+
+    t0 = time.perf_counter()
+    buf, out = bytearray(), []
+    for c in chunks:
+        buf.extend(c)
+        legacy_frames(buf, out)
+    old = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    f, out2 = RxFramer(), []
+    for c in chunks:
+        f.feed(c)
+        out2 += f.frames_bytes()
+    new = time.perf_counter() - t0
+    assert out == out2
+    return old, new
+
+
+def _pump(data: bytes) -> socket.socket:
+    s1, s2 = socket.socketpair()
+
+    def writer():
+        s2.sendall(data)
+        s2.close()
+    threading.Thread(target=writer, daemon=True).start()
+    return s1
+
+
+def bench_socket(data: bytes) -> tuple[float, float]:
+    s = _pump(data)
+    t0 = time.perf_counter()
+    buf, out = bytearray(), []
+    while True:
+        d = s.recv(CHUNK)
+        if not d:
+            break
+        buf.extend(d)
+        legacy_frames(buf, out)
+    old = time.perf_counter() - t0
+    s.close()
+
+    s = _pump(data)
+    t0 = time.perf_counter()
+    f, out2 = RxFramer(), []
+    while f.recv_into(s):
+        out2 += f.frames_bytes()
+    new = time.perf_counter() - t0
+    s.close()
+    assert out == out2
+    return old, new
+
+
+def _best(fn, *args, repeat: int = 5) -> tuple[float, float]:
+    runs = [fn(*args) for _ in range(repeat)]
+    return min(r[0] for r in runs), min(r[1] for r in runs)
+
+
+def main() -> None:
+    frames = mixed_frames(N_FRAMES)
+    data = b"".join(frames)
+    print(f"RX framer: {N_FRAMES} frames, {len(data) / 1e6:.1f} MB")
+    for chunk in (CHUNK, 65536, 1 << 20):
+        old, new = _best(bench_memory, data, chunk)
+        print(f"  memória  bloco {chunk:7d}  del {old * 1e3:8.1f} ms  framer {new * 1e3:8.1f} ms  ganho {old / new:5.1f}x")
+    old, new = _best(bench_socket, data)
+    print(f"  socket   recv {CHUNK}     del {old * 1e3:8.1f} ms  framer {new * 1e3:8.1f} ms  ganho {old / new:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
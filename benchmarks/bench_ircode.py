@@ -0,0 +1,77 @@
+"""Benchmarks do conversor de comandos IR (ircode).
+
+Uso: python -m benchmarks.bench_ircode
+"""
+from __future__ import annotations
+import random
+import timeit
+
+from benchmarks._legacy_ircode import CompatibilityToCompressII_legacy, conversion_legacy
+from benchmarks.corpus import base_commands, synthetic_compat
+from iluflex_tools.core import ircode
+from iluflex_tools.core.ircode import conversion
+
+
+def _bench(fn, cmds: list[str], repeat: int = 5, number: int = 20) -> float:
+    """Melhor tempo (s) para converter o corpus inteiro uma vez."""
+    def run():
+        for c in cmds:
+            fn(c)
+    return min(timeit.repeat(run, repeat=repeat, number=number)) / number
+
+
+def bench_conversion() -> None:
+    cmds = [c + "\r" for c in base_commands()]
+    by_fmt: dict[str, list[str]] = {}
+    for c in cmds:
+        by_fmt.setdefault(c[:5], []).append(c)
+    print("conversion(): máquina de estados x tokenizador")
+    for fmt, group in sorted(by_fmt.items()):
+        old = _bench(conversion_legacy, group)
+        new = _bench(conversion, group)
+        print(f"  {fmt:6s} n={len(group):2d}  legado {old * 1e3:8.3f} ms  novo {new * 1e3:8.3f} ms  ganho {old / new:5.1f}x")
+    old = _bench(conversion_legacy, cmds)
+    new = _bench(conversion, cmds)
+    print(f"  total  n={len(cmds):2d}  legado {old * 1e3:8.3f} ms  novo {new * 1e3:8.3f} ms  ganho {old / new:5.1f}x")
+
+
+def bench_compress_sir4() -> None:
+    print("CompatibilityToCompressII: O(n²) x referências ordenadas")
+    for n in (100, 500, 900):
+        pulso = synthetic_compat(n, n_refs=8, seed=n)
+        assert CompatibilityToCompressII_legacy(pulso) == ircode.CompatibilityToCompressII(pulso)
+        number = 20 if n < 500 else 3
+        old = min(timeit.repeat(lambda: CompatibilityToCompressII_legacy(pulso), repeat=3, number=number)) / number
+        new = min(timeit.repeat(lambda: ircode.CompatibilityToCompressII(pulso), repeat=3, number=number)) / number
+        print(f"  n={n:3d}  legado {old * 1e3:8.3f} ms  novo {new * 1e3:8.3f} ms  ganho {old / new:6.1f}x")
+
+
+def bench_numpy_backend() -> None:
+    if ircode.np is None:
+        print("backend NumPy: numpy não instalado, ignorado")
+        return
+    np = ircode.np
+    rnd = random.Random(3)
+    print("backend NumPy x Python puro")
+    for n in (100, 500, 900):
+        tempos = [rnd.randint(1, 65500) for _ in range(n)]
+        arr = np.asarray(tempos, dtype=np.int32)
+        linhas = [
+            ("sir2_to_sir34_per",
+             lambda: [ircode.sir2_to_sir34_per(t, 263) for t in tempos], lambda: ircode.sir2_to_sir34_per_array(arr, 263)),
+            ("sir34_to_sir2",
+             lambda: [ircode.sir34_to_sir2(t, 38000) for t in tempos], lambda: ircode.sir34_to_sir2_array(arr, 38000)),
+        ]
+        for nome, py_fn, np_fn in linhas:
+            ircode.USE_NUMPY = False
+            py = min(timeit.repeat(py_fn, repeat=5, number=200)) / 200
+            ircode.USE_NUMPY = True
+            vec = min(timeit.repeat(np_fn, repeat=5, number=200)) / 200
+            print(f"  {nome:25s} n={n:3d}  python {py * 1e6:8.1f} us  numpy {vec * 1e6:8.1f} us  ganho {py / vec:5.1f}x")
+    ircode.USE_NUMPY = True
+
+
+if __name__ == "__main__":
+    bench_conversion()
+    bench_compress_sir4()
+    bench_numpy_backend()
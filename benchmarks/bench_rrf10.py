@@ -0,0 +1,59 @@
+"""Benchmark do parse de um dump RRF,10 de 1000 nós: dict por dispositivo
+(services.parse_rrf10_lines antigo) x registros DeviceStatusRRF10 com slots.
+
+Mede tempo de parse e memória retida pelos objetos resultantes (tracemalloc).
+
+Uso: python -m benchmarks.bench_rrf10
+"""
+from __future__ import annotations
+import random
+import time
+import tracemalloc
+
+from benchmarks._legacy_rrf10 import parse_rrf10_lines as legacy_parse
+from iluflex_tools.core.protocols.rrf10 import parse_rrf10_records
+
+N_NODES = 1000
+
+
+def mesh_dump(n: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        mac = ":".join(f"{rng.randrange(256):02X}" for _ in range(6))
+        parent = ":".join(f"{rng.randrange(256):02X}" for _ in range(6))
+        lines.append(f"RRF,10,{i},{mac},{-rng.randint(30, 90)},{parent},IC-315,{rng.randint(1, 3)},"
+                     f"{rng.randint(100, 200)},20250814,{rng.randint(0, 8)},{rng.randint(0, 8)},Nó {i}")
+    return "\r\n".join(lines)
+
+
+def _best(fn, arg, repeat: int = 7) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _retained(fn, arg) -> int:
+    tracemalloc.start()
+    snap0 = tracemalloc.take_snapshot()
+    out = fn(arg)
+    size = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(snap0, "filename"))
+    tracemalloc.stop()
+    del out
+    return size
+
+
+def main() -> None:
+    text = mesh_dump(N_NODES)
+    assert [r.to_dict() for r in parse_rrf10_records(text)] == legacy_parse(text)
+    for name, fn in (("dict (antigo)", legacy_parse), ("registros slots", parse_rrf10_records)):
+        t = _best(fn, text)
+        mem = _retained(fn, text)
+        print(f"{name:16s} {t * 1e3:7.2f} ms  {mem / N_NODES:6.0f} B/nó")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark das trilhas do WaveformCanvas (widgets/waveform_lod).
+
+Mede o tempo de gerar as polylines visíveis (largura de 3000 px) para o
+orçamento de um quadro (60 Hz = 16,7 ms):
+  - 3 trilhas da maior captura (900 pulsos) em vários zooms;
+  - uma janela estreita no meio de capturas de tamanhos crescentes (o custo
+    não deve crescer com o comprimento, graças à busca binária em starts).
+
+Uso: python -m benchmarks.bench_waveform
+"""
+from __future__ import annotations
+import random
+import time
+
+from iluflex_tools.widgets.waveform_lod import WaveTrack, track_points
+
+HIGH, LOW = 12, 32
+FRAME_S = 1 / 60
+
+
+def capture(n: int, seed: int = 0) -> list[int]:
+    rng = random.Random(seed)
+    return [rng.choice((350, 1050, 560, 1690)) for _ in range(n)] + [40000]
+
+
+def _best(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_full_view() -> None:
+    tracks = [capture(900, seed) for seed in range(3)]
+    print("3 trilhas x 900 pulsos, janela de 3000 px")
+    for scale in (0.005, 0.05, 0.5):
+        t = _best(lambda: [track_points(p, scale, HIGH, LOW, x_min=0, x_max=3000) for p in tracks])
+        print(f"  escala {scale:5.3f}  {t * 1e3:7.3f} ms  ({t / FRAME_S * 100:5.1f}% de um quadro)")
+
+
+def bench_narrow_window() -> None:
+    print("janela de 1200 px no meio da captura (escala 0.05)")
+    for n in (1_000, 10_000, 100_000, 400_000):
+        track = WaveTrack([350, 1050] * (n // 2))
+        mid = track.total * 0.05 / 2
+        t = _best(lambda: track.points(0.05, HIGH, LOW, x_min=mid, x_max=mid + 1200), repeat=50)
+        print(f"  n={n:7d}  {t * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    bench_full_view()
+    bench_narrow_window()
@@ -0,0 +1,120 @@
+"""Corpus de comandos IR usado pelos benchmarks e pelo gerador do golden.
+
+Parte dos códigos reais de `comandos.txt` (sir,4), expande para sir,2 e
+gera um sir,3 sintético (NEC-like), além de casos de erro conhecidos.
+"""
+from __future__ import annotations
+import random
+from pathlib import Path
+
+from iluflex_tools.core.ircode import sir34tosir2, compatibility_to_compressed
+
+ROOT = Path(__file__).resolve().parents[1]
+COMANDOS_TXT = ROOT / "comandos.txt"
+
+
+def load_comandos(path: Path = COMANDOS_TXT) -> list[tuple[str, str]]:
+    """Lê linhas `nome <tab> sir,...` e retorna [(nome, comando)]."""
+    out: list[tuple[str, str]] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if "\t" not in line:
+            continue
+        name, cmd = line.split("\t", 1)
+        out.append((name.strip(), cmd.strip()))
+    return out
+
+
+def nec_like_sir2(seed: int) -> str:
+    """sir,2 sintético de 32 bits (start burst + bits + pulso final)."""
+    rng = random.Random(seed)
+    bits = [rng.choice(("351,351", "351,1054")) for _ in range(32)]
+    return "sir,2,74,1,1,263,1,1,5625,2812," + ",".join(bits) + ",351,25000"
+
+
+def base_commands() -> list[str]:
+    """Comandos válidos (sem terminador) cobrindo sir,2/3/4/5/6/7."""
+    from iluflex_tools.core.ircode import conversion
+
+    cmds: list[str] = []
+    for _name, cmd in load_comandos():
+        cmds.append(cmd)
+        cmds.append(sir34tosir2(cmd))
+    for seed in range(3):
+        s2 = nec_like_sir2(seed)
+        cmds.append(s2)
+        s3 = compatibility_to_compressed(conversion(s2 + "\r"))
+        if s3:
+            cmds.append(s3)
+    cmds.append("sir,5,10,1,1,263,1,1,100,200,300,400")
+    cmds.append("sir,6,10,1,1,263,1,1,100,200,300,400")
+    cmds.append("sir,7,1,2,3,4,5,6,abcdefghij0123456789")
+    return cmds
+
+
+EDGE_CASES = [
+    "", "sir", "sir,2", "sir,2,\r", "sir,2,1,2,\r", "sir,2,1,,2\r", "sir,2,123456\r",
+    "sir,2,10,1,1,0,1,1,100\r", "sir,2,995,1,1,263,1,1,100\r", "sir,2,3,1,1,263\r",
+    "sir,2,4,1,1,263,1,1,100,200,300,400,500\r", "sir,2,65501\r", "sir,2,1,2,3",
+    "xxsir,2,4,1,1,263,1,1,100,200\r", "ssir,2,4,1,1,263,1,1,100,200\r", "sir;2,4,1,1,263,1,1,100,200\r",
+    "sir,l,1,2,3,4\r", "sir,9,1\r", "sir,22,4,1,1,263,1,1,100,200\r",
+    "sir,3,1,2\r", "sir,3,a,1\r", "sir,3,1,+2,3\r", "sir,3,1,1_0,3\r", "sir,3,1,-2,3\r",
+    "sir,3,1,1,1,1,1,1,1,1,1,1,1,1,\r", "sir,3,1,1,1,1,1,1,1,1,1,1,1,1,ABC,5\r",
+    "sir,4,1,1,1,40000,1,1,1,1,,5,6\r", "sir,4,1,1,1,40000,1,1,1,1,AB,5,6",
+    "sir,4,1,1,1,40000,1,1,1,1,AB,5,6.", "sir,4,1,1,1,40000,1,1,1,1,A1B,5,6\r",
+    "sir,4,1,1,1,40000,1,1,1,0,AB,5,6\r", "sir,4,1,1,1,1234567,1,1,1,1,AB,5,6\r",
+    "sir,4,1,1,1,40000,1,1,1,1,AbC,5,6\r", "sir,4,1,1,1,40000,1,1,1,1,AB,5,\r",
+    "sir,7,1,2,3,4,5,6,abc\r", "sir,7,,2,3,4,5,6,abcdefghij0123456789\r",
+    "sir,7,1,2,3,4,5,6,abcdefghij0123456789", "sir,7,1,2,3,4,5,6,abcdefghij0123456789a\r",
+]
+
+
+def mutations(cmds: list[str], count: int, seed: int = 1234) -> list[str]:
+    """Variações determinísticas (inserção/remoção/troca/truncamento de caracteres)."""
+    alphabet = "0123456789,,,\r\n \\abcAZz.-+_\t~"
+    rng = random.Random(seed)
+    out: list[str] = []
+    for _ in range(count):
+        s = list(rng.choice(cmds) + rng.choice(("\r", "", "\n")))
+        for _k in range(rng.randint(1, 3)):
+            i = rng.randrange(len(s) + 1)
+            op = rng.random()
+            if op < 0.3:
+                s.insert(i, rng.choice(alphabet))
+            elif op < 0.6 and s:
+                del s[min(i, len(s) - 1)]
+            elif op < 0.8 and s:
+                s[min(i, len(s) - 1)] = rng.choice(alphabet)
+            else:
+                s = s[:i]
+        out.append("".join(s))
+    return out
+
+
+def synthetic_compat(n_pulses: int, n_refs: int = 6, seed: int = 0) -> list[int]:
+    """Vetor compatível (header + n_pulses tempos em ciclos) com tempos
+    agrupados em n_refs referências e jitter de ±2 ciclos."""
+    rng = random.Random(seed)
+    refs = [rng.randint(10, 3000) for _ in range(n_refs)]
+    tempos = [max(2, rng.choice(refs) + rng.randint(-2, 2)) for _ in range(n_pulses)]
+    return [n_pulses + 2, 28, 1, 38000, 1, 1] + tempos + [20, 1000]
+
+
+def compat_vectors(count: int, seed: int = 99) -> list[list[int]]:
+    """Vetores compatíveis para a compactação sir,4: os códigos reais do
+    corpus (via conversion de sir,2) e variações sintéticas, incluindo
+    tempos < 2 e excesso de referências."""
+    from iluflex_tools.core.ircode import conversion
+
+    out: list[list[int]] = []
+    for cmd in base_commands():
+        if cmd.startswith("sir,2,"):
+            pulsos = conversion(cmd + "\r")
+            if pulsos:
+                out.append(pulsos)
+    rng = random.Random(seed)
+    for k in range(count):
+        v = synthetic_compat(rng.choice((12, 40, 100, 300)), rng.randint(1, 22), seed=seed + k)
+        if rng.random() < 0.15:
+            v[rng.randrange(8, len(v))] = rng.randint(0, 1)
+        out.append(v)
+    return out
@@ -0,0 +1,43 @@
+"""Regera os corpus golden de tests/data a partir das rotinas originais:
+ircode_golden.json (conversion) e ircode_compress_golden.json (sir,4).
+
+Uso: python -m benchmarks.make_ircode_golden
+"""
+from __future__ import annotations
+import json
+
+from benchmarks._legacy_ircode import CompatibilityToCompressII_legacy, conversion_legacy
+from benchmarks.corpus import ROOT, EDGE_CASES, base_commands, compat_vectors, mutations
+
+GOLDEN_PATH = ROOT / "tests" / "data" / "ircode_golden.json"
+COMPRESS_GOLDEN_PATH = ROOT / "tests" / "data" / "ircode_compress_golden.json"
+
+
+def _expected(fn, arg) -> dict:
+    try:
+        return {"input": arg, "output": fn(arg)}
+    except Exception as e:
+        return {"input": arg, "raises": type(e).__name__}
+
+
+def _write(path, cases: list[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cases, f, ensure_ascii=True, separators=(",", ":"))
+        f.write("\n")
+    print(f"{len(cases)} casos gravados em {path}")
+
+
+def main() -> None:
+    base = base_commands()
+    inputs: list[str] = []
+    for cmd in base:
+        inputs += [cmd + "\r", cmd + "\n", cmd + " ", cmd]
+    inputs += EDGE_CASES
+    inputs += mutations(base, 120)
+    _write(GOLDEN_PATH, [_expected(conversion_legacy, c) for c in inputs])
+    _write(COMPRESS_GOLDEN_PATH, [_expected(CompatibilityToCompressII_legacy, v) for v in compat_vectors(60)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Conversor de bibliotecas de comandos IR em lote (sem interface gráfica).
+
+Lê um arquivo no formato do `comandos.txt` (`nome <tab> sir,...` por linha),
+opcionalmente normaliza os sir,2 com `IrCodeLib.preProcessIrCmd` e converte
+para Iluflex Long (sir,2) ou Iluflex Short (sir,3/sir,4) com
+`IrCodeLib.convertIRCmd`, passando pelo ConversionCache (--cache-dir
+reaproveita conversões entre execuções). As linhas são processadas em
+blocos distribuídos num pool de processos; a saída mantém a ordem da entrada.
+
+Uso:
+    python -m iluflex_tools.batch comandos.txt -o convertidos.txt --tipo short
+    python -m iluflex_tools.batch biblioteca.txt --normalize --errors erros.txt
+
+Saída: `nome <tab> comando convertido`. Linhas com erro não vão para a saída;
+são gravadas em --errors (padrão: stderr) como `linha <tab> nome <tab> erro`.
+Código de saída 0 se todas as linhas converteram, 1 se houve erros.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+from typing import Iterable, Iterator
+
+from iluflex_tools.core.ircode_cache import ConversionCache
+
+TIPOS = {"long": "Iluflex Long", "short": "Iluflex Short"}
+
+# (nº da linha, nome, comando)
+Linha = tuple[int, str, str]
+# (nº da linha, nome, convertido, erro)
+Resultado = tuple[int, str, str, str]
+
+
+def parse_lines(lines: Iterable[str]) -> Iterator[Linha | Resultado]:
+    """Separa `nome <tab> comando`. Linhas vazias e comentários (#) são
+    ignorados; linhas malformadas viram Resultado com erro."""
+    for lineno, line in enumerate(lines, start=1):
+        s = line.strip()
+        if not s or s.startswith("#"):
+            continue
+        if "\t" not in s:
+            yield (lineno, "", "", "linha sem <tab> separando nome e comando")
+            continue
+        name, cmd = s.split("\t", 1)
+        yield (lineno, name.strip(), cmd.strip())
+
+
+# cache por processo (o diretório em disco, se houver, é compartilhado entre eles)
+_caches: dict[str, ConversionCache] = {}
+
+
+def _cache(cache_dir: str) -> ConversionCache:
+    if cache_dir not in _caches:
+        _caches[cache_dir] = ConversionCache(cache_dir=cache_dir or None)
+    return _caches[cache_dir]
+
+
+def convert_one(cmd: str, tipo: str, repeat: int, channel: int,
+                normalize: bool, pause_threshold: int, max_frames: int,
+                cache_dir: str = "") -> tuple[str, str]:
+    """Converte um comando; retorna (convertido, erro)."""
+    lib = _cache(cache_dir)
+    if normalize and cmd.startswith("sir,2,"):
+        pre = lib.preProcessIrCmd(cmd, pause_threshold, max_frames, True) or {}
+        new_sir2 = pre.get("new_sir2", "")
+        if not new_sir2:
+            return "", f"pré-processamento: {pre.get('error', 'falhou')}"
+        cmd = new_sir2
+    res = lib.convertIRCmd(cmd, tipo, repeat, channel)
+    err = res.get("error")
+    if err:
+        return "", str(err)
+    return res.get("converted", ""), ""
+
+
+def convert_chunk(args: tuple[list[Linha], dict]) -> list[Resultado]:
+    """Converte um bloco de linhas (executado nos processos do pool)."""
+    chunk, params = args
+    out: list[Resultado] = []
+    # ircode imprime diagnósticos em stdout; não podem misturar com a saída
+    with contextlib.redirect_stdout(io.StringIO()):
+        for lineno, name, cmd in chunk:
+            try:
+                converted, err = convert_one(cmd, **params)
+            except Exception as e:
+                converted, err = "", f"exceção: {e}"
+            out.append((lineno, name, converted, err))
+    return out
+
+
+def _chunks(items: Iterable[Linha | Resultado], size: int) -> Iterator[list[Linha | Resultado]]:
+    it = iter(items)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(lines: Iterable[str], params: dict, workers: int = 0,
+              chunk_size: int = 256) -> Iterator[Resultado]:
+    """Gera os resultados na ordem da entrada.
+
+    workers <= 0 usa os.cpu_count(); workers == 1 processa no próprio processo.
+    """
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+
+    def jobs():
+        for chunk in _chunks(parse_lines(lines), chunk_size):
+            # linhas já rejeitadas no parse não vão para o pool
+            yield [c for c in chunk if len(c) == 3], [c for c in chunk if len(c) == 4]
+
+    def merge(converted: list[Resultado], rejected: list[Resultado]) -> list[Resultado]:
+        return sorted(converted + rejected, key=lambda r: r[0]) if rejected else converted
+
+    if workers == 1:
+        for todo, rejected in jobs():
+            yield from merge(convert_chunk((todo, params)), rejected)
+        return
+
+    pending: list[list[Resultado]] = []
+
+    def tasks():
+        for todo, rejected in jobs():
+            pending.append(rejected)
+            yield (todo, params)
+
+    with multiprocessing.Pool(workers) as pool:
+        # imap preserva a ordem dos blocos
+        for converted in pool.imap(convert_chunk, tasks()):
+            yield from merge(converted, pending.pop(0))
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m iluflex_tools.batch",
+                                 description="Converte bibliotecas de comandos IR (nome<TAB>sir,...) em lote.")
+    ap.add_argument("input", help="arquivo de entrada ('-' para stdin)")
+    ap.add_argument("-o", "--output", default="-", help="arquivo de saída (padrão: stdout)")
+    ap.add_argument("--errors", default=None, help="arquivo para erros por linha (padrão: stderr)")
+    ap.add_argument("--tipo", choices=sorted(TIPOS), default="short", help="long = sir,2; short = sir,3/sir,4")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--channel", type=int, default=1)
+    ap.add_argument("--normalize", action="store_true", help="pré-processa sir,2 (preProcessIrCmd) antes de converter")
+    ap.add_argument("--pause-ms", type=int, default=40, help="limiar de pausa do pré-processamento, em ms")
+    ap.add_argument("--max-frames", type=int, default=3)
+    ap.add_argument("--cache-dir", default="", help="cache de conversões em disco (reaproveitado entre execuções)")
+    ap.add_argument("-j", "--workers", type=int, default=0, help="processos (padrão: nº de CPUs)")
+    ap.add_argument("--chunk-size", type=int, default=256, help="linhas por bloco enviado ao pool")
+    args = ap.parse_args(argv)
+
+    params = {
+        "tipo": TIPOS[args.tipo],
+        "repeat": args.repeat,
+        "channel": args.channel,
+        "normalize": args.normalize,
+        "pause_threshold": args.pause_ms * 1000,  # preProcessIrCmd espera µs
+        "max_frames": args.max_frames,
+        "cache_dir": args.cache_dir,
+    }
+
+    with contextlib.ExitStack() as stack:
+        fin = sys.stdin if args.input == "-" else stack.enter_context(open(args.input, encoding="utf-8"))
+        fout = sys.stdout if args.output == "-" else stack.enter_context(open(args.output, "w", encoding="utf-8", newline="\n"))
+        ferr = sys.stderr if args.errors is None else stack.enter_context(open(args.errors, "w", encoding="utf-8", newline="\n"))
+
+        t0 = time.perf_counter()
+        ok = fail = 0
+        for lineno, name, converted, err in run_batch(fin, params, args.workers, max(1, args.chunk_size)):
+            if err:
+                fail += 1
+                ferr.write(f"{lineno}\t{name}\t{err}\n")
+            else:
+                ok += 1
+                fout.write(f"{name}\t{converted}\n")
+        dt = time.perf_counter() - t0
+
+    print(f"{ok} convertidos, {fail} erros em {dt:.2f} s", file=sys.stderr)
+    return 1 if fail else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,8 +1,12 @@
 # iluflex_tools/core/app_state.py
 """AppState global baseado em **classe** (simples e direto).
 
-- Encapsula leitura/gravação e persistência opcional
-- Coerção automática de tipos (str/int/bool/float)
+- Encapsula leitura/gravação e persistência opcional (via SettingsStore:
+  grava em segundo plano, uma vez por rajada de alterações)
+- Coerção automática de tipos (str/int/bool/float), pré-compilada por campo
+- Assinantes por campo: cb(mudanças) com {campo: novo_valor}, só quando o
+  valor muda de fato, na thread de quem alterou
+- `with STATE.batch():` agrupa várias alterações num único aviso
 - Disponível como singleton `STATE`
 
 Uso rápido:
@@ -26,17 +30,35 @@ STATE.set_ip_port("192.168.1.80", 5000)
 
 # Vários de uma vez
 STATE.set_many({"ip": "192.168.1.90", "port": "5001", "connected": True})
+
+# Reagir a mudanças (em vez de reler STATE.data ao trocar de página)
+STATE.subscribe(self._on_state, fields=("ip", "port"))   # cb({"ip": ..., "port": ...})
+with STATE.batch():                                       # um aviso só, no fim
+    STATE.set("ip", "192.168.1.91")
+    STATE.set("port", 5002)
+STATE.unsubscribe(self._on_state)
+
+# Masters já encontradas (cache persistente, chave = MAC)
+STATE.discovery.rows()
+ip, port = STATE.last_known_address()   # IP atual da master `mac`, se mudou
 ```
 """
 from __future__ import annotations
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass, fields
-from typing import Any
+from typing import Any, Callable, Iterable, get_type_hints
+
+DEBUG = False
+
+StateSubscriber = Callable[[dict[str, Any]], None]
 
 # ----------------- modelo de estado -----------------
 @dataclass
 class AppState:
     ip: str = "192.168.1.50"
     port: int = 4999
+    mac: str = ""                    # MAC da master da última conexão (chave no cache de descoberta)
     connected: bool = False
     auto_reconnect: bool = False
     theme: str = "system"            # "system" | "dark" | "light"
@@ -44,97 +66,201 @@ class AppState:
     mesh_discovery_timeout_sec: int = 120 # tempo padrão para Descorir Novos Dispositivos na Rede Mesh
 
 
+# ----------------- coerção -----------------
+_TRUE = frozenset({"1", "true", "t", "yes", "y", "on", "sim"})
+_FALSE = frozenset({"0", "false", "f", "no", "n", "off", "nao", "não", ""})
+
+
+def _to_bool(value: Any) -> Any:
+    if isinstance(value, str):
+        v = value.strip().lower()
+        if v in _TRUE:
+            return True
+        if v in _FALSE:
+            return False
+    return bool(value)
+
+
+def _make_coercer(target_type: Any) -> Callable[[Any], Any]:
+    """Função de coerção de um campo (escolhida uma vez, não a cada set)."""
+    conv = {bool: _to_bool, int: int, float: float, str: str}.get(target_type)
+    if conv is None:
+        return lambda value: value
+
+    def coerce(value: Any) -> Any:
+        # Aceita valores vindos de UI (string) e converte de forma tolerante
+        if type(value) is target_type:
+            return value
+        try:
+            return conv(value)
+        except Exception:
+            return value
+    return coerce
+
+
 # ----------------- gerenciador -----------------
 class AppStateManager:
-    def __init__(self, initial: AppState | None = None, *, persist_default: bool = True) -> None:
+    def __init__(self, initial: AppState | None = None, *, persist_default: bool = True, store=None) -> None:
         self.data: AppState = initial or AppState()
         self._persist_default = persist_default
-        self._field_types = {f.name: f.type for f in fields(AppState)}
+        # tipos reais (com `annotations`, f.type é só o texto "int")
+        self._field_types = get_type_hints(AppState)
+        self._coercers = {name: _make_coercer(t) for name, t in self._field_types.items()}
+        self._lock = threading.RLock()
+        self._subs: list[tuple[StateSubscriber, frozenset | None]] = []
+        self._batch_depth = 0
+        self._pending: dict[str, Any] = {}
         # imports tardios para evitar dependência cíclica
-        try:
-            from iluflex_tools.core.settings import load_settings, save_settings  # type: ignore
-        except Exception:  # ambiente de testes
-            load_settings = save_settings = None  # type: ignore
-        self._load_settings = load_settings  # type: ignore
-        self._save_settings = save_settings  # type: ignore
+        if store is None:
+            try:
+                from iluflex_tools.core.settings import SETTINGS as store  # type: ignore
+            except Exception:  # ambiente de testes
+                store = None
+        self._store = store
+        # campo do estado -> campo das preferências ("ip" -> "last_ip", "theme" -> "theme")
+        self._persisted: dict[str, str] = {}
+        if store is not None:
+            names = set(store.field_names)
+            for name in self._field_types:
+                for cand in (f"last_{name}", name):
+                    if cand in names:
+                        self._persisted[name] = cand
+                        break
+            store.add_listener(self._on_settings_changed)
+        self._setting_to_field = {v: k for k, v in self._persisted.items()}
+        self._discovery = None
 
     # -------------- helpers --------------
     @staticmethod
     def _coerce(value: Any, target_type: type) -> Any:
-        # Aceita valores vindos de UI (string) e converte de forma tolerante
-        try:
-            if target_type is bool:
-                if isinstance(value, str):
-                    v = value.strip().lower()
-                    if v in {"1", "true", "t", "yes", "y", "on", "sim"}:
-                        return True
-                    if v in {"0", "false", "f", "no", "n", "off", "nao", "não", ""}:
-                        return False
-                return bool(value)
-            if target_type is int:
-                return int(value)
-            if target_type is float:
-                return float(value)
-            if target_type is str:
-                return str(value)
-        except Exception:
-            pass
-        return value
+        return _make_coercer(target_type)(value)
 
     def _persist_field(self, field: str, value: Any) -> None:
-        if not (self._load_settings and self._save_settings):
+        # só marca no SettingsStore; a gravação é agrupada e feita em segundo plano
+        name = self._persisted.get(field)
+        if name is None:
             return
         try:
-            s = self._load_settings()
-            for name in (f"last_{field}", field):
-                if hasattr(s, name):
-                    setattr(s, name, value)
-                    self._save_settings(s)
-                    return
+            self._store.set(name, value)
         except Exception:
             pass
 
+    def _on_settings_changed(self, name: str, value: Any) -> None:
+        """Preferências alteradas por outra tela (ex.: Preferências) chegam ao estado."""
+        field = self._setting_to_field.get(name)
+        if field is not None:
+            self.set(field, value, persist=False)
+
+    # -------------- assinantes --------------
+    def subscribe(self, cb: StateSubscriber, fields: str | Iterable[str] | None = None) -> None:
+        """cb({campo: novo_valor}) quando algum dos `fields` muda (None = todos)."""
+        if isinstance(fields, str):
+            fields = (fields,)
+        self.unsubscribe(cb)
+        with self._lock:
+            self._subs.append((cb, frozenset(fields) if fields is not None else None))
+
+    def unsubscribe(self, cb: StateSubscriber) -> None:
+        with self._lock:
+            self._subs = [(c, f) for (c, f) in self._subs if c != cb]
+
+    @contextmanager
+    def batch(self):
+        """Agrupa as alterações do bloco num único aviso aos assinantes (aninhável).
+        Outras threads que chamarem set esperam o bloco terminar."""
+        changes: dict[str, Any] = {}
+        try:
+            with self._lock:
+                self._batch_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._batch_depth -= 1
+                    if self._batch_depth == 0:
+                        changes, self._pending = self._pending, {}
+        finally:
+            # o que já foi aplicado é avisado mesmo se o bloco levantar exceção
+            self._notify(changes)
+
+    def _notify(self, changes: dict[str, Any]) -> None:
+        if not changes:
+            return
+        for cb, wanted in list(self._subs):
+            part = changes if wanted is None else {k: v for k, v in changes.items() if k in wanted}
+            if not part:
+                continue
+            try:
+                cb(part)
+            except Exception as e:
+                if DEBUG: print(f"[STATE] assinante falhou: {e}")
+
     # -------------- API --------------
     def sync_from_settings(self) -> None:
         """Carrega valores iniciais (se houver settings)."""
-        if not self._load_settings:
+        if self._store is None:
             return
         try:
-            s = self._load_settings()
-            if hasattr(s, "last_ip") and getattr(s, "last_ip"):
-                self.data.ip = str(s.last_ip)
-            if hasattr(s, "last_port") and getattr(s, "last_port"):
-                self.data.port = int(s.last_port)
-            if hasattr(s, "theme") and getattr(s, "theme"):
-                self.data.theme = str(s.theme)
-            if hasattr(s, "discovery_timeout_ms") and getattr(s, "discovery_timeout_ms"):
-                self.data.discovery_timeout_ms = int(s.discovery_timeout_ms)
-            if hasattr(s, "mesh_discovery_timeout_sec") and getattr(s, "mesh_discovery_timeout_sec"):
-                self.data.mesh_discovery_timeout_sec = int(s.mesh_discovery_timeout_sec)
-
+            s = self._store.get()
+            with self.batch():
+                for field, name in self._persisted.items():
+                    value = getattr(s, name)
+                    if value:
+                        self.set(field, value, persist=False)
         except Exception:
             pass
 
     def set(self, field: str, value: Any, *, persist: bool | None = None) -> None:
         """Atualiza um campo do estado (com coerção) e persiste opcionalmente."""
-        if not hasattr(self.data, field):
+        coerce = self._coercers.get(field)
+        if coerce is None:
             return
-        target = self._field_types.get(field, type(getattr(self.data, field)))
-        coerced = self._coerce(value, target)
-        setattr(self.data, field, coerced)
+        coerced = coerce(value)
+        with self._lock:
+            changed = getattr(self.data, field) != coerced
+            if changed:
+                setattr(self.data, field, coerced)
+                self._pending[field] = coerced
+            batching = self._batch_depth > 0
+            changes = {}
+            if not batching:
+                changes, self._pending = self._pending, {}
         if (self._persist_default if persist is None else persist):
             self._persist_field(field, coerced)
+        self._notify(changes)
 
     # alias solicitado: nome "set_settings"
     set_settings = set
 
     def set_many(self, updates: dict[str, Any], *, persist: bool | None = None) -> None:
-        for k, v in updates.items():
-            self.set(k, v, persist=persist)
+        with self.batch():
+            for k, v in updates.items():
+                self.set(k, v, persist=persist)
 
     def set_ip_port(self, ip: Any, port: Any, *, persist: bool | None = None) -> None:
-        self.set("ip", ip, persist=persist)
-        self.set("port", port, persist=persist)
+        with self.batch():
+            self.set("ip", ip, persist=persist)
+            self.set("port", port, persist=persist)
+
+    # -------------- masters descobertas --------------
+    @property
+    def discovery(self):
+        """DiscoveryCache compartilhado (carregado do disco no 1º acesso)."""
+        if self._discovery is None:
+            from iluflex_tools.core.discovery_cache import DiscoveryCache
+            self._discovery = DiscoveryCache()
+            self._discovery.load()
+        return self._discovery
+
+    def last_known_address(self) -> tuple[str, int]:
+        """(ip, porta) para conectar/reconectar: o último IP conhecido da master
+        `mac` no cache de descoberta, ou o último IP usado."""
+        ip = ""
+        if self.data.mac:
+            try:
+                ip = self.discovery.last_known_ip(self.data.mac)
+            except Exception:
+                ip = ""
+        return (ip or self.data.ip, self.data.port)
 
 
 # Singleton global
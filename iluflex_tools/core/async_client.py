@@ -0,0 +1,312 @@
+"""Cliente TCP em asyncio, com o mesmo contrato de eventos do ConnectionService.
+
+Um único event loop atende quantos masters forem necessários, sem uma thread
+de recepção e outra de auto-reconnect por conexão.
+
+Eventos entregues aos listeners (mesmo formato do ConnectionService):
+    { "type": "connecting"|"connect"|"disconnect"|"reconnecting"|"tx"|"rx"|"error",
+      "ts": "HH:MM:SS.mmm",
+      "remote": (ip, port),
+      "text": "...",       # quando couber (utf-8)
+      "raw": b"..." }      # bytes brutos (tx/rx)
+
+Uso:
+    conn = AsyncConnectionService()
+    conn.add_listener(on_event)
+    await conn.connect("192.168.1.70", 4999)
+    resp = await conn.request("SRF,16,9\\r", expect="RRF,16,9")
+
+Na interface, TkAsyncioLoop roda o event loop dentro do `after` do Tk, de modo
+que os listeners são chamados na thread da UI:
+    bridge = TkAsyncioLoop(root)
+    bridge.submit(conn.connect(ip, port), on_done=lambda ok: ...)
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List
+
+from iluflex_tools.core.framer import RxFramer
+
+DEBUG = False
+
+Expect = str | re.Pattern | Callable[[str], bool]
+
+
+def _ts() -> str:
+    return datetime.now().strftime("%H:%M:%S.%f")[:-3]
+
+
+@dataclass
+class ReconnectPolicy:
+    """Backoff exponencial entre tentativas de reconexão."""
+    initial: float = 1.0       # espera antes da 1ª tentativa (s)
+    maximum: float = 30.0      # teto da espera (s)
+    factor: float = 2.0
+    max_attempts: int = 0      # 0 = sem limite
+
+    def delays(self):
+        delay, n = self.initial, 0
+        while not self.max_attempts or n < self.max_attempts:
+            yield delay
+            delay = min(self.maximum, delay * self.factor)
+            n += 1
+
+
+class AsyncConnectionService:
+    def __init__(self, msg_timeout: float = 0.4):
+        self.connected = False
+        self._remote = ("", 0)
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._rx_task: asyncio.Task | None = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._waiters: list[tuple[Expect, asyncio.Future]] = []
+        self._framer = RxFramer(msg_timeout=msg_timeout)
+        self._msg_timeout = msg_timeout
+        self.policy: ReconnectPolicy | None = None
+
+    def get_is_connected(self):
+        return self.connected
+
+    def get_remote(self) -> tuple[str, int]:
+        return self._remote
+
+    def set_remote(self, ip: str, port: int) -> None:
+        self._remote = (ip, port)
+
+    # ---- listeners ----
+    def add_listener(self, cb: Callable[[Dict[str, Any]], None]):
+        if cb not in self._listeners:
+            self._listeners.append(cb)
+
+    def remove_listener(self, cb: Callable[[Dict[str, Any]], None]):
+        if cb in self._listeners:
+            self._listeners.remove(cb)
+
+    def _emit(self, ev: Dict[str, Any]):
+        for cb in list(self._listeners):
+            try:
+                cb(ev)
+            except Exception:
+                pass  # não derruba o loop de eventos
+
+    # ---- conexão ----
+    async def connect(self, ip: str, port: int, timeout: float = 3.0) -> bool:
+        await self._close(emit=True)
+        self._remote = (ip, port)
+        self._emit({"type": "connecting", "ts": _ts(), "remote": self._remote})
+        try:
+            if DEBUG: print(f"[CONNECT] tentando {ip}:{port} ...")
+            self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+        except Exception as e:
+            if DEBUG: print(f"[CONNECT] falhou: {e}")
+            self._emit({"type": "error", "ts": _ts(), "remote": self._remote, "text": f"connexão falhou: {e}"})
+            self._reader = self._writer = None
+            self.connected = False
+            return False
+        self.connected = True
+        self._framer.clear()
+        self._rx_task = asyncio.get_running_loop().create_task(self._recv_loop())
+        self._emit({"type": "connect", "ts": _ts(), "remote": self._remote})
+        return True
+
+    async def disconnect(self):
+        """Desconexão pedida pelo usuário: não dispara auto-reconnect."""
+        self._cancel_reconnect()
+        await self._close(emit=True)
+
+    async def _close(self, emit: bool):
+        task, self._rx_task = self._rx_task, None
+        if task and task is not asyncio.current_task():
+            task.cancel()
+        writer, self._writer = self._writer, None
+        self._reader = None
+        if writer:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+        was_connected, self.connected = self.connected, False
+        for _expect, fut in self._waiters:
+            if not fut.done():
+                fut.set_exception(ConnectionError("conexão encerrada"))
+        self._waiters.clear()
+        if emit and was_connected:
+            self._emit({"type": "disconnect", "ts": _ts(), "remote": self._remote})
+
+    # ---- auto-reconnect ----
+    def enable_auto_reconnect(self, enabled: bool = True, policy: ReconnectPolicy | None = None):
+        """Liga/desliga reconexão automática após queda (não após disconnect())."""
+        self.policy = (policy or self.policy or ReconnectPolicy()) if enabled else None
+        if not enabled:
+            self._cancel_reconnect()
+
+    def get_auto_reconnect_enabled(self):
+        return self.policy is not None
+
+    def _cancel_reconnect(self):
+        task, self._reconnect_task = self._reconnect_task, None
+        if task and task is not asyncio.current_task():
+            task.cancel()
+
+    def _schedule_reconnect(self):
+        if self.policy is None or (self._reconnect_task and not self._reconnect_task.done()):
+            return
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self):
+        ip, port = self._remote
+        for delay in self.policy.delays():
+            await asyncio.sleep(delay)
+            if self.connected or self.policy is None:
+                return
+            self._emit({"type": "reconnecting", "ts": _ts(), "remote": self._remote})
+            if await self.connect(ip, port):
+                return
+
+    # ---- recepção ----
+    async def _recv_loop(self):
+        framer = self._framer
+        try:
+            while True:
+                try:
+                    data = await asyncio.wait_for(self._reader.read(65536), self._msg_timeout)
+                except asyncio.TimeoutError:
+                    stale = framer.flush_stale()
+                    if stale is not None:
+                        self._on_rx(stale.tobytes())
+                    continue
+                if not data:
+                    if DEBUG: print("[RX] conexão encerrada pelo remoto")
+                    break
+                framer.feed(data)
+                for msg in framer.frames_bytes():
+                    self._on_rx(msg)
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            self._emit({"type": "error", "ts": _ts(), "remote": self._remote, "text": f"rx error: {e}"})
+        await self._close(emit=True)
+        self._schedule_reconnect()
+
+    def _on_rx(self, msg: bytes):
+        text = msg.decode("utf-8", errors="replace")
+        if DEBUG: print(f"RX {self._remote[0]}:{self._remote[1]} -> {text}")
+        self._emit({"type": "rx", "ts": _ts(), "remote": self._remote, "text": text, "raw": msg})
+        for i, (expect, fut) in enumerate(self._waiters):
+            if not fut.done() and _matches(expect, text):
+                fut.set_result(text)
+                del self._waiters[i]
+                break
+
+    # ---- envio ----
+    async def send(self, data) -> bool:
+        if not self.connected or not self._writer:
+            self._emit({"type": "error", "ts": _ts(), "remote": self._remote, "text": "eviar sem conexão."})
+            return False
+        payload = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        try:
+            self._writer.write(payload)
+            await self._writer.drain()
+        except Exception as e:
+            self._emit({"type": "error", "ts": _ts(), "remote": self._remote, "text": f"tx error: {e}"})
+            await self._close(emit=True)
+            self._schedule_reconnect()
+            return False
+        self._emit({"type": "tx", "ts": _ts(), "remote": self._remote,
+                    "text": payload.decode("utf-8", errors="replace"), "raw": payload})
+        return True
+
+    async def request(self, cmd, expect: Expect, timeout: float = 2.0) -> str:
+        """Envia cmd e aguarda o primeiro rx que casar com expect (prefixo,
+        regex compilada ou função). Levanta asyncio.TimeoutError / ConnectionError."""
+        fut = asyncio.get_running_loop().create_future()
+        waiter = (expect, fut)
+        self._waiters.append(waiter)
+        try:
+            if not await self.send(cmd):
+                raise ConnectionError("falha ao enviar")
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+
+def _matches(expect: Expect, text: str) -> bool:
+    if isinstance(expect, str):
+        return text.startswith(expect)
+    if isinstance(expect, re.Pattern):
+        return expect.search(text) is not None
+    return bool(expect(text))
+
+
+class TkAsyncioLoop:
+    """Roda um event loop asyncio a partir do `after` do Tk (sem threads).
+
+    A cada `interval_ms` processa os callbacks prontos e o I/O sem bloquear;
+    corrotinas enviadas por submit() rodam na thread da UI.
+    """
+    def __init__(self, tk_root, interval_ms: int = 10, loop: asyncio.AbstractEventLoop | None = None):
+        self.root = tk_root
+        self.interval_ms = interval_ms
+        self.loop = loop or asyncio.new_event_loop()
+        self._after_id = None
+        self._running = False
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self._tick()
+
+    def stop(self):
+        self._running = False
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def close(self):
+        self.stop()
+        for task in asyncio.all_tasks(self.loop):
+            task.cancel()
+        self.step()
+        self.loop.close()
+
+    def step(self):
+        """Uma volta do loop: roda o que está pronto e retorna."""
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+
+    def _tick(self):
+        if not self._running:
+            return
+        try:
+            self.step()
+        except Exception as e:
+            if DEBUG: print(f"[TkAsyncioLoop] erro: {e}")
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def submit(self, coro: Awaitable, on_done: Callable[[Any], None] | None = None,
+               on_error: Callable[[BaseException], None] | None = None) -> asyncio.Task:
+        """Agenda a corrotina; on_done/on_error são chamados na thread da UI."""
+        task = self.loop.create_task(coro)
+
+        def _done(t: asyncio.Task):
+            if t.cancelled():
+                return
+            exc = t.exception()
+            if exc is not None:
+                if on_error: on_error(exc)
+            elif on_done:
+                on_done(t.result())
+        task.add_done_callback(_done)
+        self.start()
+        return task
@@ -0,0 +1,228 @@
+"""Cache persistente das masters encontradas na rede (chave = MAC).
+
+Guarda nome, IP, máscara, gateway e DHCP de cada master, com o momento da
+primeira e da última resposta. A página de conexão mostra o cache na hora e
+revalida em segundo plano (revalidate): cada entrada é marcada como
+  - "ok"     respondeu de novo no mesmo IP;
+  - "new"    apareceu pela primeira vez nesta revalidação;
+  - "moved"  respondeu com outro IP (prev_ip guarda o anterior);
+  - "stale"  não respondeu (nem ao broadcast nem ao probe unicast).
+Entradas sem resposta há mais de ttl_s são descartadas ao carregar.
+
+O cache é compartilhado via STATE.discovery, para que a reconexão comece
+pelo último IP conhecido da master (STATE.last_known_address()).
+
+Uso:
+    cache = DiscoveryCache()
+    cache.load()
+    rows = cache.rows()
+    cache.revalidate(NetworkService().engine, 5000, on_update=lambda e: ...)
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Callable, Dict, Iterable, List, Optional
+
+DEBUG = False
+
+CACHE_PATH = os.path.join(tempfile.gettempdir(), "iluflex_tools_masters.json")
+DEFAULT_TTL_S = 30 * 24 * 3600.0   # esquece masters sem resposta há 30 dias
+
+STATUS_OK = "ok"
+STATUS_NEW = "new"
+STATUS_MOVED = "moved"
+STATUS_STALE = "stale"
+
+
+@dataclass(slots=True)
+class CachedMaster:
+    mac: str
+    name: str = ""
+    ip: str = ""
+    mask: str = ""
+    gateway: str = ""
+    dhcp: str = ""
+    first_seen: float = 0.0
+    last_seen: float = 0.0
+    status: str = STATUS_OK
+    prev_ip: str = ""
+
+    def to_row(self) -> dict:
+        """Mesmo formato de NetworkService.scan_masters (colunas da tabela)."""
+        return {"NAME": self.name, "MAC": self.mac, "IP": self.ip, "MASCARA": self.mask,
+                "GATEWAY": self.gateway, "DHCP": self.dhcp}
+
+
+_FIELDS = tuple(f.name for f in fields(CachedMaster))
+
+
+def _key(mac: str) -> str:
+    return (mac or "").strip().lower()
+
+
+class DiscoveryCache:
+    def __init__(self, path: str = CACHE_PATH, ttl_s: float = DEFAULT_TTL_S):
+        self.path = path
+        self.ttl_s = ttl_s
+        self._lock = threading.RLock()
+        self._by_mac: Dict[str, CachedMaster] = {}
+        self._touched: set[str] = set()   # MACs que já responderam nesta rodada
+
+    # ---------------- persistência ----------------
+    def load(self, now: float | None = None) -> int:
+        """Lê o arquivo (se existir) descartando entradas expiradas. Retorna o total."""
+        now = time.time() if now is None else now
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f) or []
+        except Exception:
+            data = []
+        entries = {}
+        for raw in data if isinstance(data, list) else []:
+            try:
+                e = CachedMaster(**{k: raw[k] for k in _FIELDS if k in raw})
+            except Exception:
+                continue
+            e.mac = _key(e.mac)
+            if e.mac and now - float(e.last_seen or 0) <= self.ttl_s:
+                entries[e.mac] = e
+        with self._lock:
+            self._by_mac = entries
+        return len(entries)
+
+    def save(self) -> None:
+        """Grava de forma atômica (arquivo temporário + rename)."""
+        with self._lock:
+            data = [asdict(e) for e in self._by_mac.values()]
+        folder = os.path.dirname(self.path) or "."
+        try:
+            fd, tmp = tempfile.mkstemp(prefix=".masters-", suffix=".tmp", dir=folder)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            if DEBUG: print(f"[CACHE] falha ao gravar {self.path}: {e}")
+
+    # ---------------- consulta ----------------
+    def __len__(self) -> int:
+        return len(self._by_mac)
+
+    def get(self, mac: str) -> Optional[CachedMaster]:
+        return self._by_mac.get(_key(mac))
+
+    def by_ip(self, ip: str) -> Optional[CachedMaster]:
+        ip = (ip or "").strip()
+        with self._lock:
+            return next((e for e in self._by_mac.values() if e.ip == ip), None)
+
+    def entries(self) -> List[CachedMaster]:
+        """Mais recentes primeiro."""
+        with self._lock:
+            return sorted(self._by_mac.values(), key=lambda e: -e.last_seen)
+
+    def rows(self) -> List[dict]:
+        return [e.to_row() for e in self.entries()]
+
+    def last_known_ip(self, mac: str) -> str:
+        e = self.get(mac)
+        return e.ip if e else ""
+
+    # ---------------- atualização ----------------
+    def begin_round(self) -> None:
+        """Início de uma busca: os status passam a refletir só as respostas dela."""
+        with self._lock:
+            self._touched = set()
+
+    def update_found(self, dev: dict, now: float | None = None) -> Optional[CachedMaster]:
+        """Registra uma resposta de descoberta (dict de parse_found)."""
+        mac = _key(dev.get("MAC", ""))
+        if not mac:
+            return None
+        now = time.time() if now is None else now
+        ip = (dev.get("IP") or "").strip()
+        with self._lock:
+            e = self._by_mac.get(mac)
+            if e is None:
+                e = CachedMaster(mac=mac, first_seen=now, status=STATUS_NEW)
+                self._by_mac[mac] = e
+            elif e.ip and ip and e.ip != ip:
+                e.prev_ip, e.status = e.ip, STATUS_MOVED
+            elif mac not in self._touched:
+                e.status = STATUS_OK
+            self._touched.add(mac)
+            e.name = dev.get("NAME", e.name)
+            e.ip = ip or e.ip
+            e.mask = dev.get("MASCARA", e.mask)
+            e.gateway = dev.get("GATEWAY", e.gateway)
+            e.dhcp = dev.get("DHCP", e.dhcp)
+            e.last_seen = now
+            return e
+
+    def mark_missing(self, seen: Iterable[str]) -> List[CachedMaster]:
+        """Marca como stale as entradas que não estão em `seen` (MACs)."""
+        seen = {_key(m) for m in seen}
+        with self._lock:
+            stale = [e for mac, e in self._by_mac.items() if mac not in seen]
+            for e in stale:
+                e.status = STATUS_STALE
+        return stale
+
+    def forget(self, mac: str) -> None:
+        with self._lock:
+            self._by_mac.pop(_key(mac), None)
+
+    # ---------------- revalidação ----------------
+    def revalidate(self, engine, timeout_ms: int, on_update: Callable[[CachedMaster], None] | None = None,
+                   probe_port: int | None = None, sweeper=None) -> List[CachedMaster]:
+        """Refaz a descoberta (broadcast) e, para as masters que não responderam,
+        um probe unicast no último IP conhecido. Chama on_update para cada
+        entrada alterada e grava o cache ao final. Bloqueante (usar em thread).
+        `engine` é um core.net_discovery.DiscoveryEngine; com `sweeper`
+        (core.net_sweep.SubnetSweeper), se o broadcast não achar nada, varre a
+        sub-rede. Hosts achados só por TCP (sem MAC) vão para on_update mas não
+        para o cache."""
+        seen: set[str] = set()
+
+        def found(dev):
+            e = self.update_found(dev)
+            if e is None:
+                if on_update and dev.get("IP"):
+                    try:
+                        on_update(CachedMaster(mac="", name=dev.get("NAME", ""), ip=dev["IP"], status=STATUS_NEW))
+                    except Exception:
+                        pass
+                return
+            seen.add(e.mac)
+            if on_update:
+                try:
+                    on_update(e)
+                except Exception:
+                    pass
+
+        self.begin_round()
+        try:
+            engine.scan(timeout_ms, on_found=found)
+            if not seen and sweeper is not None:
+                sweeper.sweep(None, timeout_ms, on_found=found)
+            missing = [e for e in self.entries() if e.mac not in seen and e.ip]
+            if missing:
+                port = probe_port or engine.port
+                engine.scan(timeout_ms, on_found=found, expected=len(missing),
+                            targets=[(e.ip, port) for e in missing])
+        except Exception as e:
+            if DEBUG: print(f"[CACHE] revalidação falhou: {e}")
+
+        stale = self.mark_missing(seen)
+        if on_update:
+            for e in stale:
+                try:
+                    on_update(e)
+                except Exception:
+                    pass
+        self.save()
+        return self.entries()
@@ -0,0 +1,183 @@
+"""Barramento de eventos entre as threads de rede e o mainloop do Tk.
+
+O ConnectionService chama os listeners na thread de recepção; cada página
+fazia seu próprio `after(0, ...)` por evento, e uma rajada de linhas RX
+enchia a fila do Tk. O EventBus é o único listener de UI no serviço:
+  - enfileira os eventos (deque, sem lock) na thread de rede;
+  - drena a fila em lotes a cada `interval_ms` (16–33 ms) via `after` do Tk;
+  - descarta eventos de estado repetidos (connect, connect, ...) e erros
+    idênticos em sequência dentro do mesmo lote (o mesmo erro num lote
+    seguinte é entregue de novo); tx/rx nunca são descartados;
+  - entrega listas de eventos aos assinantes, já na thread do Tk;
+  - expõe métricas (profundidade da fila, latência e duração da drenagem).
+
+Uso:
+    bus = bus_for(conn, tk_widget)            # um por ConnectionService
+    bus.subscribe(self._on_conn_events)       # recebe list[dict]
+    bus.subscribe(self._on_state, types=STATE_TYPES)
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List
+
+DEBUG = False
+
+STATE_TYPES = frozenset({"connecting", "connect", "disconnect", "reconnecting"})
+
+Subscriber = Callable[[List[Dict[str, Any]]], None]
+
+
+class EventBus:
+    def __init__(self, conn=None, interval_ms: int = 16, max_batch: int = 1000):
+        self.interval_ms = max(1, int(interval_ms))
+        self.max_batch = max(1, int(max_batch))
+        self._queue: deque = deque()            # (monotonic, ev)
+        self._subs: list[tuple[Subscriber, frozenset | None]] = []
+        self._tk = None
+        self._after_id = None
+        self._last_state: tuple | None = None   # (type, remote) do último evento de estado entregue
+        self._metrics = {
+            "received": 0, "delivered": 0, "coalesced": 0, "batches": 0,
+            "max_depth": 0, "last_drain_ms": 0.0, "max_drain_ms": 0.0,
+            "last_latency_ms": 0.0, "max_latency_ms": 0.0,
+        }
+        self._conn = None
+        if conn is not None:
+            self.bind_conn(conn)
+
+    # ---------------- origem ----------------
+    def bind_conn(self, conn) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.remove_listener(self.post)
+            except Exception:
+                pass
+        self._conn = conn
+        if conn is not None:
+            conn.add_listener(self.post)
+
+    def post(self, ev: Dict[str, Any]) -> None:
+        """Chamado em qualquer thread (listener do ConnectionService)."""
+        self._queue.append((time.monotonic(), ev))
+        self._metrics["received"] += 1
+        depth = len(self._queue)
+        if depth > self._metrics["max_depth"]:
+            self._metrics["max_depth"] = depth
+
+    # ---------------- assinantes (thread do Tk) ----------------
+    def subscribe(self, cb: Subscriber, types: Iterable[str] | None = None) -> None:
+        """cb(lista_de_eventos); `types` filtra por tipo (None = todos)."""
+        self.unsubscribe(cb)
+        self._subs.append((cb, frozenset(types) if types is not None else None))
+
+    def unsubscribe(self, cb: Subscriber) -> None:
+        self._subs = [(c, t) for (c, t) in self._subs if c != cb]
+
+    # ---------------- Tk ----------------
+    def attach(self, tk_root) -> None:
+        """Passa a drenar a fila no mainloop de tk_root (idempotente)."""
+        if self._tk is tk_root and self._after_id is not None:
+            return
+        self.detach()
+        self._tk = tk_root
+        self._after_id = tk_root.after(self.interval_ms, self._tick)
+
+    def detach(self) -> None:
+        if self._tk is not None and self._after_id is not None:
+            try:
+                self._tk.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+
+    @property
+    def attached(self) -> bool:
+        return self._after_id is not None
+
+    def _tick(self) -> None:
+        self._after_id = None
+        try:
+            self.drain()
+        finally:
+            if self._tk is not None:
+                try:
+                    self._after_id = self._tk.after(self.interval_ms, self._tick)
+                except Exception:
+                    self._after_id = None  # janela destruída
+
+    # ---------------- drenagem ----------------
+    def _coalesce(self, items: list) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        last_error: str | None = None   # só vale dentro deste lote
+        for _ts, ev in items:
+            typ = ev.get("type")
+            if typ in STATE_TYPES:
+                key = (typ, tuple(ev.get("remote") or ()))
+                if key == self._last_state:
+                    self._metrics["coalesced"] += 1
+                    continue
+                self._last_state = key
+                last_error = None
+            elif typ == "error":
+                text = str(ev.get("text") or "")
+                if text == last_error:
+                    self._metrics["coalesced"] += 1
+                    continue
+                last_error = text
+            out.append(ev)
+        return out
+
+    def drain(self) -> int:
+        """Entrega até max_batch eventos pendentes. Retorna quantos foram entregues."""
+        q = self._queue
+        if not q:
+            return 0
+        t0 = time.monotonic()
+        items = []
+        for _ in range(min(len(q), self.max_batch)):
+            items.append(q.popleft())
+        latency = (t0 - items[0][0]) * 1000.0
+        events = self._coalesce(items)
+        if events:
+            for cb, types in list(self._subs):
+                batch = events if types is None else [ev for ev in events if ev.get("type") in types]
+                if not batch:
+                    continue
+                try:
+                    cb(batch)
+                except Exception as e:
+                    if DEBUG: print("[EventBus] erro no assinante:", e)
+        m = self._metrics
+        m["delivered"] += len(events)
+        m["batches"] += 1
+        m["last_latency_ms"] = latency
+        m["max_latency_ms"] = max(m["max_latency_ms"], latency)
+        m["last_drain_ms"] = (time.monotonic() - t0) * 1000.0
+        m["max_drain_ms"] = max(m["max_drain_ms"], m["last_drain_ms"])
+        return len(events)
+
+    def metrics(self) -> Dict[str, float]:
+        return dict(self._metrics, queue_depth=len(self._queue), subscribers=len(self._subs))
+
+    def close(self) -> None:
+        self.detach()
+        self.bind_conn(None)
+        self._queue.clear()
+        self._subs.clear()
+
+
+def bus_for(conn, tk_widget=None) -> EventBus:
+    """EventBus compartilhado por ConnectionService; com tk_widget, garante
+    que está drenando no mainloop da janela dele."""
+    bus = getattr(conn, "_event_bus", None)
+    if bus is None:
+        bus = EventBus(conn)
+        conn._event_bus = bus
+    if tk_widget is not None and not bus.attached:
+        try:
+            bus.attach(tk_widget.winfo_toplevel())
+        except Exception:
+            bus.attach(tk_widget)
+    return bus
@@ -0,0 +1,137 @@
+"""Framer de recepção (RX) do ConnectionService, sem cópias intermediárias.
+
+Mantém um buffer pré-alocado com cursores de leitura/escrita: o socket
+escreve direto nele (`recv_into`) e os frames são devolvidos como
+memoryview sobre o próprio buffer. O início do buffer não é apagado a cada
+frame (o antigo `del buf[:n]` era O(buffer) por mensagem); os bytes
+consumidos só são descartados na compactação periódica.
+
+Formato dos frames (igual ao _recv_loop original):
+  - binário: A5 <opcode> <len> <payload[len]> <checksum>  (total 4 + len)
+  - texto:   qualquer outra coisa até e incluindo o '\\r'
+  - bytes pendentes sem terminador são entregues como um frame após
+    msg_timeout sem recepção (flush_stale).
+
+As memoryviews entregues só valem até a próxima chamada de recv_into/feed;
+quem precisar guardar o frame deve copiar (bytes(frame)).
+"""
+from __future__ import annotations
+
+import time
+
+FRAME_BIN_START = 0xA5
+
+
+class RxFramer:
+    def __init__(self, capacity: int = 65536, min_recv: int = 4096, msg_timeout: float = 0.4):
+        self._buf = bytearray(max(capacity, 2 * min_recv))
+        self._mv = memoryview(self._buf)
+        self._r = 0          # início dos dados ainda não consumidos
+        self._w = 0          # fim dos dados recebidos
+        self._min_recv = min_recv
+        self.msg_timeout = msg_timeout
+        self.last_rx = 0.0
+        self.compactions = 0
+
+    # ---------------- escrita ----------------
+    def pending(self) -> int:
+        """Bytes recebidos ainda não entregues como frame."""
+        return self._w - self._r
+
+    def _writable(self) -> memoryview:
+        """Região livre no fim do buffer (compacta/cresce quando necessário)."""
+        if self._r == self._w:
+            self._r = self._w = 0
+        elif len(self._buf) - self._w < self._min_recv:
+            n = self._w - self._r
+            if n + self._min_recv > len(self._buf) // 2:
+                # frame maior que meio buffer: dobra a capacidade
+                novo = bytearray(2 * len(self._buf))
+                novo[:n] = self._mv[self._r:self._w]
+                self._buf = novo
+                self._mv = memoryview(novo)
+            else:
+                self._mv[:n] = self._mv[self._r:self._w]
+            self._r, self._w = 0, n
+            self.compactions += 1
+        return self._mv[self._w:]
+
+    def recv_into(self, sock) -> int:
+        """Lê do socket direto para o buffer. Retorna 0 quando o remoto fechou."""
+        n = sock.recv_into(self._writable())
+        if n:
+            self._w += n
+            self.last_rx = time.monotonic()
+        return n
+
+    def feed(self, data) -> None:
+        """Acrescenta bytes já lidos (testes, outras fontes)."""
+        data = memoryview(data)
+        while len(data):
+            dst = self._writable()
+            n = min(len(dst), len(data))
+            dst[:n] = data[:n]
+            self._w += n
+            data = data[n:]
+        self.last_rx = time.monotonic()
+
+    # ---------------- leitura ----------------
+    def _scan(self) -> list[int]:
+        """Fins dos frames completos a partir do cursor de leitura (não consome)."""
+        buf, find = self._buf, self._buf.find
+        r, w = self._r, self._w
+        ends = []
+        while r < w:
+            if buf[r] == FRAME_BIN_START:
+                if w - r < 3:
+                    break
+                end = r + 4 + buf[r + 2]
+                if end > w:
+                    break
+            else:
+                end = find(b"\r", r, w) + 1
+                if end == 0:
+                    break
+            ends.append(end)
+            r = end
+        return ends
+
+    def frames(self) -> list[memoryview]:
+        """Entrega (e consome) os frames completos como views do buffer."""
+        mv, r = self._mv, self._r
+        out = []
+        for end in self._scan():
+            out.append(mv[r:end])
+            r = end
+        self._r = r
+        return out
+
+    def frames_bytes(self) -> list[bytes]:
+        """Como frames(), mas em bytes próprios (seguros para guardar): uma
+        única cópia da região pronta, fatiada por frame."""
+        ends = self._scan()
+        if not ends:
+            return []
+        r0 = self._r
+        bloco = self._mv[r0:ends[-1]].tobytes()
+        out = []
+        a = 0
+        for end in ends:
+            b = end - r0
+            out.append(bloco[a:b])
+            a = b
+        self._r = ends[-1]
+        return out
+
+    def flush_stale(self, now: float | None = None) -> memoryview | None:
+        """Se há bytes pendentes há mais de msg_timeout, entrega tudo como um frame."""
+        if self._r == self._w:
+            return None
+        now = time.monotonic() if now is None else now
+        if now - self.last_rx <= self.msg_timeout:
+            return None
+        r, self._r = self._r, self._w
+        return self._mv[r:self._w]
+
+    def clear(self) -> None:
+        self._r = self._w = 0
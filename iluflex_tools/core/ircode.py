@@ -1,12 +1,28 @@
-
+import bisect
+import re
 from typing import List
 
+try:  # backend vetorizado opcional (arrays int32)
+    import numpy as np
+except ImportError:  # sem NumPy: usa apenas o caminho Python puro
+    np = None
+
 # Configuracao
 PAUSE_THRESHOLD_US = 15000
 TOLERANCE = 0.2
 DEBUG = False
 max_pause_before_cut = 0  # variável global
 
+# Versão do codec: incrementar sempre que a saída de convertIRCmd ou
+# preProcessIrCmd mudar, para invalidar os caches de conversão (ircode_cache).
+CODEC_VERSION = 3
+
+# Backend NumPy: habilitado automaticamente se o pacote existir. Pode ser
+# desligado em runtime (ex.: testes de paridade) com ircode.USE_NUMPY = False.
+USE_NUMPY = np is not None
+# Abaixo deste número de tempos o custo de criar o array supera o ganho
+NUMPY_MIN_LEN = 96
+
 class CompressError(Exception):
     """Exceção mínima para reportar erros específicos de compressão (sir,4).
     Mantém o código enxuto e permite captura no nível superior."""
@@ -159,306 +175,246 @@ class IrCodeLib:
 
 
 
-# Conversor fiel do comando sir (2, 3, 4, 5, 6, 7) para vetor de pulsos em Python
+# Conversor do comando sir (2, 3, 4, 5, 6, 7) para vetor de pulsos em Python.
 # Lembrar que precisa ter \r ou \n no final do comandos !
-def conversion(buffer: str) -> list[int]:
-    pulso = [0] * 1000
-    pulsosfinal = [0] * 1000
-    buf = [0] * 6
+#
+# Tokenizador por tabela: em vez de andar caractere a caractere numa máquina
+# de estados, localiza o cabeçalho "sir,<n>", separa o corpo por vírgulas e
+# decodifica os campos em bloco. Saídas e casos de erro (retorno [] ou
+# exceção) são os mesmos da máquina de estados original do firmware.
+_SIR_TERMINATORS = re.compile(r"[\r\n \\]")
+_SIR4_FOOTER = re.compile(r"[0-9,]*")
+_SIR7_CODES = re.compile(r"[a-z0-9]*")
+_MAX_PULSOS = 900
+
+
+def _is_ascii_digits(tok: str) -> bool:
+    return tok.isdigit() and tok.isascii()
+
+
+def _sir_header(buffer: str) -> tuple[str, int] | None:
+    """Localiza 'sir?<formato>' e retorna (formato, posição após o dígito)."""
+    if buffer.startswith("sir,") and buffer[4] in "234567":
+        return buffer[4], 5
+    # caminho lento: mesma tolerância da máquina de estados original
+    # (lixo antes de 'sir', separador qualquer, ignora até achar 2..7)
     state = 0
-    contBuf = 0
-    contPulso = 0
-    formato = None
-
-    if len(buffer) < 5:
-        if (DEBUG): print("[Debug] Buffer muito curto")
+    for pos, x in enumerate(buffer):
+        if state == 0:
+            state = 1 if x == 's' else 0
+        elif state == 1:
+            state = 2 if x == 'i' else 0
+        elif state == 2:
+            state = 3 if x == 'r' else 0
+        elif state == 3:
+            state = 4
+        elif x in "234567":
+            return x, pos + 1
+    return None
+
+
+def _sir2_to_compat(valores: list[int]) -> list[int]:
+    """Aplica iluflex_to_compatibility como o C fazia sobre o vetor fixo de 1000 posições."""
+    plen = valores[0] + 6
+    if plen > 1000:
+        raise IndexError("list index out of range")
+    falta = max(plen, 7) - len(valores)
+    pulsos = valores + [0] * falta if falta > 0 else valores
+    pulsosfinal = iluflex_to_compatibility(pulsos)
+    return pulsosfinal[0:(pulsosfinal[0] + 6)]
+
+
+def _conv_sir2(corpo: str, formato: str) -> list[int]:
+    """sir,2 / sir,5 / sir,6: inteiros decimais (até 5 dígitos) separados por vírgula."""
+    virgula = corpo.find(',')
+    if virgula == -1:
         return []
+    corpo = corpo[virgula + 1:]
+    m = _SIR_TERMINATORS.search(corpo)
+    campos = corpo[:m.start()] if m else corpo
+    tokens = campos.split(',')
+
+    ultimo = tokens[-1]
+    # caminho rápido: terminador presente, tudo dígito, sem campo vazio nem longo
+    if m and _is_ascii_digits(campos.replace(',', '')) and all(0 < len(t) <= 5 for t in tokens):
+        if len(tokens) - 1 > _MAX_PULSOS:
+            return []
+        valores = list(map(int, tokens))
+        if max(valores) > 65500:
+            if (DEBUG): print("[Debug] Valor de pulso acima do permitido")
+            return []
+    else:
+        # caminho lento: respeita a ordem exata de erros da máquina de estados
+        valores = []
+        for tok in tokens[:-1]:
+            if len(tok) > 5 or (tok and not _is_ascii_digits(tok)):
+                return []
+            valor = int(tok)  # campo vazio -> ValueError, como no original
+            if valor > 65500:
+                if (DEBUG): print("[Debug] Valor de pulso acima do permitido")
+                return []
+            valores.append(valor)
+            if len(valores) > _MAX_PULSOS:
+                if (DEBUG): print("[Debug] pulso excede limite")
+                return []
+        if len(ultimo) > 5 or (ultimo and not _is_ascii_digits(ultimo)):
+            return []
+        if m is None:
+            if (DEBUG): print("[Debug] Estado final não chegou a 30")
+            return []
+        valor = int(ultimo)
+        if valor > 65500:
+            return []
+        valores.append(valor)
 
-    pos = 0
-    while pos < len(buffer):
-        x = buffer[pos]
-        pos += 1
-
-        # print(f"[Debug] State: {state}, Char: {x}, Pos: {pos}")
-
-        match state:
-            case 0:
-                state = 1 if x == 's' else 0
-            case 1:
-                state = 2 if x == 'i' else 0
-            case 2:
-                state = 3 if x == 'r' else 0
-            case 3:
-                state = 4
-            case 4:
-                if x == '2':
-                    state = 5
-                    formato = '2'
-                elif x == '3':
-                    state = 20
-                    formato = '3'
-                elif x == '4':
-                    state = 10
-                    formato = '4'
-                elif x == '5':
-                    state = 5
-                    formato = '5'
-                elif x == '6':
-                    state = 5
-                    formato = '6'
-                elif x == '7':
-                    state = 15
-                    formato = '7'
-                if (DEBUG): print(f"[Debug] Detected formato: {formato}")
-            case 5:
-                if x == ',':
-                    state = 6
-                    buf = [0] * 6
-                    contBuf = contPulso = 0
-            case 6:
-                if x in ('\r', '\n', ' ', '\\'):
-                    valor = int(''.join([chr(b) for b in buf if b != 0]))
-                    if (DEBUG): print(f"[Debug] Fim de pulsos [{contPulso}]: {valor}")
-                    pulso[contPulso] = valor
-                    if pulso[contPulso] > 65500:
-                        if (DEBUG): print("[Debug] Valor de pulso acima do permitido")
-                        return []
-                    if formato == '2':
-                        pulsosfinal = iluflex_to_compatibility(pulso)
-                        # print(f"pulsosfinal ({pulsosfinal[0]}):", ",".join(map(str, pulsosfinal[0:])))
-                        return pulsosfinal[0:(pulsosfinal[0]+6)]
-                    state = 30
-                elif x == ',':
-                    valor = int(''.join([chr(b) for b in buf if b != 0]))
-                    # if (DEBUG): print(f"[Debug] Novo pulso[{contPulso}]: {valor}")
-                    pulso[contPulso] = valor
-                    if pulso[contPulso] > 65500:
-                        if (DEBUG): print("[Debug] Valor de pulso acima do permitido")
-                        return []
-                    contPulso += 1
-                    if contPulso > 900:
-                        if (DEBUG): print("[Debug] pulso excede limite")
-                        return []
-                    buf = [0] * 6
-                    contBuf = 0
-                elif '0' <= x <= '9':
-                    buf[contBuf] = ord(x)
-                    contBuf += 1
-                    if contBuf > 5:
-                        if (DEBUG): print("[Debug] contBuf excede 5")
-                        return []
-                else:
-                    if (DEBUG): print("[Debug] Caractere inválido no estado 6")
-                    return []
-            
-            # monitorar mensagem sir,4
-            case 10:
-                if x == ',':
-                    state = 11
-                    buf = [0] * 6
-                    contBuf = 0
-                    contPulso = 0
-                else:
-                    if (DEBUG): print('[Debug] Falha no estado 10 (esperava vírgula)')
-                    return []
+    if formato == '2':
+        return _sir2_to_compat(valores)
+    return valores
 
 
-            case 11:
-                if x == ',':
-                    # normaliza para convASCIIToInt (direita→esquerda)
-                    tmp = [0] * 6
-                    for i in range(contBuf):
-                        tmp[i] = buf[6 - contBuf + i]
-                    for i in range(contBuf, 6):
-                        tmp[i] = 48
-                    valor = convASCIIToInt(tmp)
-                    if (DEBUG): print(f"[sir4][header] pulso[{contPulso}] = {valor}")
-                    if valor > 65500 or valor <= 0:
-                        return []
-                    pulso[contPulso] = valor
-                    contPulso += 1
-                    if contPulso > 900:
-                        return []
-                    buf = [0] * 6
-                    contBuf = 0
-                    if contPulso == 8:
-                        state = 12
-                elif '0' <= x <= '9':
-                    # direita→esquerda
-                    if contBuf > 5:
-                        return []
-                    buf[5 - contBuf] = ord(x)
-                    contBuf += 1
-                else:
-                    return []
-            case 12:
-                if x == ',':
-                    buf = [0] * 6
-                    contBuf = 0
-                    state = 13
-                else:
-                    ox = ord(x)
-                    if 65 <= ox <= 90:  # A-Z
-                        pulso[contPulso] = ox
-                        contPulso += 1
-                        if contPulso > 900:
-                            return []
-                    elif 97 <= ox <= 122:  # a-z (4x)
-                        for _ in range(4):
-                            pulso[contPulso] = ox
-                            contPulso += 1
-                            if contPulso > 900:
-                                return []
-                    else:
-                        return []
-            case 13: # inicio da recepcao do buffer footer
-                if x == ',':
-                    tmp = [0] * 6
-                    for i in range(contBuf):
-                        tmp[i] = buf[6 - contBuf + i]
-                    for i in range(contBuf, 6):
-                        tmp[i] = 48
-                    valor = convASCIIToInt(tmp)
-                    if (DEBUG): print(f"[sir4][footer] pulso[{contPulso}] = {valor}")
-                    if valor > 65500 or valor <= 0:
-                        return []
-                    pulso[contPulso] = valor
-                    contPulso += 1
-                    if contPulso > 900:
-                        return []
-                    buf = [0] * 6
-                    contBuf = 0
-                elif '0' <= x <= '9':
-                    if contBuf > 5:
-                        return []
-                    buf[5 - contBuf] = ord(x)
-                    contBuf += 1
-                else:
-                    # fim (0x0d ou ponto)
-                    tmp = [0] * 6
-                    for i in range(contBuf):
-                        tmp[i] = buf[6 - contBuf + i]
-                    for i in range(contBuf, 6):
-                        tmp[i] = 48
-                    valor = convASCIIToInt(tmp)
-                    if valor > 65500 or valor <= 0:
-                        return []
-                    pulso[contPulso] = valor
-                    contPulso += 1
-                    if contPulso > 900:
-                        return []
-                    pulso[contPulso] = 0
-                    contPulso += 1
-                    state = 30
-
-            # ---------------- sir,7 ----------------
-            case 15:
-                if x == ',':
-                    state = 16
-                    buf = [0] * 6
-                    contBuf = 0
-                    contPulso = 0
-                else:
+def _conv_sir3(corpo: str) -> list[int]:
+    """sir,3: 12 campos de header, bloco binário (pares msb/lsb) e campos finais."""
+    if not corpo.startswith(','):
+        return []
+    corpo = corpo[1:]
+    m = _SIR_TERMINATORS.search(corpo)
+    tokens = (corpo[:m.start()] if m else corpo).split(',')
+    ultimo_idx = len(tokens) - 1
+
+    pulso: list[int] = []
+    zip_idx = -1
+    for idx, tok in enumerate(tokens):
+        if idx == zip_idx:
+            # bytes compactados: cada par vira (msb << 8) + lsb
+            for i in range(0, len(tok) - 1, 2):
+                pulso.append((ord(tok[i]) << 8) + ord(tok[i + 1]))
+                if len(pulso) > _MAX_PULSOS:
                     return []
-            case 16:
-                if x == ',':
-                    tmp = [0] * 6
-                    for i in range(contBuf):
-                        tmp[i] = buf[6 - contBuf + i]
-                    for i in range(contBuf, 6):
-                        tmp[i] = 48
-                    valor = convASCIIToInt(tmp)
-                    if valor > 65500:
-                        return []
-                    pulso[contPulso] = valor
-                    contPulso += 1
-                    if contPulso > 900:
-                        return []
-                    buf = [0] * 6
-                    contBuf = 0
-                    if contPulso == 6:
-                        state = 17
-                elif '0' <= x <= '9':
-                    if contBuf > 5:
-                        return []
-                    buf[5 - contBuf] = ord(x)
-                    contBuf += 1
-                else:
+            if idx == ultimo_idx:
+                if m is None:
                     return []
-            case 17:
-                ox = ord(x)
-                if (97 <= ox <= 122) or (48 <= ox <= 57):
-                    pulso[contPulso] = ox
-                    contPulso += 1
-                    if contPulso > 900:
-                        return []
-                else:
-                    if contPulso == 26:
-                        state = 30
-                    else:
-                        return []
+                pulso.append(0)
+                return pulso
+            continue
 
-            # ---------------- sir,3 ----------------
-            case 20:
-                if x == ',':
-                    state = 21
-                else:
-                    return []
-                buf = [0] * 6
-                contBuf = 0
-                contPulso = 0
-                zip = 0
-            case 21:
-                ox = ord(x)
-                if x in ('\r', '\n', ' ', '\\'):
-                    valor = int(''.join([chr(b) for b in buf if b != 0])) if contBuf > 0 else 0
-                    pulso[contPulso] = valor
-                    state = 30
-                elif x == ',' and zip == 0:
-                    valor = int(''.join([chr(b) for b in buf if b != 0])) if contBuf > 0 else 0
-                    pulso[contPulso] = valor
-                    if pulso[contPulso] > 65500 or pulso[contPulso] <= 0:
-                        return []
-                    contPulso += 1
-                    if contPulso > 900:
-                        return []
-                    if contPulso == 12:
-                        zip = 1
-                        msbByte = 1
-                    buf = [0] * 6
-                    contBuf = 0
-                elif x == ',' and zip == 1:
-                    zip = 0
-                    contBuf = 0
-                elif zip == 1 and msbByte == 1:
-                    pulso[contPulso] = ox << 8
-                    msbByte = 0
-                elif zip == 1 and msbByte == 0:
-                    pulso[contPulso] = pulso[contPulso] + ox
-                    contPulso += 1
-                    if contPulso > 900:
-                        return []
-                    msbByte = 1
+        for ch in tok[:6]:
+            if not (33 <= ord(ch) <= 126):
+                return []
+        if len(tok) > 5:
+            return []
+        if idx == ultimo_idx:
+            if m is None:
+                return []
+            pulso.append(int(tok) if tok else 0)
+            return pulso
+        valor = int(tok) if tok else 0
+        if valor > 65500 or valor <= 0:
+            return []
+        pulso.append(valor)
+        if len(pulso) > _MAX_PULSOS:
+            return []
+        if len(pulso) == 12:
+            zip_idx = idx + 1
+    return []
+
+
+def _sir_field_6(tok: str) -> int | None:
+    """Campo decimal de até 6 dígitos (sir,4 / sir,7). None se inválido; vazio vale 0."""
+    if len(tok) > 6 or (tok and not _is_ascii_digits(tok)):
+        return None
+    return int(tok) if tok else 0
+
+
+def _conv_sir4(corpo: str) -> list[int]:
+    """sir,4: 8 campos de header, letras de referência (A-Z / a-z = 4 bits) e footer."""
+    if not corpo.startswith(','):
+        if (DEBUG): print('[Debug] Falha no estado 10 (esperava vírgula)')
+        return []
+    partes = corpo[1:].split(',', 9)
+    if len(partes) < 10:
+        return []
+
+    pulso: list[int] = []
+    for tok in partes[:8]:
+        valor = _sir_field_6(tok)
+        if valor is None or valor > 65500 or valor <= 0:
+            return []
+        pulso.append(valor)
+
+    letras = partes[8]
+    if letras:
+        if not (letras.isascii() and letras.isalpha()):
+            return []
+        codigos = letras.encode("ascii")
+        if letras.isupper():
+            pulso.extend(codigos)
+        else:
+            for c in codigos:
+                if c >= 97:
+                    pulso.extend((c, c, c, c))
                 else:
-                    if not (33 <= ox <= 126):
-                        return []
-                    buf[contBuf] = ox
-                    contBuf += 1
-                    if contBuf > 5:
-                        return []
-
-            case 30:
-                break
+                    pulso.append(c)
+
+    footer = partes[9]
+    fim = _SIR4_FOOTER.match(footer).end()
+    if fim == len(footer):
+        return []  # sem terminador
+    for tok in footer[:fim].split(','):
+        valor = _sir_field_6(tok)
+        if valor is None or valor > 65500 or valor <= 0:
+            return []
+        pulso.append(valor)
+
+    if len(pulso) >= _MAX_PULSOS:
+        return []
+    pulso.append(0)
+    pulso.append(0)
+    return pulso
+
 
-    if state == 30:
-        if contPulso > 900:
-            if (DEBUG): print("[Debug] pulso excede 900 no final")
+def _conv_sir7(corpo: str) -> list[int]:
+    """sir,7: 6 campos numéricos seguidos de exatamente 20 códigos [a-z0-9]."""
+    if not corpo.startswith(','):
+        return []
+    partes = corpo[1:].split(',', 6)
+    if len(partes) < 7:
+        return []
+    pulso: list[int] = []
+    for tok in partes[:6]:
+        valor = _sir_field_6(tok)
+        if valor is None or valor > 65500:
             return []
-        if (DEBUG): print(f"[Debug] Conversão finalizada com {contPulso} pulsos")
-        return pulso[:contPulso + 1]
+        pulso.append(valor)
+    resto = partes[6]
+    fim = _SIR7_CODES.match(resto).end()
+    if fim == len(resto) or fim != 20:
+        return []
+    pulso.extend(resto[:fim].encode("ascii"))
+    pulso.append(0)
+    return pulso
+
+
+def conversion(buffer: str) -> list[int]:
+    if len(buffer) < 5:
+        if (DEBUG): print("[Debug] Buffer muito curto")
+        return []
+
+    header = _sir_header(buffer)
+    if header is None:
+        if (DEBUG): print("[Debug] Cabeçalho sir não encontrado")
+        return []
+    formato, pos = header
+    if (DEBUG): print(f"[Debug] Detected formato: {formato}")
+    corpo = buffer[pos:]
+
+    if formato in ('2', '5', '6'):
+        return _conv_sir2(corpo, formato)
+    if formato == '3':
+        return _conv_sir3(corpo)
+    if formato == '4':
+        return _conv_sir4(corpo)
+    return _conv_sir7(corpo)
 
-    if (DEBUG): print("[Debug] Estado final não chegou a 30")
-    return []
 
 def iluflex_to_compatibility(pulso: List[int]) -> List[int]:
     """Converte vetor sir,2 (pulsos em ticks 1,6 µs) para vetor "compatível"
@@ -484,6 +440,8 @@ def iluflex_to_compatibility(pulso: List[int]) -> List[int]:
     buffer_out[3] = 10_000_000 // periodo
 
     # Converte todos os tempos após o header para N (ciclos)
+    # (sem caminho NumPy: com no máximo 900 tempos, criar o array e voltar
+    # para lista custa o mesmo que o laço; ver benchmarks/bench_ircode.py)
     plen = pulso[0] + 6
     for i in range(6, plen):
         ti = pulso[i]
@@ -599,70 +557,80 @@ def compatibility_to_compressed(pulso: list[int]) -> str | int:
 
     return buffer_str
 
+def _tol_contains(ref: int, t: int) -> bool:
+    """Janela de tolerância de uma referência sir,4: ref ± (2 + 1%), aberta."""
+    return ref - (2 + 0.01 * ref) < t < ref + (2 + 0.01 * ref)
+
+
 # Converte pulsos em formato sir,4
 def CompatibilityToCompressII(pulso: list[int]) -> str | int:
+    """Compacta o vetor compatível em sir,4 (referências A..P + nível II a..p).
+
+    Mesma saída do algoritmo original (que comparava cada pulso com todos os
+    outros, O(n²)): um tempo vira nova referência apenas se nenhuma
+    referência anterior o cobre na tolerância. Como referências só são
+    acrescentadas, basta testar cada valor distinto uma vez, contra a lista
+    ordenada de referências (bisect nos vizinhos). A letra de cada valor é a
+    da última referência que o cobre, também calculada uma vez por valor.
+    """
 
     # if (DEBUG): print(f"Pulsos recebidos ({pulso[0]}):", ",".join(map(str, pulso[0:])))
 
     if pulso[0] < 12:
         raise CompressError("PULSE_COUNT_TOO_SMALL", f"Quantidade de pulsos < 12 (valor: {pulso[0]})")
 
-    different_times_arr = [0] * 20
-    number_of_different_times = 0
-    out_buffer = "sir,4"
-
     # Header: pulso[0] is the count, then next 7 elements
+    out_parts = ["sir,4"]
     for i in range(8):
-        out_buffer += f",{pulso[i]}"
-    
-    out_buffer += ","
+        out_parts.append(f",{pulso[i]}")
+    out_parts.append(",")
 
-    # Identify different pulse lengths
     # starting position 8 keep 2 first pulses and 2 last out
-    for i in range(8, pulso[0] - 2):
-        if pulso[i] < 2:
-            raise CompressError("PULSE_TIME_TOO_SMALL", f"Tempo pulso muito curto < 2 (valor: {pulso[i]})")
+    fim = pulso[0] - 2
+    if pulso[8] < 2:
+        raise CompressError("PULSE_TIME_TOO_SMALL", f"Tempo pulso muito curto < 2 (valor: {pulso[8]})")
+    tempos = pulso[8:fim]
+    if len(tempos) < fim - 8:
+        raise IndexError("list index out of range")
 
-        number_of_different_times += 1
-        different_times_arr[number_of_different_times] = pulso[i]
-        if (DEBUG): print(f"[DEBUG] Scan pulse {i}: {pulso[i]} at index {number_of_different_times}, array: {different_times_arr[:20]}")
-
-        # Find other pulses with similar time
-        number_of_equal_times = 0
-        for j in range(8, pulso[0] - 2):
-            toln = pulso[j] - (2 + 0.01 * pulso[j])
-            tolp = pulso[j] + (2 + 0.01 * pulso[j])
-            if toln < pulso[i] < tolp:
-                number_of_equal_times += 1
-              
-        #  Verify if pulse time is already stored in DifferentTimesArr
-        if number_of_equal_times > 1:
-            rp = 0
-            for j in range(1, number_of_different_times + 1):
-                toln = different_times_arr[j] - (2 + 0.01 * different_times_arr[j])
-                tolp = different_times_arr[j] + (2 + 0.01 * different_times_arr[j])
-                if toln < pulso[i] < tolp:
-                    rp += 1
-            if rp > 1:
-                number_of_different_times -= 1
-
-        if number_of_different_times > 17:
-            print(f"Erro, ultrapassou 16 references, numberOfDifferentTimes = {number_of_different_times}, numberOfEqualTimes = {number_of_equal_times}")
+    # Identify different pulse lengths
+    refs: list[int] = []        # ordem de criação -> letra A, B, C...
+    refs_sorted: list[int] = []
+    vistos: set[int] = set()
+    for t in tempos:
+        if t < 2:
+            raise CompressError("PULSE_TIME_TOO_SMALL", f"Tempo pulso muito curto < 2 (valor: {t})")
+        if t in vistos:
+            continue
+        vistos.add(t)
+        k = bisect.bisect_left(refs_sorted, t)
+        if (k < len(refs_sorted) and _tol_contains(refs_sorted[k], t)) or (k > 0 and _tol_contains(refs_sorted[k - 1], t)):
+            continue
+        refs.append(t)
+        refs_sorted.insert(k, t)
+        if (DEBUG): print(f"[DEBUG] Nova referência {chr(0x40 + len(refs))}: {t}")
+
+        if len(refs) > 17:
+            number_of_equal_times = sum(1 for v in tempos if _tol_contains(v, t))
+            print(f"Erro, ultrapassou 16 references, numberOfDifferentTimes = {len(refs)}, numberOfEqualTimes = {number_of_equal_times}")
             return 0
 
+    # compress level I: letra da última referência que cobre o valor
+    letras: dict[int, str] = {}
+    for t in vistos:
+        c = chr(0x58)  # default 'X'
+        for j, ref in enumerate(refs, start=1):
+            if _tol_contains(ref, t):
+                c = chr(0x40 + j)  # '@'+j from ascii: 0x40 = @ , 0x41 = A , 0x42 = B ...
+        letras[t] = c
+
     # Compression
     buffer3 = ['\0'] * 10
     char_position = 0
     cp = 0
 
-    for i in range(8, pulso[0] - 2):
-        c = chr(0x58)  # default 'X'
-        # compress level I
-        for j in range(1, number_of_different_times + 1):
-            toln = different_times_arr[j] - (2 + 0.01 * different_times_arr[j])
-            tolp = different_times_arr[j] + (2 + 0.01 * different_times_arr[j])
-            if toln < pulso[i] < tolp:
-                c = chr(0x40 + j)  # '@'+j from ascii: 0x40 = @ , 0x41 = A , 0x42 = B ...
+    for t in tempos:
+        c = letras[t]
 
         # compress level II
         # cp guarda a posição sendo bit 0 para A e bit 1 para B
@@ -675,33 +643,31 @@ def CompatibilityToCompressII(pulso: list[int]) -> str | int:
             cp = cp | (0x01 << (char_position - 1))
         else:
             # Adiciona os caracteres quando tiver tempo diferente do A ou B
-            for j in range(char_position):
-                out_buffer += buffer3[j]
+            out_parts.extend(buffer3[:char_position])
             char_position = 0
             cp = 0
 
         if char_position > 3:
-            out_buffer += chr(0x61 + cp) # 0x61 = 'a'
+            out_parts.append(chr(0x61 + cp)) # 0x61 = 'a'
             char_position = 0
             cp = 0
-    
+
     # guarda as poisções finais se ainda tiver.
     if char_position > 0:
-        for j in range(char_position):
-            out_buffer += buffer3[j]
+        out_parts.extend(buffer3[:char_position])
 
     # Last two pulses
     for i in range(pulso[0] - 2, pulso[0]):
         if pulso[i] < 2:
             raise CompressError("PULSE_TIME_TOO_SMALL", f"Tempo pulso muito curto < 2 (valor: {pulso[i]})")
-        
-        out_buffer += f",{pulso[i]}"
+
+        out_parts.append(f",{pulso[i]}")
 
     # add reference values to the end of command.
-    for i in range(1, number_of_different_times + 1):
-        out_buffer += f",{different_times_arr[i]}"
+    for ref in refs:
+        out_parts.append(f",{ref}")
 
-    return out_buffer
+    return "".join(out_parts)
 
 
 
@@ -716,6 +682,10 @@ def blocks_are_similar(block1, block2, tolerance=TOLERANCE):
 
 # Faz a media de varios blocos de pares
 def average_multiple_blocks(blocks):
+    if _use_numpy(len(blocks) * len(blocks[0])) and all(len(b) == len(blocks[0]) for b in blocks):
+        # np.rint arredonda metade para par, igual ao round() do Python
+        arr = np.asarray(blocks, dtype=np.int64)
+        return np.rint(arr.mean(axis=0)).astype(np.int64).tolist()
     averaged = []
     for i in range(len(blocks[0])):
         ons = [frame[i][0] for frame in blocks]
@@ -1032,6 +1002,12 @@ def sir34tosir2(sirin):
         # return round(((625000 * int(strnum)) - 312500) / freq) usa half round up com inteiros  
         return round((625000 * int(strnum)) / freq)
 
+    def timesConversion(toks) -> list[int]:
+        valores = [int(tok) for tok in toks]
+        if _use_numpy(len(valores)):
+            return sir34_to_sir2_array(valores, freq, half_even=True).tolist()
+        return [timePulseConversion(v) for v in valores]
+
 
     if splited[1] == '4':  # conversão de sir,4 para sir,2
         freq = int(splited[5])
@@ -1041,7 +1017,7 @@ def sir34tosir2(sirin):
         resultsir2 += f",{timePulseConversion(splited[8])},{timePulseConversion(splited[9])}"
 
         #mapear tempos
-        timearr = [timePulseConversion(tok) for tok in splited[13:] if tok.strip()]
+        timearr = timesConversion(tok for tok in splited[13:] if tok.strip())
 
         if DEBUG: print(f"Timer Arr: {timearr}")
 
@@ -1074,10 +1050,7 @@ def sir34tosir2(sirin):
         resultsir2 += f",{timePulseConversion(splited[8])},{timePulseConversion(splited[9])}"
 
         # adição da parte das letras
-        on0 = timePulseConversion(splited[10])
-        off0 = timePulseConversion(splited[11])
-        on1 = timePulseConversion(splited[12])
-        off1 = timePulseConversion(splited[13])
+        on0, off0, on1, off1 = timesConversion(splited[10:14])
 
         totalBit = (int(splited[2]) - 10) // 2 # len sempre tem 6 a mais, 2 primeiros pulsos são start burst e 2 final burst ; // divide e retorna inteiro, melhor que / que retorna float
 
@@ -1249,9 +1222,11 @@ def get_rep_from_cmd(cmd: str) -> int:
 
 def repeat_pulses(pulses: list[int], rep: int) -> list[int]:
     """Repete a sequência completa de pulsos rep vezes (mantém a pausa longa final entre frames)."""
-    if rep <= 1 or not pulses:
+    if rep <= 1 or len(pulses) == 0:
         return pulses
-    return pulses * rep  
+    if np is not None and isinstance(pulses, np.ndarray):
+        return np.tile(pulses, rep)
+    return pulses * rep
 
 
 # ----------------------------------------------------------------------------
@@ -1263,3 +1238,43 @@ def _div_round_half_up(num: int, den: int) -> int:
         raise ZeroDivisionError("Denominador zero em divisão com arredondamento")
     return (num + den // 2) // den
 
+
+# ----------------------------------------------------------------------------
+#  Backend NumPy (opcional): mesmas conversões aplicadas a arrays inteiros.
+#  Entradas são tratadas como int32 (tempos <= 65500); as contas são feitas
+#  em int64 para que N*625000 não estoure e o arredondamento seja idêntico a
+#  _div_round_half_up (floor division do NumPy == // do Python).
+# ----------------------------------------------------------------------------
+
+def _use_numpy(n: int) -> bool:
+    return USE_NUMPY and np is not None and n >= NUMPY_MIN_LEN
+
+
+def _as_array(values):
+    if np is None:
+        raise RuntimeError("NumPy não está instalado")
+    return np.asarray(values).astype(np.int64)
+
+
+def _div_round_half_up_array(num, den: int):
+    if den == 0:
+        raise ZeroDivisionError("Denominador zero em divisão com arredondamento")
+    return (num + den // 2) // den
+
+
+def sir2_to_sir34_per_array(t2, Per: int):
+    """Versão vetorizada de sir2_to_sir34_per: N = round_half_up(16 * t2 / Per)."""
+    return _div_round_half_up_array(16 * _as_array(t2), Per)
+
+
+def sir34_to_sir2_array(N, freq: int, half_even: bool = False):
+    """Versão vetorizada de sir34_to_sir2: t2 = round_half_up(N * 625000 / freq).
+    half_even=True reproduz o round((625000 * N) / freq) do sir34tosir2
+    (divisão em float64 e empate para o par, como o round() do Python)."""
+    if not half_even:
+        return _div_round_half_up_array(_as_array(N) * 625000, freq)
+    if freq == 0:
+        raise ZeroDivisionError("Denominador zero em divisão com arredondamento")
+    return np.rint((_as_array(N) * 625000) / freq).astype(np.int64)
+
+
@@ -0,0 +1,189 @@
+"""Cache de conversões IR endereçado por conteúdo, na frente de IrCodeLib.
+
+A chave é o hash (SHA-256) do comando normalizado (strip), da operação, dos
+parâmetros (tipo, repeat, channel / pause_threshold, max_frames, normalize)
+e de ircode.CODEC_VERSION. Mudar a versão do codec invalida tudo: as chaves
+mudam e o diretório em disco de versões antigas é descartado (só os que o
+próprio cache criou: `v<N>` dentro de CACHE_NAMESPACE, com o arquivo marcador).
+
+- Memória: LRU limitado (OrderedDict), com contadores de hit/miss/eviction.
+  Cada chamada recebe uma cópia profunda: alterar o resultado não mexe no cache.
+- Disco (opcional): um JSON por chave em
+  `<dir>/iluflex_ircache/v<CODEC_VERSION>/<hh>/<hash>.json`,
+  gravado de forma atômica (arquivo temporário + os.replace), podendo ser
+  compartilhado entre processos (ex.: iluflex_tools.batch).
+
+Resultados com erro não são guardados (podem conter exceções e são raros).
+Uso:
+    from iluflex_tools.core.ircode_cache import IR_CACHE
+    IR_CACHE.enable_disk()   # opcional, padrão: <tmp>/iluflex_tools_ircache
+    res = IR_CACHE.convertIRCmd(sir, "Iluflex Short", 1, 1)
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from iluflex_tools.core.ircode import CODEC_VERSION, IrCodeLib
+
+DEBUG = False
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "iluflex_tools_ircache")
+
+# subpasta do cache dentro de cache_dir: nada fora dela é apagado
+CACHE_NAMESPACE = "iluflex_ircache"
+CACHE_MARKER = ".iluflex_ircache"   # presente em cada v<N> criado pelo cache
+_VERSION_DIR_RE = re.compile(r"^v\d+$")
+
+
+class ConversionCache:
+    def __init__(self, maxsize: int = 4096, cache_dir: str | None = None):
+        self.maxsize = max(1, int(maxsize))
+        self._mem: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self._dir: str | None = None
+        if cache_dir:
+            self.enable_disk(cache_dir)
+
+    # ---------------- API espelhando IrCodeLib ----------------
+    def convertIRCmd(self, ircmd: str, tipo: str, repeat: int, channel: int) -> dict:
+        """Igual a IrCodeLib.convertIRCmd, consultando o cache antes."""
+        key = self.make_key("convertIRCmd", ircmd, tipo=tipo, repeat=repeat, channel=channel)
+        return self._get_or_compute(key, lambda: IrCodeLib.convertIRCmd(ircmd, tipo, repeat, channel))
+
+    def preProcessIrCmd(self, irCmd: str, pause_threshold: int, max_frames: int, normalize: bool):
+        """Igual a IrCodeLib.preProcessIrCmd, consultando o cache antes."""
+        key = self.make_key("preProcessIrCmd", irCmd, pause_threshold=pause_threshold,
+                            max_frames=max_frames, normalize=bool(normalize))
+        return self._get_or_compute(key, lambda: IrCodeLib.preProcessIrCmd(irCmd, pause_threshold, max_frames, normalize))
+
+    # ---------------- chave / contadores ----------------
+    @staticmethod
+    def make_key(op: str, cmd: str, **params) -> str:
+        payload = json.dumps([CODEC_VERSION, op, (cmd or "").strip(), params],
+                             sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_hits": self.disk_hits,
+                "size": len(self._mem),
+                "maxsize": self.maxsize,
+                "codec_version": CODEC_VERSION,
+                "disk": self._dir or "",
+            }
+
+    def clear(self, disk: bool = False) -> None:
+        """Esvazia a memória (e o diretório em disco, se disk=True) e zera contadores."""
+        with self._lock:
+            self._mem.clear()
+            self.hits = self.misses = self.evictions = self.disk_hits = 0
+            if disk and self._dir:
+                shutil.rmtree(self._dir, ignore_errors=True)
+                os.makedirs(self._dir, exist_ok=True)
+                open(os.path.join(self._dir, CACHE_MARKER), "a").close()
+
+    # ---------------- disco ----------------
+    def enable_disk(self, cache_dir: str = DEFAULT_CACHE_DIR) -> None:
+        """Liga o cache em disco (em <cache_dir>/iluflex_ircache); remove os
+        diretórios de outras versões do codec criados pelo próprio cache."""
+        versao = f"v{CODEC_VERSION}"
+        base = os.path.join(cache_dir, CACHE_NAMESPACE)
+        try:
+            atual = os.path.join(base, versao)
+            os.makedirs(atual, exist_ok=True)
+            open(os.path.join(atual, CACHE_MARKER), "a").close()
+            for nome in os.listdir(base):
+                antigo = os.path.join(base, nome)
+                if (nome != versao and _VERSION_DIR_RE.match(nome)
+                        and os.path.isfile(os.path.join(antigo, CACHE_MARKER))):
+                    shutil.rmtree(antigo, ignore_errors=True)
+            self._dir = atual
+        except Exception as e:
+            if DEBUG: print(f"[ircode_cache] disco indisponível ({cache_dir}): {e}")
+            self._dir = None
+
+    def disable_disk(self) -> None:
+        self._dir = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._dir, key[:2], key + ".json")
+
+    def _disk_get(self, key: str) -> dict | None:
+        if not self._dir:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _disk_put(self, key: str, value: dict) -> None:
+        if not self._dir:
+            return
+        path = self._path(key)
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except Exception as e:
+            if DEBUG: print(f"[ircode_cache] falha ao gravar {path}: {e}")
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+
+    # ---------------- núcleo ----------------
+    def _get_or_compute(self, key: str, compute):
+        with self._lock:
+            value = self._mem.get(key)
+            if value is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(value)
+
+        value = self._disk_get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+                self.disk_hits += 1
+                self._store(key, value)
+            return copy.deepcopy(value)
+
+        value = compute()
+        with self._lock:
+            self.misses += 1
+        # não guarda falhas (None, dict com "error" preenchido)
+        if not isinstance(value, dict) or value.get("error"):
+            return value
+        with self._lock:
+            self._store(key, copy.deepcopy(value))
+        self._disk_put(key, value)
+        return value
+
+    def _store(self, key: str, value: dict) -> None:
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+            self.evictions += 1
+
+
+# Instância compartilhada (só memória; a interface liga o disco com enable_disk()).
+IR_CACHE = ConversionCache()
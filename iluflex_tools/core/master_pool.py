@@ -0,0 +1,283 @@
+"""Pool de conexões para operar várias masters (IC-315/IC-215) ao mesmo tempo.
+
+Cada master é identificada por uma chave (MAC, de preferência, ou IP) e tem
+sua própria sessão AsyncConnectionService. O pool:
+  - conecta sob demanda e reaproveita sessões abertas;
+  - limita o número de sessões abertas (max_connections, descarta a menos
+    usada que estiver ociosa) e o número de operações simultâneas
+    (max_concurrency);
+  - fecha sessões ociosas há mais de idle_timeout segundos (tarefa
+    periódica, ativa enquanto houver sessões abertas);
+  - entrega eventos por conexão (add_listener(cb, key)) ou de todas
+    (add_listener(cb)); os eventos ganham o campo "key".
+
+Uso (num event loop, ou via TkAsyncioLoop na UI):
+    pool = MasterPool()
+    for dev in NetworkService().scan_masters(3000):
+        pool.register_found(dev)
+    results = await pool.broadcast(build_srf16_sequence(cfg))
+    for key, res in results.items():
+        print(key, res.ok, res.error)
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List
+
+from iluflex_tools.core.async_client import AsyncConnectionService
+from iluflex_tools.core.protocols.rrf16 import settle_step
+from iluflex_tools.core.protocols.srf import reply_matcher
+from iluflex_tools.core.protocols.types import SequenceStep
+
+DEBUG = False
+
+DEFAULT_PORT = 4999
+
+
+# Os passos usam o mesmo tipo (e a mesma classificação, settle_step) do
+# run_srf_sequence: um RRF,16,x,0 de erro conta como "erro" aqui também.
+StepResult = SequenceStep
+
+
+@dataclass
+class MasterResult:
+    key: str
+    remote: tuple[str, int] = ("", 0)
+    steps: List[SequenceStep] = field(default_factory=list)
+    error: str = ""
+    elapsed_s: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.error and all(s.ok for s in self.steps)
+
+
+class MasterPool:
+    def __init__(self, port: int = DEFAULT_PORT, max_connections: int = 32, max_concurrency: int = 8,
+                 idle_timeout: float = 120.0, connect_timeout: float = 3.0,
+                 factory: Callable[[], AsyncConnectionService] = AsyncConnectionService):
+        self.port = port
+        self.max_connections = max(1, max_connections)
+        self.max_concurrency = max(1, max_concurrency)
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self._factory = factory
+        self._addr: Dict[str, tuple[str, int]] = {}
+        self._conns: "OrderedDict[str, AsyncConnectionService]" = OrderedDict()  # ordem = LRU
+        self._last_used: Dict[str, float] = {}
+        self._busy: Dict[str, int] = {}
+        self._key_locks: Dict[str, asyncio.Lock] = {}
+        self._sem: asyncio.Semaphore | None = None
+        self._listeners: Dict[str | None, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._reaper: asyncio.Task | None = None
+        self.evictions = 0
+
+    # ---------------- cadastro ----------------
+    @staticmethod
+    def normalize_key(key: str) -> str:
+        return (key or "").strip().lower()
+
+    def register(self, key: str, ip: str, port: int | None = None) -> str:
+        """Associa a chave (MAC ou IP) ao endereço. Retorna a chave normalizada."""
+        k = self.normalize_key(key) or ip.strip()
+        self._addr[k] = (ip.strip(), int(port or self.port))
+        return k
+
+    def register_found(self, dev: dict, port: int | None = None) -> str:
+        """Cadastra um dicionário do NetworkService.scan_masters (MAC/IP)."""
+        return self.register(dev.get("MAC") or dev.get("IP", ""), dev.get("IP", ""), port)
+
+    def keys(self) -> list[str]:
+        return list(self._addr)
+
+    # ---------------- listeners ----------------
+    def add_listener(self, cb: Callable[[Dict[str, Any]], None], key: str | None = None):
+        """key=None recebe eventos de todas as conexões."""
+        k = self.normalize_key(key) if key else None
+        lst = self._listeners.setdefault(k, [])
+        if cb not in lst:
+            lst.append(cb)
+
+    def remove_listener(self, cb: Callable[[Dict[str, Any]], None], key: str | None = None):
+        k = self.normalize_key(key) if key else None
+        lst = self._listeners.get(k, [])
+        if cb in lst:
+            lst.remove(cb)
+
+    def _dispatch(self, key: str, ev: Dict[str, Any]):
+        ev = dict(ev, key=key)
+        for cb in list(self._listeners.get(key, ())) + list(self._listeners.get(None, ())):
+            try:
+                cb(ev)
+            except Exception:
+                pass  # não derruba o loop de eventos
+
+    # ---------------- sessões ----------------
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        return self._sem
+
+    async def get(self, key: str) -> AsyncConnectionService:
+        """Sessão conectada para a chave (conecta se necessário)."""
+        k = self.normalize_key(key)
+        if k not in self._addr:
+            raise KeyError(f"master não cadastrada: {key}")
+        await self.evict_idle()
+        lock = self._key_locks.setdefault(k, asyncio.Lock())
+        async with lock:
+            conn = self._conns.get(k)
+            if conn is None:
+                await self._make_room()
+                conn = self._factory()
+                conn.add_listener(lambda ev, k=k: self._dispatch(k, ev))
+                self._conns[k] = conn
+                self._ensure_reaper()
+            self._conns.move_to_end(k)
+            self._last_used[k] = time.monotonic()
+            if not conn.get_is_connected():
+                ip, port = self._addr[k]
+                if not await conn.connect(ip, port, timeout=self.connect_timeout):
+                    raise ConnectionError(f"não foi possível conectar em {ip}:{port}")
+            return conn
+
+    async def _make_room(self):
+        """Fecha as sessões ociosas menos usadas até caber mais uma."""
+        for k in list(self._conns):
+            if len(self._conns) < self.max_connections:
+                return
+            if not self._busy.get(k):
+                await self.close(k)
+                self.evictions += 1
+
+    async def evict_idle(self, now: float | None = None) -> list[str]:
+        """Fecha sessões sem uso há mais de idle_timeout. Retorna as chaves fechadas."""
+        now = time.monotonic() if now is None else now
+        fechadas = []
+        for k in list(self._conns):
+            if not self._busy.get(k) and now - self._last_used.get(k, now) > self.idle_timeout:
+                await self.close(k)
+                self.evictions += 1
+                fechadas.append(k)
+        return fechadas
+
+    def _ensure_reaper(self):
+        """Agenda a varredura periódica de ociosas (uma por pool, no loop atual)."""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_idle())
+
+    async def _reap_idle(self):
+        """Roda evict_idle a cada idle_timeout/4 (no máximo 30s) até o pool esvaziar."""
+        interval = min(30.0, max(0.05, self.idle_timeout / 4))
+        try:
+            while self._conns:
+                await asyncio.sleep(interval)
+                fechadas = await self.evict_idle()
+                if DEBUG and fechadas: print(f"[POOL] ociosas fechadas: {fechadas}")
+        finally:
+            if self._reaper is asyncio.current_task():
+                self._reaper = None
+
+    async def close(self, key: str):
+        k = self.normalize_key(key)
+        conn = self._conns.pop(k, None)
+        self._last_used.pop(k, None)
+        if conn is not None:
+            await conn.disconnect()
+
+    async def close_all(self):
+        reaper, self._reaper = self._reaper, None
+        if reaper is not None and reaper is not asyncio.current_task():
+            reaper.cancel()
+        for k in list(self._conns):
+            await self.close(k)
+
+    def stats(self) -> dict:
+        return {
+            "registered": len(self._addr),
+            "open": len(self._conns),
+            "busy": sum(1 for v in self._busy.values() if v),
+            "evictions": self.evictions,
+        }
+
+    # ---------------- operações ----------------
+    async def request(self, key: str, cmd: str, expect=None, timeout: float = 3.0) -> str:
+        """Envia cmd à master e aguarda a resposta (padrão: RRF,a,b de SRF,a,b)."""
+        k = self.normalize_key(key)
+        async with self._semaphore():
+            self._busy[k] = self._busy.get(k, 0) + 1
+            try:
+                conn = await self.get(k)
+                line = cmd.rstrip("\r\n") + "\r"
+                return await conn.request(line, expect or reply_matcher(cmd), timeout)
+            finally:
+                self._busy[k] -= 1
+                self._last_used[k] = time.monotonic()
+
+    async def run_sequence(self, key: str, commands: Iterable[str], timeout: float = 3.0,
+                           stop_on_error: bool = True) -> MasterResult:
+        """Envia os comandos em ordem para uma master, aguardando cada RRF."""
+        k = self.normalize_key(key)
+        res = MasterResult(key=k, remote=self._addr.get(k, ("", 0)))
+        t0 = time.monotonic()
+        async with self._semaphore():
+            self._busy[k] = self._busy.get(k, 0) + 1
+            try:
+                conn = await self.get(k)
+                for cmd in commands:
+                    step = SequenceStep(cmd=cmd, attempts=1)
+                    ts = time.monotonic()
+                    try:
+                        settle_step(step, await conn.request(cmd.rstrip("\r\n") + "\r", reply_matcher(cmd), timeout))
+                    except Exception as e:
+                        settle_step(step, exc=e)
+                    step.elapsed_s = time.monotonic() - ts
+                    res.steps.append(step)
+                    if step.error and stop_on_error:
+                        break
+            except Exception as e:
+                res.error = str(e) or type(e).__name__
+            finally:
+                self._busy[k] -= 1
+                self._last_used[k] = time.monotonic()
+        res.elapsed_s = time.monotonic() - t0
+        if DEBUG: print(f"[POOL] {k} ok={res.ok} em {res.elapsed_s:.3f}s")
+        return res
+
+    async def broadcast(self, commands: Iterable[str], keys: Iterable[str] | None = None,
+                        timeout: float = 3.0, stop_on_error: bool = True,
+                        on_result: Callable[[MasterResult], None] | None = None) -> Dict[str, MasterResult]:
+        """Envia a mesma sequência SRF a várias masters em paralelo (limitado
+        por max_concurrency). Retorna {chave: MasterResult} na ordem das chaves."""
+        cmds = list(commands)
+        alvo = [self.normalize_key(k) for k in (keys if keys is not None else self._addr)]
+
+        async def one(k: str) -> MasterResult:
+            r = await self.run_sequence(k, cmds, timeout, stop_on_error)
+            if on_result:
+                try:
+                    on_result(r)
+                except Exception:
+                    pass
+            return r
+
+        results = await asyncio.gather(*(one(k) for k in alvo))
+        return {r.key: r for r in results}
+
+    async def broadcast_send(self, data, keys: Iterable[str] | None = None) -> Dict[str, bool]:
+        """Envia data sem aguardar resposta; {chave: enviado}."""
+        alvo = [self.normalize_key(k) for k in (keys if keys is not None else self._addr)]
+
+        async def one(k: str) -> bool:
+            async with self._semaphore():
+                try:
+                    return await (await self.get(k)).send(data)
+                except Exception:
+                    return False
+                finally:
+                    self._last_used[k] = time.monotonic()
+
+        return dict(zip(alvo, await asyncio.gather(*(one(k) for k in alvo))))
@@ -0,0 +1,334 @@
+"""Descoberta UDP dos masters IC-315/IC-215 em todas as interfaces IPv4.
+
+Protocolo: envia "Discovery: Who is out there?" para a porta 30303; cada
+master responde (unicast, para a porta de origem) com várias linhas, a
+primeira começando com "Found:"/"FOUND:" (ver parse_found).
+
+O DiscoveryEngine:
+  - enumera as interfaces IPv4 locais (psutil, se instalado; senão ioctl no
+    Linux; por último o IP da rota padrão, assumindo /24);
+  - abre um socket por interface e envia, por ele, o broadcast dirigido da
+    sub-rede (ex.: 192.168.1.255) e o 255.255.255.255, com retransmissões;
+  - recebe todas as respostas num único selector e entrega cada master
+    assim que chega (iter_found / on_found), sem duplicatas (MAC ou IP);
+  - termina cedo quando chegou o número esperado de masters ou quando as
+    respostas param por quiet_s segundos (depois da última retransmissão).
+
+Uso:
+    eng = DiscoveryEngine()
+    for dev in eng.iter_found(5000):
+        print(dev["NAME"], dev["IP"])
+    devs = eng.scan(5000, on_found=cb, expected=3)
+"""
+from __future__ import annotations
+
+import ipaddress
+import selectors
+import socket
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+try:  # opcional: enumeração de interfaces em qualquer SO
+    import psutil  # type: ignore
+except Exception:  # pragma: no cover - depende do ambiente
+    psutil = None
+
+DEBUG = False
+
+DISCOVERY_PORT = 30303
+DISCOVERY_PAYLOAD = b"Discovery: Who is out there?"
+LIMITED_BROADCAST = "255.255.255.255"
+
+
+def parse_found(payload: bytes) -> dict | None:
+    """Resposta 'Found:' -> dict NAME, MAC, IP, MASCARA, GATEWAY, DHCP, FLAG.
+    Aceita SOMENTE payloads cuja primeira linha começa com Found:/FOUND:."""
+    try:
+        text = payload.decode(errors="ignore").replace("\r", "")
+        lines = [ln.strip() for ln in text.split("\n") if ln.strip()]
+        if not lines:
+            return None
+        first = lines[0]
+        if not (first.startswith("Found:") or first.startswith("FOUND:")):
+            return None
+
+        # os demais campos são por posição; toleramos faltantes
+        fields = (lines[1:8] + [""] * 7)[:7]
+        name, mac, ip, mask, gateway, dhcp, flag = fields
+        return {
+            "NAME": name,
+            "MAC": mac.lower(),
+            "IP": ip,
+            "MASCARA": mask,
+            "GATEWAY": gateway,
+            "DHCP": dhcp,
+            "FLAG": flag,
+        }
+    except Exception:
+        return None
+
+
+def found_key(dev: dict) -> str:
+    """Chave de deduplicação: MAC, ou IP quando a master não informa o MAC."""
+    return dev.get("MAC") or dev.get("IP") or repr(dev)
+
+
+# --------- interfaces locais ---------
+
+@dataclass(slots=True)
+class LocalInterface:
+    ip: str
+    prefixlen: int = 24
+    name: str = ""
+
+    @property
+    def network(self) -> ipaddress.IPv4Network:
+        return ipaddress.IPv4Network(f"{self.ip}/{self.prefixlen}", strict=False)
+
+    @property
+    def broadcast(self) -> str:
+        return str(self.network.broadcast_address)
+
+    def contains(self, ip: str) -> bool:
+        try:
+            return ipaddress.IPv4Address(ip) in self.network
+        except ValueError:
+            return False
+
+
+def _mask_to_prefix(mask: str) -> int:
+    try:
+        return ipaddress.IPv4Network(f"0.0.0.0/{mask}").prefixlen
+    except ValueError:
+        return 24
+
+
+def _from_psutil() -> List[LocalInterface]:
+    out = []
+    for name, addrs in psutil.net_if_addrs().items():
+        for a in addrs:
+            if a.family == socket.AF_INET and a.address:
+                out.append(LocalInterface(a.address, _mask_to_prefix(a.netmask or ""), name))
+    return out
+
+
+def _from_ioctl() -> List[LocalInterface]:
+    import fcntl
+    import struct
+    SIOCGIFADDR, SIOCGIFNETMASK = 0x8915, 0x891B
+    out = []
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for _idx, name in socket.if_nameindex():
+            req = struct.pack("256s", name.encode()[:15])
+            try:
+                ip = socket.inet_ntoa(fcntl.ioctl(s.fileno(), SIOCGIFADDR, req)[20:24])
+                mask = socket.inet_ntoa(fcntl.ioctl(s.fileno(), SIOCGIFNETMASK, req)[20:24])
+            except OSError:
+                continue  # interface sem IPv4
+            out.append(LocalInterface(ip, _mask_to_prefix(mask), name))
+    finally:
+        s.close()
+    return out
+
+
+def _from_hostname() -> List[LocalInterface]:
+    ips = []
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            s.connect(("8.8.8.8", 80))  # não envia nada; só escolhe a rota padrão
+            ips.append(s.getsockname()[0])
+        finally:
+            s.close()
+    except Exception:
+        pass
+    try:
+        for info in socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET):
+            ips.append(info[4][0])
+    except Exception:
+        pass
+    return [LocalInterface(ip, 24) for ip in ips]
+
+
+def local_ipv4_interfaces(include_loopback: bool = False) -> List[LocalInterface]:
+    """Interfaces IPv4 da máquina (sem duplicatas; loopback só se pedido)."""
+    sources: list[Callable[[], List[LocalInterface]]] = []
+    if psutil is not None:
+        sources.append(_from_psutil)
+    if sys.platform.startswith("linux"):
+        sources.append(_from_ioctl)
+    sources.append(_from_hostname)
+
+    for source in sources:
+        try:
+            found = source()
+        except Exception as e:
+            if DEBUG: print(f"[DISC] {source.__name__} falhou: {e}")
+            continue
+        out, seen = [], set()
+        for itf in found:
+            if itf.ip in seen or itf.ip == "0.0.0.0":
+                continue
+            if not include_loopback and itf.ip.startswith("127."):
+                continue
+            seen.add(itf.ip)
+            out.append(itf)
+        if out:
+            return out
+    return []
+
+
+# --------- engine ---------
+
+class DiscoveryEngine:
+    def __init__(self, port: int = DISCOVERY_PORT, payload: bytes = DISCOVERY_PAYLOAD,
+                 retransmits: int = 2, interval_s: float = 0.25, quiet_s: float | None = 1.0,
+                 interfaces: Optional[Sequence[LocalInterface]] = None):
+        self.port = port
+        self.payload = payload
+        self.retransmits = max(0, int(retransmits))
+        self.interval_s = interval_s
+        self.quiet_s = quiet_s
+        self.interfaces = list(interfaces) if interfaces is not None else None
+        self.stats: Dict[str, object] = {}
+
+    def broadcast_targets(self, itf: LocalInterface) -> List[tuple[str, int]]:
+        """Broadcast dirigido da sub-rede + broadcast limitado, pela interface itf."""
+        targets = []
+        if itf.prefixlen < 31:
+            targets.append((itf.broadcast, self.port))
+        targets.append((LIMITED_BROADCAST, self.port))
+        return targets
+
+    def _open_sockets(self, interfaces: Sequence[LocalInterface]) -> List[tuple[socket.socket, Optional[LocalInterface]]]:
+        socks = []
+        for itf in interfaces:
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+            try:
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+                s.bind((itf.ip, 0))  # força a saída pela interface e recebe o unicast de volta
+                s.setblocking(False)
+                if hasattr(socket, "SIO_UDP_CONNRESET"):
+                    # Windows: ICMP "port unreachable" de um unicast não derruba o recvfrom
+                    s.ioctl(socket.SIO_UDP_CONNRESET, False)
+                socks.append((s, itf))
+            except OSError as e:
+                if DEBUG: print(f"[DISC] bind {itf.ip} falhou: {e}")
+                s.close()
+        if not socks:
+            # sem interfaces utilizáveis: deixa o SO escolher
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            s.bind(("", 0))
+            s.setblocking(False)
+            socks.append((s, None))
+        return socks
+
+    def _plan(self, socks, targets: Optional[Iterable[tuple[str, int]]]) -> List[tuple[socket.socket, tuple[str, int]]]:
+        """Lista (socket, destino) de uma rodada de envio."""
+        plan = []
+        if targets is None:
+            for s, itf in socks:
+                dests = self.broadcast_targets(itf) if itf is not None else [(LIMITED_BROADCAST, self.port)]
+                plan.extend((s, d) for d in dests)
+            return plan
+        for t in targets:
+            # destino unicast sai pela interface da mesma sub-rede
+            s = next((s for s, itf in socks if itf is not None and itf.contains(t[0])), socks[0][0])
+            plan.append((s, t))
+        return plan
+
+    def iter_found(self, timeout_ms: int, expected: int | None = None,
+                   targets: Optional[Iterable[tuple[str, int]]] = None) -> Iterator[dict]:
+        """Gera cada master (dict de parse_found) assim que a resposta chega.
+        targets: destinos (ip, porta) explícitos; None = broadcasts de todas as interfaces."""
+        t0 = time.monotonic()
+        deadline = t0 + max(0.2, float(timeout_ms) / 1000.0)
+        interfaces = self.interfaces if self.interfaces is not None else local_ipv4_interfaces()
+        socks = self._open_sockets(interfaces)
+        plan = self._plan(socks, targets)
+        stats = {"interfaces": [itf.ip for _s, itf in socks if itf is not None], "sent": 0,
+                 "received": 0, "found": 0, "reason": "timeout", "elapsed_s": 0.0}
+        self.stats = stats
+
+        sel = selectors.DefaultSelector()
+        for s, _itf in socks:
+            sel.register(s, selectors.EVENT_READ)
+        seen: set[str] = set()
+        rounds = self.retransmits + 1
+        sent_rounds = 0
+        next_send = t0
+        last_activity = t0
+        try:
+            while True:
+                now = time.monotonic()
+                if sent_rounds < rounds and now >= next_send:
+                    for s, dest in plan:
+                        try:
+                            s.sendto(self.payload, dest)
+                            stats["sent"] += 1
+                        except OSError as e:
+                            if DEBUG: print(f"[DISC] sendto {dest} falhou: {e}")
+                    sent_rounds += 1
+                    next_send = now + self.interval_s
+                    last_activity = max(last_activity, now)
+
+                if now >= deadline:
+                    break
+                if (self.quiet_s is not None and sent_rounds >= rounds
+                        and now - last_activity >= self.quiet_s):
+                    stats["reason"] = "quiet"
+                    break
+
+                wait = deadline - now
+                if sent_rounds < rounds:
+                    wait = min(wait, max(0.0, next_send - now))
+                if self.quiet_s is not None:
+                    wait = min(wait, max(0.0, last_activity + self.quiet_s - now))
+                for key, _mask in sel.select(max(0.0, wait)):
+                    while True:
+                        try:
+                            data, _addr = key.fileobj.recvfrom(4096)
+                        except (BlockingIOError, InterruptedError):
+                            break
+                        except OSError:
+                            break  # ex.: ICMP port unreachable no Windows
+                        stats["received"] += 1
+                        dev = parse_found(data)
+                        if not dev:
+                            continue
+                        last_activity = time.monotonic()
+                        k = found_key(dev)
+                        if k in seen:
+                            continue
+                        seen.add(k)
+                        stats["found"] += 1
+                        yield dev
+                        if expected and len(seen) >= expected:
+                            stats["reason"] = "expected"
+                            return
+        finally:
+            stats["elapsed_s"] = time.monotonic() - t0
+            sel.close()
+            for s, _itf in socks:
+                try:
+                    s.close()
+                except Exception:
+                    pass
+            if DEBUG: print(f"[DISC] {stats}")
+
+    def scan(self, timeout_ms: int, on_found: Callable[[dict], None] | None = None,
+             expected: int | None = None, targets: Optional[Iterable[tuple[str, int]]] = None) -> List[dict]:
+        """Versão que coleta a lista; on_found é chamado a cada master nova."""
+        results: List[dict] = []
+        for dev in self.iter_found(timeout_ms, expected=expected, targets=targets):
+            results.append(dev)
+            if on_found:
+                try:
+                    on_found(dev)
+                except Exception:
+                    pass
+        return results
@@ -0,0 +1,135 @@
+"""Varredura unicast da sub-rede, para redes que bloqueiam broadcast.
+
+Muitas redes de cliente descartam 255.255.255.255 e a busca por broadcast
+não acha nada. O SubnetSweeper sonda cada host da rede:
+  - UDP: o mesmo datagrama de descoberta ("Discovery: Who is out there?",
+    porta 30303) enviado em unicast a todos os hosts de uma vez pelo
+    DiscoveryEngine (respostas completas: nome, MAC, IP...);
+  - TCP: connect na porta 4999 (asyncio, até `concurrency` conexões em
+    paralelo, timeout por host) para os hosts que não responderam ao UDP;
+    um connect aceito vira um item só com IP (FLAG = "tcp"). A conexão é
+    fechada logo em seguida.
+Rede padrão: a /24 de cada interface local (ou o CIDR informado, validado
+com ipaddress como no IPv4ConfigValidator). Uma /24 termina em ~2 s.
+
+Uso:
+    sw = SubnetSweeper()
+    devs = sw.sweep("192.168.1.0/24", on_found=cb)
+"""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import time
+from typing import Callable, Iterable, List, Optional
+
+from iluflex_tools.core.net_discovery import DiscoveryEngine, LocalInterface, found_key, local_ipv4_interfaces
+
+DEBUG = False
+
+TCP_PORT = 4999
+MAX_SWEEP_HOSTS = 4096   # /20; acima disso a varredura deixa de ser "rápida"
+
+
+def parse_network(cidr: str) -> ipaddress.IPv4Network:
+    """'192.168.1.0/24', '192.168.1.10/24' ou '192.168.1.0/255.255.255.0'.
+    Levanta ValueError com a mensagem para a UI."""
+    text = (cidr or "").strip()
+    if "/" not in text:
+        text += "/24"
+    try:
+        net = ipaddress.IPv4Network(text, strict=False)
+    except Exception as e:
+        raise ValueError(f"Rede inválida: {e}") from None
+    if net.num_addresses > MAX_SWEEP_HOSTS:
+        raise ValueError(f"Rede grande demais para varredura (/{net.prefixlen}, máximo {MAX_SWEEP_HOSTS} endereços).")
+    return net
+
+
+def local_networks(interfaces: Optional[Iterable[LocalInterface]] = None) -> List[ipaddress.IPv4Network]:
+    """A /24 (ou a própria rede, se menor) de cada interface local."""
+    nets = []
+    for itf in (interfaces if interfaces is not None else local_ipv4_interfaces()):
+        net = itf.network if itf.prefixlen >= 24 else ipaddress.IPv4Network(f"{itf.ip}/24", strict=False)
+        if net not in nets:
+            nets.append(net)
+    return nets
+
+
+class SubnetSweeper:
+    def __init__(self, engine: DiscoveryEngine | None = None, tcp_port: int = TCP_PORT,
+                 concurrency: int = 256, host_timeout_s: float = 0.6):
+        self.engine = engine or DiscoveryEngine(quiet_s=0.6)
+        self.tcp_port = tcp_port
+        self.concurrency = max(1, int(concurrency))
+        self.host_timeout_s = host_timeout_s
+        self.stats: dict = {}
+
+    def hosts(self, cidr: str | None = None) -> List[str]:
+        """Hosts a sondar (sem os IPs da própria máquina)."""
+        interfaces = self.engine.interfaces if self.engine.interfaces is not None else local_ipv4_interfaces()
+        nets = [parse_network(cidr)] if cidr else local_networks(interfaces)
+        own = {itf.ip for itf in interfaces}
+        out, seen = [], set()
+        for net in nets:
+            for h in (net.hosts() if net.prefixlen < 31 else net):
+                ip = str(h)
+                if ip not in own and ip not in seen:
+                    seen.add(ip)
+                    out.append(ip)
+        return out
+
+    def sweep(self, cidr: str | None = None, timeout_ms: int = 3000,
+              on_found: Callable[[dict], None] | None = None,
+              udp: bool = True, tcp: bool = True) -> List[dict]:
+        """Sonda a rede e chama on_found a cada master nova (mesmo formato de
+        NetworkService.scan_masters). Bloqueante: usar numa thread de trabalho
+        (não numa thread que já roda um event loop)."""
+        t0 = time.monotonic()
+        hosts = self.hosts(cidr)
+        results: List[dict] = []
+        seen: set[str] = set()
+        answered: set[str] = set()
+
+        def emit(dev: dict):
+            k = found_key(dev)
+            if k in seen:
+                return
+            seen.add(k)
+            answered.add(dev.get("IP", ""))
+            results.append(dev)
+            if on_found:
+                try:
+                    on_found(dev)
+                except Exception:
+                    pass
+
+        if udp and hosts:
+            port = self.engine.port
+            self.engine.scan(timeout_ms, on_found=emit, targets=[(h, port) for h in hosts])
+        if tcp and hosts:
+            pending = [h for h in hosts if h not in answered]
+            asyncio.run(self._tcp_probe(pending, emit))
+
+        self.stats = {"hosts": len(hosts), "found": len(results), "elapsed_s": time.monotonic() - t0}
+        if DEBUG: print(f"[SWEEP] {self.stats}")
+        return results
+
+    async def _tcp_probe(self, hosts: List[str], emit: Callable[[dict], None]) -> None:
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(ip: str):
+            async with sem:
+                try:
+                    _r, w = await asyncio.wait_for(asyncio.open_connection(ip, self.tcp_port),
+                                                   self.host_timeout_s)
+                except (OSError, asyncio.TimeoutError):
+                    return
+                w.close()
+                try:
+                    await w.wait_closed()
+                except Exception:
+                    pass
+                emit({"NAME": "", "MAC": "", "IP": ip, "MASCARA": "", "GATEWAY": "", "DHCP": "", "FLAG": "tcp"})
+
+        await asyncio.gather(*(one(h) for h in hosts))
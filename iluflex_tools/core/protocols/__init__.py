@@ -2,8 +2,9 @@
 from .registry import ParserRegistry
 from .discovery import DiscoveryFoundParser
 from .rrf10 import RRF10Parser
-from .rrf16 import RRF16_6Parser, RRF16_9Parser, build_srf16_sequence
-from .types import IPv4Config, IPv4Snapshot
+from .rrf16 import RRF16_6Parser, RRF16_9Parser, build_srf16_sequence, run_srf_sequence, settle_step
+from .srf import reply_prefix, reply_matcher
+from .types import IPv4Config, IPv4Snapshot, SequenceResult, SequenceStep
 from .ipvalidator import IPv4ConfigValidator
 
 def make_default_registry() -> ParserRegistry:
@@ -3,6 +3,11 @@ from abc import ABC, abstractmethod
 from typing import Optional, Any
 
 class BaseParser(ABC):
+    # Prefixos de linha tratados pelo parser (ex.: "RRF,10,"), terminados em
+    # "," ou ":". O ParserRegistry usa para despachar sem testar todos os
+    # parsers; vazio = o registry chama match() em toda linha.
+    prefixes: tuple[str, ...] = ()
+
     @abstractmethod
     def match(self, line: str) -> bool: ...
     @abstractmethod
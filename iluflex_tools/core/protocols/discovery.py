@@ -5,6 +5,8 @@ from .types import DiscoveryFoundRaw
 
 class DiscoveryFoundParser(BaseParser):
     """Aceita SOMENTE linhas que começam com 'Found:' ou 'FOUND:'."""
+    prefixes = ("Found:", "FOUND:")
+
     def match(self, line: str) -> bool:
         s = line.lstrip()
         return s.startswith("Found:") or s.startswith("FOUND:")
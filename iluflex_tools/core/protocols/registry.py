@@ -1,27 +1,127 @@
 from __future__ import annotations
-from typing import List, Any
+import codecs
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from .base import BaseParser
 
+_DELIMS = ",:"
+
+
 class ParserRegistry:
+    """Despacha cada linha para o primeiro parser registrado que a reconhece.
+
+    Parsers que declaram `prefixes` ficam num dicionário indexado pelo
+    cabeçalho da linha (ex.: "RRF,16,6,"), então o custo por linha não cresce
+    com o número de parsers. Os demais são testados com match() em ordem.
+    """
+
     def __init__(self) -> None:
         self._parsers: list[BaseParser] = []
+        self._by_prefix: Dict[str, list[int]] = {}
+        self._fallback: list[int] = []
+        self._max_prefix = 0
+        self._hits: list[int] = []
+        self._parsed: list[int] = []
+        self._time: list[float] = []
+        self.unmatched = 0
 
     def register(self, parser: BaseParser) -> "ParserRegistry":
+        idx = len(self._parsers)
         self._parsers.append(parser)
+        self._hits.append(0)
+        self._parsed.append(0)
+        self._time.append(0.0)
+        prefixes = tuple(getattr(parser, "prefixes", ()) or ())
+        if prefixes and all(p and p[-1] in _DELIMS for p in prefixes):
+            for p in prefixes:
+                self._by_prefix.setdefault(p, []).append(idx)
+                self._max_prefix = max(self._max_prefix, len(p))
+        else:
+            self._fallback.append(idx)
         return self
 
+    # ---------------- despacho ----------------
+    def _candidates(self, line: str) -> list[int]:
+        found: list[int] = []
+        by_prefix = self._by_prefix
+        if by_prefix:
+            for k, ch in enumerate(line[:self._max_prefix]):
+                if ch in _DELIMS:
+                    idxs = by_prefix.get(line[:k + 1])
+                    if idxs:
+                        found.extend(idxs)
+        if self._fallback:
+            found.extend(self._fallback)
+            found.sort()
+        elif len(found) > 1:
+            found.sort()
+        return found
+
+    def parse_line(self, line: str) -> Optional[Any]:
+        """Interpreta uma linha (já sem \\r\\n). None se nenhum parser aceitar."""
+        line = line.strip()
+        if not line:
+            return None
+        for idx in self._candidates(line):
+            p = self._parsers[idx]
+            if p.match(line):
+                t0 = time.perf_counter()
+                obj = p.parse(line)
+                self._time[idx] += time.perf_counter() - t0
+                self._hits[idx] += 1
+                if obj is not None:
+                    self._parsed[idx] += 1
+                return obj
+        self.unmatched += 1
+        return None
+
     def parse_lines(self, text: str) -> List[Any]:
         results: list[Any] = []
         if not text:
             return results
         for raw in text.splitlines():
-            line = raw.strip()
-            if not line:
-                continue
-            for p in self._parsers:
-                if p.match(line):
-                    obj = p.parse(line)
-                    if obj is not None:
-                        results.append(obj)
-                    break
+            obj = self.parse_line(raw)
+            if obj is not None:
+                results.append(obj)
         return results
+
+    def parse_iter(self, chunks: Iterable[bytes | str], encoding: str = "utf-8") -> Iterator[Any]:
+        """Versão incremental: recebe pedaços (bytes ou str, como chegam do
+        socket) e produz os objetos assim que cada linha se completa. Bytes
+        passam por um decoder incremental: um caractere multibyte dividido
+        entre dois pedaços (ex.: "ç") é montado corretamente."""
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        pending = ""
+        for chunk in chunks:
+            if isinstance(chunk, (bytes, bytearray, memoryview)):
+                chunk = decoder.decode(bytes(chunk))
+            if not chunk:
+                continue
+            lines = (pending + chunk).replace("\r\n", "\n").replace("\r", "\n").split("\n")
+            pending = lines.pop()
+            for line in lines:
+                obj = self.parse_line(line)
+                if obj is not None:
+                    yield obj
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            obj = self.parse_line(pending)
+            if obj is not None:
+                yield obj
+
+    # ---------------- profiling ----------------
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """{nome_do_parser: {"hits", "parsed", "time_s"}}; linhas sem parser em self.unmatched."""
+        out: Dict[str, Dict[str, float]] = {}
+        for idx, p in enumerate(self._parsers):
+            name = type(p).__name__
+            if name in out:
+                name = f"{name}#{idx}"
+            out[name] = {"hits": self._hits[idx], "parsed": self._parsed[idx], "time_s": self._time[idx]}
+        return out
+
+    def reset_stats(self) -> None:
+        self._hits = [0] * len(self._parsers)
+        self._parsed = [0] * len(self._parsers)
+        self._time = [0.0] * len(self._parsers)
+        self.unmatched = 0
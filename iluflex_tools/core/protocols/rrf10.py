@@ -1,72 +1,69 @@
 from __future__ import annotations
 import re
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from .base import BaseParser
 from .types import DeviceStatusRRF10
 
 _MAC = re.compile(r'^[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5}$')
+_N_FIELDS = 13
+
+def parse_rrf10_line(line: str) -> Optional[DeviceStatusRRF10]:
+    """Converte UMA linha 'RRF,10,...' em DeviceStatusRRF10 (None se inválida).
+
+    RRF,10,<slaveID>,<mac>,<sinaldB>,<macPai>,<modelo>,<versaoHW>,<versaoFW>,<data>,<n-saidas>,<n-entradas>,<nome>
+    Parser único do projeto (services.parse_rrf10_line delega para cá).
+    """
+    if not line:
+        return None
+    line = line.strip()
+    if not line.startswith("RRF,10,"):
+        return None
+    # o nome pode conter vírgulas: corta só os 12 primeiros campos
+    parts = line.split(",", _N_FIELDS - 1)
+    if len(parts) < _N_FIELDS:
+        return None
+    try:
+        mac = parts[3].strip()
+        parent_mac = parts[5].strip()
+        nome = parts[12]
+        if "," in nome:
+            nome = ",".join(p.strip() for p in nome.split(","))
+        # valida MACs quando possível (não reprova; só normaliza se inválido)
+        if not _MAC.match(mac):
+            mac = mac.lower()
+        if not _MAC.match(parent_mac):
+            parent_mac = parent_mac.lower()
+        # posicional: mesma ordem dos campos de DeviceStatusRRF10
+        return DeviceStatusRRF10(
+            int(parts[2]), mac, int(parts[4]), parent_mac, parts[6].strip(),
+            int(parts[7]), int(parts[8]), parts[9].strip(), int(parts[10]), int(parts[11]),
+            nome.strip(), line,
+        )
+    except ValueError:
+        return None
+
+def iter_rrf10(text: str) -> Iterator[DeviceStatusRRF10]:
+    """Registros válidos de um blob com várias linhas (ignora o resto)."""
+    if not text:
+        return
+    for raw in text.splitlines():
+        rec = parse_rrf10_line(raw)
+        if rec is not None:
+            yield rec
+
+def parse_rrf10_records(text: str) -> List[DeviceStatusRRF10]:
+    return list(iter_rrf10(text))
 
 class RRF10Parser(BaseParser):
     """RRF,10,<slaveID>,<mac>,<sinaldB>,<macPai>,<modelo>,<versaoHW>,<versaoFW>,<data>,<n-saidas>,<n-entradas>,<nome>"""
+    prefixes = ("RRF,10,",)
 
     def match(self, line: str) -> bool:
         return line.startswith("RRF,10,")
 
     def parse(self, line: str) -> Optional[DeviceStatusRRF10]:
-        parts = [p.strip() for p in line.split(",")]
-        if len(parts) < 13:
-            return None
-        try:
-            slave_id      = int(parts[2])
-            mac           = parts[3]
-            sinal_db      = int(parts[4])
-            parent_mac    = parts[5]
-            modelo        = parts[6]
-            versao_hw     = int(parts[7])
-            versao_fw     = int(parts[8])
-            data_producao = parts[9]
-            n_saidas      = int(parts[10])
-            n_entradas    = int(parts[11])
-            nome          = ",".join(parts[12:]).strip()
-
-            if not _MAC.match(mac):
-                mac = mac.lower()
-            if not _MAC.match(parent_mac):
-                parent_mac = parent_mac.lower()
-
-            return DeviceStatusRRF10(
-                slave_id=slave_id, mac=mac, sinal_db=sinal_db, parent_mac=parent_mac,
-                modelo=modelo, versao_hw=versao_hw, versao_fw=versao_fw,
-                data_producao=data_producao, n_saidas=n_saidas, n_entradas=n_entradas,
-                nome=nome, raw=line
-            )
-        except Exception:
-            return None
+        return parse_rrf10_line(line)
 
 def parse_rrf10_lines(text: str) -> List[Dict[str, Any]]:
-    """Helper procedural compatível com versões antigas."""
-    out: list[dict] = []
-    if not text:
-        return out
-    for raw in text.splitlines():
-        line = raw.strip()
-        if not line.startswith("RRF,10,"):
-            continue
-        p = RRF10Parser().parse(line)
-        if p is None:
-            continue
-        out.append({
-            "slave_id": p.slave_id,
-            "mac": p.mac,
-            "sinal_db": p.sinal_db,
-            "parent_mac": p.parent_mac,
-            "modelo": p.modelo,
-            "versao_hw": p.versao_hw,
-            "versao_fw": p.versao_fw,
-            "data_producao": p.data_producao,
-            "n_saidas": p.n_saidas,
-            "n_entradas": p.n_entradas,
-            "nome": p.nome,
-            "raw": p.raw,
-        })
-    return out
+    """Helper procedural compatível com versões antigas (dicts)."""
+    return [rec.to_dict() for rec in iter_rrf10(text)]
@@ -1,10 +1,16 @@
 from __future__ import annotations
-from typing import Optional, List
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Iterable, Optional, List
 from .base import BaseParser
-from .types import IPv4Snapshot, IPv4Config
+from .srf import command_head
+from .types import IPv4Snapshot, IPv4Config, SequenceResult, SequenceStep
 
 class RRF16_6Parser(BaseParser):
     """RRF,16,6,{IP},{NETMASK},{GATEWAY},{DNS1},{DNS2},{MAC},{DHCP},{NAME_HOST}"""
+    prefixes = ("RRF,16,6,",)
+
     def match(self, line: str) -> bool:
         return line.startswith("RRF,16,6,")
 
@@ -20,6 +26,8 @@ class RRF16_6Parser(BaseParser):
 
 class RRF16_9Parser(BaseParser):
     """RRF,16,9,{IP},{NETMASK},{GATEWAY},{DNS1},{DNS2},{MAC},{DHCP},{NAME_HOST} (preview próximo boot)"""
+    prefixes = ("RRF,16,9,",)
+
     def match(self, line: str) -> bool:
         return line.startswith("RRF,16,9,")
 
@@ -60,3 +68,112 @@ def build_srf16_sequence(cfg: IPv4Config, *, mesh_ssid: str|None=None, mesh_pass
     # Preview do próximo boot
     cmds.append("SRF,16,9")
     return cmds
+
+
+def is_error_reply(cmd: str, reply: str) -> bool:
+    """RRF,16,x,0 em resposta a SRF,16,x,<valor> indica erro da master.
+
+    Exceção: se o próprio valor enviado é "0" (ex.: SRF,16,5,0 = DHCP), o
+    eco RRF,16,5,0 é a confirmação normal.
+    """
+    head = command_head(cmd)
+    if not head or head[0] != "16":
+        return False
+    sent = cmd.strip().split(",", 3)
+    got = reply.strip().split(",", 3)
+    if len(got) != 4 or got[3].strip() != "0":
+        return False
+    return len(sent) < 4 or sent[3].strip() != "0"
+
+
+def settle_step(step: SequenceStep, reply: str = "", exc: BaseException | None = None) -> SequenceStep:
+    """Classifica um passo concluído: resposta, timeout, falha de envio/conexão
+    ou resposta de erro da master (is_error_reply). Usado por run_srf_sequence
+    e pelo MasterPool, para que as duas vias decidam "ok/erro" do mesmo jeito."""
+    if exc is not None:
+        step.reply = ""
+        step.error = "timeout" if isinstance(exc, (TimeoutError, asyncio.TimeoutError)) else (str(exc) or type(exc).__name__)
+    else:
+        step.reply, step.error = (reply or "").strip(), ""
+        if is_error_reply(step.cmd, step.reply):
+            step.error = "erro"
+    return step
+
+
+def _is_barrier(cmd: str) -> bool:
+    """SRF,16,9 confere o resultado: só sai depois que os anteriores responderam."""
+    return command_head(cmd) == ("16", "9")
+
+
+def run_srf_sequence(engine, commands: Iterable[str], *, window: int = 4, retries: int = 1,
+                     timeout: float | None = None, abort_on_error: bool = True,
+                     on_step: Callable[[int, SequenceStep], None] | None = None) -> SequenceResult:
+    """Executa uma sequência SRF (ex.: build_srf16_sequence) com até `window`
+    comandos em voo, usando um RequestEngine (core.request_engine).
+
+    - Comandos sem resposta são reenviados até `retries` vezes. Os seguintes
+      que já estavam em voo são aguardados e reenviados depois dele, na
+      ordem, e a sequência segue com window=1 (a master aplica em ordem).
+    - Timeout (após os reenvios) ou falha de envio fica só no passo
+      (step.error) e a sequência continua.
+    - Uma resposta de erro (is_error_reply, RRF,16,x,0) interrompe a
+      sequência: os comandos ainda não enviados ficam com error="não enviado".
+    - SRF,16,9 espera todos os anteriores (barreira).
+    - on_step(indice, passo) é chamado na thread do executor a cada passo
+      concluído; a UI deve repassar para a thread do Tk com after().
+
+    Bloqueante: rodar numa thread de trabalho.
+    """
+    cmds = [c.rstrip("\r\n") for c in commands]
+    steps = [SequenceStep(cmd=c) for c in cmds]
+    window = max(1, int(window))
+    inflight: deque = deque()  # (indice, future, enviado_em)
+    done_at: dict[int, float] = {}
+    next_i = 0
+    aborted = False
+    t0 = time.monotonic()
+
+    def launch(i: int):
+        steps[i].attempts += 1
+        fut = engine.submit(cmds[i], timeout=timeout)
+        sent_at = time.monotonic()
+        fut.add_done_callback(lambda _f, i=i: done_at.__setitem__(i, time.monotonic()))
+        return i, fut, sent_at
+
+    while inflight or (next_i < len(cmds) and not aborted):
+        while not aborted and next_i < len(cmds) and len(inflight) < window:
+            if inflight and _is_barrier(cmds[next_i]):
+                break
+            inflight.append(launch(next_i))
+            next_i += 1
+
+        i, fut, sent_at = inflight.popleft()
+        step = steps[i]
+        try:
+            settle_step(step, fut.result())
+        except Exception as e:
+            settle_step(step, exc=e)
+        step.elapsed_s = done_at.get(i, time.monotonic()) - sent_at
+
+        if step.error == "timeout" and step.attempts <= retries and not aborted:
+            for _j, later, _t in inflight:
+                try:
+                    later.result()
+                except Exception:
+                    pass
+            inflight.clear()
+            next_i = i + 1
+            window = 1
+            inflight.append(launch(i))
+            continue
+        if step.error == "erro" and abort_on_error:
+            aborted = True
+        if on_step:
+            try:
+                on_step(i, step)
+            except Exception:
+                pass
+
+    for step in steps[next_i:]:
+        step.error = "não enviado"
+    return SequenceResult(steps=steps, aborted=aborted, elapsed_s=time.monotonic() - t0)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+from typing import Callable, Optional, Tuple
+
+
+def command_head(cmd: str) -> Optional[Tuple[str, ...]]:
+    """'SRF,16,0,192.168.1.10' -> ('16', '0'); 'SRF,10' -> ('10',). None se não for SRF."""
+    line = cmd.strip()
+    if not line.startswith("SRF,"):
+        return None
+    parts = line.split(",")
+    return tuple(p.strip() for p in parts[1:3] if p.strip())
+
+
+def reply_prefix(cmd: str) -> str:
+    """Cabeçalho da resposta esperada: SRF,a,b -> RRF,a,b."""
+    head = command_head(cmd)
+    if not head:
+        return ""
+    return "RRF," + ",".join(head)
+
+
+def reply_matcher(cmd: str) -> Callable[[str], bool]:
+    """Função que reconhece a resposta de cmd (RRF,16,1 não casa com RRF,16,10)."""
+    prefix = reply_prefix(cmd)
+
+    def _match(text: str) -> bool:
+        line = text.strip()
+        return bool(prefix) and line.startswith(prefix) and line[len(prefix):len(prefix) + 1] in ("", ",")
+    return _match
@@ -2,8 +2,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 
+# Registros produzidos pelos parsers: dataclasses com __slots__ (menos memória
+# por dispositivo em dumps grandes da mesh). Conversão para dict só na UI.
 
-@dataclass
+@dataclass(slots=True)
 class DeviceStatusRRF10:
     slave_id: int
     mac: str
@@ -18,7 +20,23 @@ class DeviceStatusRRF10:
     nome: str
     raw: str
 
-@dataclass
+    def to_dict(self) -> dict:
+        return {
+            "slave_id": self.slave_id,
+            "mac": self.mac,
+            "sinal_db": self.sinal_db,
+            "parent_mac": self.parent_mac,
+            "modelo": self.modelo,
+            "versao_hw": self.versao_hw,
+            "versao_fw": self.versao_fw,
+            "data_producao": self.data_producao,
+            "n_saidas": self.n_saidas,
+            "n_entradas": self.n_entradas,
+            "nome": self.nome,
+            "raw": self.raw,
+        }
+
+@dataclass(slots=True)
 class DiscoveryFoundRaw:
     raw: str
 
@@ -34,7 +52,7 @@ class IPv4Config:
     hostname: str = ""
     raw: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class IPv4Snapshot:
     """Snapshot de rede retornado por RRF,16,6/9."""
     ip: str
@@ -51,3 +69,44 @@ class IPv4Snapshot:
     def dhcp(self) -> bool:
         return self.dhcp_flag == "0"
 
+
+@dataclass
+class SequenceStep:
+    """Resultado de um comando de uma sequência SRF (ver run_srf_sequence)."""
+    cmd: str
+    reply: str = ""          # linha RRF recebida ("" se não veio)
+    error: str = ""          # "" = ok; "timeout", "erro", "não enviado", ...
+    attempts: int = 0
+    elapsed_s: float = 0.0   # do último envio até a resposta
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+@dataclass
+class SequenceResult:
+    steps: list[SequenceStep]
+    aborted: bool = False
+    elapsed_s: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.aborted and all(s.ok for s in self.steps)
+
+    @property
+    def first_error(self) -> SequenceStep | None:
+        return next((s for s in self.steps if not s.ok), None)
+
+    def stats(self) -> dict:
+        rtt = [s.elapsed_s for s in self.steps if s.ok]
+        return {
+            "total": len(self.steps),
+            "ok": len(rtt),
+            "failed": sum(1 for s in self.steps if s.attempts and not s.ok),
+            "skipped": sum(1 for s in self.steps if not s.attempts),
+            "retries": sum(max(0, s.attempts - 1) for s in self.steps),
+            "rtt_min_s": min(rtt) if rtt else 0.0,
+            "rtt_avg_s": sum(rtt) / len(rtt) if rtt else 0.0,
+            "rtt_max_s": max(rtt) if rtt else 0.0,
+            "elapsed_s": self.elapsed_s,
+        }
@@ -0,0 +1,232 @@
+"""Correlação requisição/resposta (SRF -> RRF) sobre o ConnectionService.
+
+Cada `SRF,a,b,...` enviado espera a primeira linha `RRF,a,b[,...]` recebida
+depois dele (a master responde na ordem). O engine:
+  - devolve um concurrent.futures.Future por comando (submit) ou bloqueia
+    até a resposta (request);
+  - permite várias requisições em voo ao mesmo tempo (pipelining): não há
+    espera fixa entre comandos, cada um só aguarda a sua resposta;
+  - aplica timeout por comando (parâmetro ou tabela COMMAND_TIMEOUTS);
+  - falha as pendentes com ConnectionError ao desconectar.
+
+Respostas com o mesmo cabeçalho são entregues em ordem (FIFO). Como o
+protocolo não tem identificador de requisição, uma resposta que chegue
+depois do timeout da sua requisição é atribuída à próxima com o mesmo
+cabeçalho. Mensagens não solicitadas continuam chegando normalmente aos
+listeners do ConnectionService.
+
+Uso:
+    eng = engine_for(conn)
+    futs = [eng.submit(c) for c in build_srf16_sequence(cfg)]
+    replies = [f.result() for f in futs]
+    snap = eng.request("SRF,16,6", timeout=2.0)
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List
+
+from iluflex_tools.core.protocols.srf import reply_prefix
+
+DEBUG = False
+
+DEFAULT_TIMEOUT = 3.0
+
+# Comandos que demoram mais para responder (prefixo do comando -> segundos)
+COMMAND_TIMEOUTS = {
+    "SRF,15,5": 35.0,   # cadastro na mesh: aguarda tecla no módulo por até 30 s
+}
+
+Expect = str | re.Pattern | Callable[[str], bool] | None
+
+
+class _Waiter:
+    __slots__ = ("cmd", "key", "match", "future", "deadline", "sent_at")
+
+    def __init__(self, cmd: str, key: str, match, deadline: float):
+        self.cmd = cmd
+        self.key = key            # "RRF,a,b" (fila rápida) ou "" (match customizado)
+        self.match = match
+        self.future: Future = Future()
+        self.deadline = deadline
+        self.sent_at = 0.0
+
+
+class RequestEngine:
+    def __init__(self, conn, default_timeout: float = DEFAULT_TIMEOUT):
+        self.conn = conn
+        self.default_timeout = default_timeout
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, deque[_Waiter]] = {}
+        self._custom: List[_Waiter] = []
+        self._heap: list[tuple[float, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._wake = threading.Condition(self._lock)
+        self._reaper: threading.Thread | None = None
+        self._closed = False
+        self.stats = {"sent": 0, "replied": 0, "timeouts": 0, "errors": 0}
+        conn.add_listener(self._on_event)
+
+    def close(self):
+        self.conn.remove_listener(self._on_event)
+        with self._lock:
+            self._closed = True
+            self._wake.notify_all()
+        self._fail_all(ConnectionError("engine encerrado"))
+
+    # ---------------- API ----------------
+    def submit(self, cmd: str, expect: Expect = None, timeout: float | None = None) -> Future:
+        """Envia cmd e retorna um Future com a linha de resposta (sem \\r)."""
+        line = cmd.rstrip("\r\n")
+        if timeout is None:
+            timeout = self.timeout_for(line)
+        key, match = self._matcher(line, expect)
+        w = _Waiter(line, key, match, time.monotonic() + timeout)
+        if not key and match is None:
+            w.future.set_exception(ValueError(f"não sei qual resposta esperar para {line!r}"))
+            return w.future
+
+        # registra antes de enviar: a resposta pode chegar antes do send retornar
+        with self._lock:
+            if key:
+                self._by_key.setdefault(key, deque()).append(w)
+            else:
+                self._custom.append(w)
+            heapq.heappush(self._heap, (w.deadline, next(self._seq), w))
+            self._ensure_reaper()
+            self._wake.notify()
+
+        w.sent_at = time.monotonic()
+        if not self.conn.send(line + "\r"):
+            self._remove(w)
+            self.stats["errors"] += 1
+            w.future.set_exception(ConnectionError(f"falha ao enviar {line!r}"))
+        else:
+            self.stats["sent"] += 1
+        return w.future
+
+    def request(self, cmd: str, expect: Expect = None, timeout: float | None = None) -> str:
+        """Versão bloqueante de submit (não chamar na thread da UI)."""
+        return self.submit(cmd, expect, timeout).result()
+
+    def submit_many(self, cmds: Iterable[str], timeout: float | None = None) -> List[Future]:
+        """Envia todos os comandos sem esperar respostas (pipelining)."""
+        return [self.submit(c, timeout=timeout) for c in cmds]
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(q) for q in self._by_key.values()) + len(self._custom)
+
+    def timeout_for(self, cmd: str) -> float:
+        for prefix, t in COMMAND_TIMEOUTS.items():
+            if cmd.startswith(prefix):
+                return t
+        return self.default_timeout
+
+    # ---------------- correlação ----------------
+    @staticmethod
+    def _matcher(line: str, expect: Expect):
+        if expect is None:
+            return reply_prefix(line), None
+        if isinstance(expect, str):
+            return "", (lambda text, p=expect: text.startswith(p))
+        if isinstance(expect, re.Pattern):
+            return "", (lambda text, rx=expect: rx.search(text) is not None)
+        return "", expect
+
+    def _on_event(self, ev: Dict[str, Any]):
+        typ = ev.get("type")
+        if typ == "rx":
+            text = str(ev.get("text") or "")
+            for line in text.replace("\n", "\r").split("\r"):
+                if line.strip():
+                    self._on_line(line.strip())
+        elif typ == "disconnect":
+            self._fail_all(ConnectionError("conexão encerrada"))
+
+    def _on_line(self, line: str):
+        w = None
+        with self._lock:
+            for i, cand in enumerate(self._custom):
+                try:
+                    hit = cand.match(line)
+                except Exception:
+                    hit = False
+                if hit:
+                    w = self._custom.pop(i)
+                    break
+            if w is None and line.startswith("RRF,"):
+                parts = line.split(",", 3)
+                for key in (",".join(parts[:3]), ",".join(parts[:2])):
+                    q = self._by_key.get(key)
+                    if q:
+                        w = q.popleft()
+                        break
+        if w is not None and not w.future.done():
+            self.stats["replied"] += 1
+            if DEBUG: print(f"[REQ] {w.cmd} -> {line} ({(time.monotonic() - w.sent_at) * 1e3:.0f} ms)")
+            w.future.set_result(line)
+
+    def _remove(self, w: _Waiter):
+        with self._lock:
+            q = self._by_key.get(w.key)
+            if q and w in q:
+                q.remove(w)
+            elif w in self._custom:
+                self._custom.remove(w)
+
+    def _fail_all(self, exc: Exception):
+        with self._lock:
+            waiters = [w for q in self._by_key.values() for w in q] + self._custom
+            self._by_key.clear()
+            self._custom.clear()
+            self._heap.clear()
+        for w in waiters:
+            if not w.future.done():
+                self.stats["errors"] += 1
+                w.future.set_exception(exc)
+
+    # ---------------- timeouts ----------------
+    def _ensure_reaper(self):
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        while True:
+            expired: list[_Waiter] = []
+            with self._lock:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                while self._heap and (self._heap[0][2].future.done() or self._heap[0][0] <= now):
+                    _d, _s, w = heapq.heappop(self._heap)
+                    if not w.future.done():
+                        q = self._by_key.get(w.key)
+                        if q and w in q:
+                            q.remove(w)
+                        elif w in self._custom:
+                            self._custom.remove(w)
+                        expired.append(w)
+                wait = (self._heap[0][0] - now) if self._heap else None
+                if not expired:
+                    self._wake.wait(wait)
+            for w in expired:
+                if not w.future.done():
+                    self.stats["timeouts"] += 1
+                    w.future.set_exception(TimeoutError(f"sem resposta para {w.cmd!r}"))
+
+
+def engine_for(conn) -> RequestEngine:
+    """RequestEngine compartilhado por ConnectionService (criado na 1ª chamada)."""
+    eng = getattr(conn, "_request_engine", None)
+    if eng is None:
+        eng = RequestEngine(conn)
+        conn._request_engine = eng
+    return eng
@@ -2,8 +2,11 @@ import socket
 import threading
 from datetime import datetime
 from typing import Callable, List, Dict, Any
-import time
-import re
+
+from iluflex_tools.core.framer import RxFramer
+from iluflex_tools.core.net_discovery import DiscoveryEngine, parse_found
+from iluflex_tools.core.net_sweep import SubnetSweeper
+from iluflex_tools.core.protocols.rrf10 import parse_rrf10_line as _parse_rrf10_record, parse_rrf10_records
 
 DEBUG = False
 
@@ -32,7 +35,7 @@ class ConnectionService:
         self._auto_interval = 5.0
         self._listener_lock = threading.Lock()
         self._auto_reconnect_enabled = False  # quando True, desconexões disparam auto‑reconnect
-        self._rx_buffer = bytearray()
+        self._rx_framer = RxFramer(msg_timeout=0.4)  # frames A5 binário / texto até \r
         self._msg_timeout = 0.4 # 400 ms
 
     def get_is_connected(self):
@@ -156,38 +159,17 @@ class ConnectionService:
 
     def _recv_loop(self):
         assert self._sock is not None
+        framer = self._rx_framer
+        framer.clear()
+        framer.msg_timeout = self._msg_timeout
         while not self._stop.is_set():
-            last_rx_time = 0
             try:
-                data = self._sock.recv(4096)
-                last_rx_time = time.monotonic()
-                if not data:
+                # recv_into escreve direto no buffer do framer (sem bytes intermediários)
+                if framer.recv_into(self._sock) == 0:
                     if DEBUG: print("[RX] conexão encerrada pelo remoto")
                     break
-                self._rx_buffer.extend(data)
-                while True:
-                    if not self._rx_buffer:
-                        break
-                    if self._rx_buffer[0] == 0xA5:
-                        # Binary frame: A5 <opcode> <len> <payload...> <checksum>
-                        if len(self._rx_buffer) < 3:
-                            break
-                        payload_len = self._rx_buffer[2]
-                        total_len = 4 + payload_len
-                        if len(self._rx_buffer) < total_len:
-                            break
-                        msg = bytes(self._rx_buffer[:total_len])
-                        del self._rx_buffer[:total_len]
-                    else:
-                        idx = self._rx_buffer.find(b"\r")
-                        if idx == -1:
-                            break
-                        msg = bytes(self._rx_buffer[:idx + 1])
-                        del self._rx_buffer[:idx + 1]
-                    ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-                    text = msg.decode("utf-8", errors="replace")
-                    if DEBUG: print(f"[{ts}] RX {self._remote[0]}:{self._remote[1]} -> {text}")
-                    self._emit({"type": "rx", "ts": ts, "remote": self._remote, "text": text, "raw": msg})
+                for msg in framer.frames_bytes():
+                    self._emit_rx(msg)
             except socket.timeout:
                 pass
             except OSError:
@@ -196,18 +178,20 @@ class ConnectionService:
                 ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
                 self._emit({"type": "error", "ts": ts, "remote": self._remote, "text": f"rx error: {e}"})
                 break
-            
-            if self._rx_buffer and (time.monotonic() - last_rx_time) > self._msg_timeout:
-                msg = bytes(self._rx_buffer)
-                self._rx_buffer.clear()
-                ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-                text = msg.decode("utf-8", errors="replace")
-                if DEBUG: print(f"[{ts}] RX {self._remote[0]}:{self._remote[1]} -> {text}")
-                self._emit({"type": "rx", "ts": ts, "remote": self._remote, "text": text, "raw": msg})
-                last_rx_time = time.monotonic()
+
+            # mensagem sem terminador: entrega o que houver após o timeout
+            stale = framer.flush_stale()
+            if stale is not None:
+                self._emit_rx(stale.tobytes())
 
         self.disconnect()
 
+    def _emit_rx(self, msg: bytes):
+        ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        text = msg.decode("utf-8", errors="replace")
+        if DEBUG: print(f"[{ts}] RX {self._remote[0]}:{self._remote[1]} -> {text}")
+        self._emit({"type": "rx", "ts": ts, "remote": self._remote, "text": text, "raw": msg})
+
     # ---- envio ----
     def send(self, data) -> bool:
         if not self.connected or not self._sock:
@@ -254,204 +238,53 @@ class OtaService:
 
 class NetworkService:
     """Descoberta via UDP dos masters IC-315/IC-215."
-    - Envia broadcast para 255.255.255.255:30303 a string:
-        "Discovery: Who is out there?"
+    - Envia "Discovery: Who is out there?" para a porta 30303 (broadcast
+      dirigido de cada interface IPv4 + 255.255.255.255, com retransmissões).
     - Recebe respostas em múltiplas linhas. Aceita **somente** payloads cujo
       PRIMEIRA linha começa com "Found:" ou "FOUND:".
     - Espera, no mínimo, as linhas (após a linha Found:):
         Nome, MAC, IP, Máscara, Gateway, DHCP[, Flag]
     - Retorna dicionários com chaves: NAME, MAC, IP, MASCARA, GATEWAY, DHCP, FLAG
+    O trabalho fica em core.net_discovery.DiscoveryEngine.
     """
 
-    def _get_local_ip(self) -> str:
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            try:
-                s.connect(('8.8.8.8', 80))
-                return s.getsockname()[0]
-            finally:
-                s.close()
-        except Exception:
-            return '0.0.0.0'
+    def __init__(self, engine: DiscoveryEngine | None = None):
+        self.engine = engine or DiscoveryEngine()
 
     def _parse_response(self, payload: bytes) -> dict | None:
-        try:
-            text = payload.decode(errors="ignore").replace("\r", "")
-            lines = [ln.strip() for ln in text.split("\n") if ln.strip()]
-            if not lines:
-                return None
-            # aceitar SOMENTE se a primeira linha começar com Found:
-            first = lines[0]
-            if not (first.startswith("Found:") or first.startswith("FOUND:")):
-                return None
-
-            # os demais campos são por posição; toleramos faltantes
-            name    = lines[1] if len(lines) > 1 else ""
-            mac     = lines[2] if len(lines) > 2 else ""
-            ip      = lines[3] if len(lines) > 3 else ""
-            mask    = lines[4] if len(lines) > 4 else ""
-            gateway = lines[5] if len(lines) > 5 else ""
-            dhcp    = lines[6] if len(lines) > 6 else ""
-            flag    = lines[7] if len(lines) > 7 else ""
-
-            # normalizações leves
-            mac = mac.strip().lower()
-            ip = ip.strip()
-            mask = mask.strip()
-            gateway = gateway.strip()
-            dhcp = dhcp.strip()
-            flag = flag.strip()
-
-            return {
-                "NAME": name,
-                "MAC": mac,
-                "IP": ip,
-                "MASCARA": mask,
-                "GATEWAY": gateway,
-                "DHCP": dhcp,
-                "FLAG": flag,
-            }
-        except Exception:
-            return None
-
-    def scan_masters(self, timeout_ms: int, on_found=None) -> list[dict]:
+        return parse_found(payload)
+
+    def scan_masters(self, timeout_ms: int, on_found=None, expected: int | None = None) -> list[dict]:
         """Varredura síncrona com deduplicação. Se `on_found` for fornecido,
-        chama esse callback a cada dispositivo válido encontrado.
+        chama esse callback a cada dispositivo válido encontrado (na ordem de
+        chegada). Retorna antes do timeout ao achar `expected` masters ou
+        quando as respostas param de chegar.
         """
-        timeout_s = max(0.2, float(timeout_ms) / 1000.0)
-        deadline = time.time() + timeout_s
-
-        results: list[dict] = []
-        seen: set[str] = set()   # chave: MAC ou IP
-
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-        try:
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-            # Vincular ajuda em ambientes multi-homed (respostas unicast)
-            local_ip = self._get_local_ip()
-            try:
-                sock.bind((local_ip, 0))
-            except Exception:
-                # fallback: deixa SO escolher
-                pass
+        return self.engine.scan(timeout_ms, on_found=on_found, expected=expected)
 
-            sock.settimeout(0.2)
-            # envia broadcast
-            try:
-                sock.sendto(b"Discovery: Who is out there?", ("255.255.255.255", 30303))
-            except Exception:
-                pass
-
-            while time.time() < deadline:
-                try:
-                    data, addr = sock.recvfrom(4096)
-                except socket.timeout:
-                    continue
-                except Exception:
-                    break
-                parsed = self._parse_response(data)
-                if not parsed:
-                    continue
-                key = parsed.get("MAC") or parsed.get("IP") or repr(parsed)
-                if key in seen:
-                    continue
-                seen.add(key)
-                results.append(parsed)
-                if on_found:
-                    try:
-                        on_found(parsed)
-                    except Exception:
-                        pass
-        finally:
-            try:
-                sock.close()
-            except Exception:
-                pass
-
-        return results
+    def sweep_masters(self, timeout_ms: int, on_found=None, cidr: str | None = None,
+                      udp: bool = True, tcp: bool = True) -> list[dict]:
+        """Varredura unicast (UDP 30303 e/ou TCP 4999) da /24 local ou de `cidr`,
+        para redes que bloqueiam broadcast. Mesmo formato e callback de scan_masters.
+        Levanta ValueError se `cidr` for inválido."""
+        return SubnetSweeper(self.engine).sweep(cidr, timeout_ms, on_found=on_found, udp=udp, tcp=tcp)
 
-_MAC = re.compile(r'^[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5}$')
+    def scan_or_sweep(self, timeout_ms: int, on_found=None, expected: int | None = None) -> list[dict]:
+        """scan_masters; se o broadcast não achar nada, cai para sweep_masters."""
+        found = self.scan_masters(timeout_ms, on_found=on_found, expected=expected)
+        return found or self.sweep_masters(timeout_ms, on_found=on_found)
 
 def parse_rrf10_line(line: str) -> dict | None:
+    """Compatibilidade: uma linha 'RRF,10,...' como dicionário.
+
+    O parser é o de core.protocols.rrf10; código novo deve usar
+    parse_rrf10_records (registros DeviceStatusRRF10) e converter para dict só
+    na UI.
     """
-    Converte UMA linha 'RRF,10,...' no dicionário com todos os campos.
-    Campos:
-      slave_id (int)
-      mac (str)
-      sinal_db (int)
-      parent_mac (str)
-      modelo (str)
-      versao_hw (int)
-      versao_fw (int)
-      data_producao (str, ex.: '20250814')
-      n_saidas (int)
-      n_entradas (int)
-      nome (str)
-      raw (str)
-    """
-    if not line:
-        return None
-    line = line.strip()
-    if not line.startswith("RRF,10,"):
-        return None
-
-    parts = [p.strip() for p in line.split(",")]
-    # layout mínimo: 13 campos
-    if len(parts) < 13:
-        if DEBUG: print(f"parse_rrf10_line faltou elementos, tem só {len(parts)}")
-        return None
-
-    try:
-        # índices fixos pelo protocolo
-        # 0:'RRF' 1:'10'
-        slave_id      = int(parts[2])
-        mac           = parts[3]
-        sinal_db      = int(parts[4])   # pode ser negativo (RSSI) ou positivo
-        parent_mac    = parts[5]
-        modelo        = parts[6]
-        versao_hw     = int(parts[7])
-        versao_fw     = int(parts[8])
-        data_producao = parts[9]
-        n_saidas      = int(parts[10])
-        n_entradas    = int(parts[11])
-        # nome pode conter vírgulas? por segurança, junta o resto:
-        nome          = ",".join(parts[12:]).strip()
-
-        # valida MACs quando possível (não reprova; só corrige se inválido)
-        if not _MAC.match(mac):
-            # às vezes vem em minúsculas/sem padding — normalizamos pra minúsculas
-            mac = mac.lower()
-        if not _MAC.match(parent_mac):
-            parent_mac = parent_mac.lower()
-
-        return {
-            "slave_id": slave_id,
-            "mac": mac,
-            "sinal_db": sinal_db,
-            "parent_mac": parent_mac,
-            "modelo": modelo,
-            "versao_hw": versao_hw,
-            "versao_fw": versao_fw,
-            "data_producao": data_producao,
-            "n_saidas": n_saidas,
-            "n_entradas": n_entradas,
-            "nome": nome,
-            "raw": line,
-        }
-    except Exception as e:
-        if DEBUG: print("parse_rrf10_line error:", e)
-        return None
+    rec = _parse_rrf10_record(line)
+    return rec.to_dict() if rec is not None else None
 
 
 def parse_rrf10_lines(texto: str) -> list[dict]:
-    """Aceita um blob com várias linhas e retorna só as válidas RRF,10."""
-    dispositivos = []
-    if not texto:
-        return dispositivos
-    for raw in texto.splitlines():
-        # print(f"services.parse_rrf10_lines line: {raw} !") # até aqui vem bem
-        d = parse_rrf10_line(raw)
-        if d:
-            dispositivos.append(d)
-    return dispositivos
-
+    """Aceita um blob com várias linhas e retorna só as válidas RRF,10 (dicts)."""
+    return [rec.to_dict() for rec in parse_rrf10_records(texto)]
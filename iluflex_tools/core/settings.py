@@ -1,6 +1,28 @@
+"""Preferências persistentes (JSON no diretório temporário).
+
+O SettingsStore (singleton SETTINGS) mantém as preferências em memória e
+grava em segundo plano (write-behind):
+  - set/update só alteram a memória e marcam os campos como sujos;
+  - uma única gravação acontece FLUSH_DEBOUNCE_S depois da última alteração
+    (várias alterações seguidas = um arquivo escrito) e, ao sair, no atexit;
+  - a gravação é atômica (arquivo temporário + os.replace), então o arquivo
+    nunca fica pela metade;
+  - add_listener(cb) avisa cada alteração como cb(nome, valor), na thread
+    de quem alterou.
+load_settings/save_settings continuam existindo (cópia / aplica a cópia).
+
+Uso:
+    SETTINGS.set("theme", "dark")
+    SETTINGS.update({"last_ip": "192.168.1.80", "last_port": 5000})
+    SETTINGS.add_listener(lambda name, value: ...)
+    SETTINGS.flush()   # grava já (normalmente não é preciso)
+"""
 from __future__ import annotations
-import json, os, tempfile
-from dataclasses import dataclass, asdict, fields
+import atexit, json, os, tempfile, threading
+from dataclasses import dataclass, asdict, fields, replace
+from typing import Any, Callable, Dict, List, get_type_hints
+
+DEBUG = False
 
 
 @dataclass
@@ -10,12 +32,18 @@ class Settings:
     mesh_discovery_timeout_sec: int = 120 # tempo padrão para Descorir Novos Dispositivos na Rede Mesh
     last_ip: str = "192.168.1.70"
     last_port: int = 4999
+    last_mac: str = ""
 
 #APP_DIR = os.path.join(os.path.expanduser("~"), ".iluflex_tools")
 #SETTINGS_PATH = os.path.join(APP_DIR, "settings.json")
 
 SETTINGS_PATH = os.path.join(tempfile.gettempdir(), 'iluflex_tools.json')
 
+FLUSH_DEBOUNCE_S = 0.5   # grava uma vez, meio segundo depois da última alteração
+
+# tipos reais (com `annotations`, f.type é só o texto "int")
+_FIELD_TYPES = get_type_hints(Settings)
+
 
 def _coerce(value, typ, default):
     """Coerção defensiva para tipos simples (int, float, str)."""
@@ -31,10 +59,10 @@ def _coerce(value, typ, default):
         return default
 
 
-def load_settings() -> Settings:
-    """Carrega settings, mesclando com defaults e corrigindo tipos."""
+def read_settings(path: str | None = None) -> Settings:
+    """Lê o arquivo, mesclando com defaults e corrigindo tipos."""
     try:
-        with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+        with open(path or SETTINGS_PATH, "r", encoding="utf-8") as f:
             data = json.load(f) or {}
     except Exception:
         return Settings()
@@ -43,12 +71,142 @@ def load_settings() -> Settings:
     for f in fields(Settings):
         cur_default = getattr(s, f.name)
         raw = data.get(f.name, cur_default)
-        setattr(s, f.name, _coerce(raw, f.type, cur_default))
+        setattr(s, f.name, _coerce(raw, _FIELD_TYPES[f.name], cur_default))
     return s
 
 
+def write_settings(s: Settings, path: str | None = None) -> None:
+    """Grava de forma atômica (arquivo temporário + rename)."""
+    path = path or SETTINGS_PATH
+    fd, tmp = tempfile.mkstemp(prefix=".iluflex_tools-", suffix=".tmp", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(asdict(s), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class SettingsStore:
+    field_names = tuple(_FIELD_TYPES)
+
+    def __init__(self, path: str | None = None, debounce_s: float = FLUSH_DEBOUNCE_S):
+        self.path = path                  # None = SETTINGS_PATH
+        self.debounce_s = debounce_s
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()   # uma gravação por vez, na ordem das cópias
+        self._settings: Settings | None = None
+        self._dirty: set[str] = set()
+        self._timer: threading.Timer | None = None
+        self._listeners: List[Callable[[str, Any], None]] = []
+        self._atexit = False
+        self.stats = {"writes": 0}
+
+    # ---------------- leitura ----------------
+    def get(self) -> Settings:
+        """Preferências em memória (lidas do disco no 1º acesso). Não alterar
+        os campos direto: usar set/update para marcar e avisar."""
+        with self._lock:
+            if self._settings is None:
+                self._settings = read_settings(self.path)
+            return self._settings
+
+    def snapshot(self) -> Settings:
+        return replace(self.get())
+
+    @property
+    def dirty(self) -> frozenset[str]:
+        return frozenset(self._dirty)
+
+    # ---------------- alteração ----------------
+    def set(self, name: str, value: Any) -> bool:
+        return bool(self.update({name: value}))
+
+    def update(self, values: Dict[str, Any]) -> List[str]:
+        """Aplica vários campos de uma vez; retorna os nomes que mudaram."""
+        changed = []
+        with self._lock:
+            s = self.get()
+            for name, value in values.items():
+                typ = _FIELD_TYPES.get(name)
+                if typ is None:
+                    continue
+                value = _coerce(value, typ, getattr(s, name))
+                if getattr(s, name) != value:
+                    setattr(s, name, value)
+                    changed.append(name)
+            if changed:
+                self._dirty.update(changed)
+                self._schedule()
+        for name in changed:
+            self._notify(name, getattr(s, name))
+        return changed
+
+    # ---------------- gravação ----------------
+    def _schedule(self) -> None:
+        if not self._atexit:
+            atexit.register(self.flush)
+            self._atexit = True
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.debounce_s, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> bool:
+        """Grava agora, se houver alterações pendentes. Retorna True se gravou."""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty or self._settings is None:
+                    return False
+                data = replace(self._settings)
+                dirty, self._dirty = self._dirty, set()
+            try:
+                write_settings(data, self.path)
+                self.stats["writes"] += 1
+                if DEBUG: print(f"[SETTINGS] gravado ({', '.join(sorted(dirty))})")
+                return True
+            except Exception as e:
+                if DEBUG: print(f"[SETTINGS] falha ao gravar: {e}")
+                with self._lock:
+                    self._dirty |= dirty   # tenta de novo na próxima
+                return False
+
+    # ---------------- avisos ----------------
+    def add_listener(self, cb: Callable[[str, Any], None]) -> None:
+        if cb not in self._listeners:
+            self._listeners.append(cb)
+
+    def remove_listener(self, cb: Callable[[str, Any], None]) -> None:
+        try:
+            self._listeners.remove(cb)
+        except ValueError:
+            pass
+
+    def _notify(self, name: str, value: Any) -> None:
+        for cb in list(self._listeners):
+            try:
+                cb(name, value)
+            except Exception as e:
+                if DEBUG: print(f"[SETTINGS] listener falhou: {e}")
+
+
+# Singleton global
+SETTINGS = SettingsStore()
+
+
+def load_settings() -> Settings:
+    """Cópia das preferências atuais (alterar e passar para save_settings)."""
+    return SETTINGS.snapshot()
+
+
 def save_settings(s: Settings) -> None:
-    """Grava settings no disco (cria pasta se necessário)."""
-    if os.path.exists(SETTINGS_PATH): exist_ok=True
-    with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
-        json.dump(asdict(s), f, ensure_ascii=False, indent=2)
+    """Aplica os campos de `s` ao SETTINGS (gravação em segundo plano)."""
+    SETTINGS.update({name: getattr(s, name) for name in _FIELD_TYPES})
@@ -0,0 +1,64 @@
+"""Tempos de inicialização por fase (imports, janela, páginas, 1ª tela).
+
+Uso:
+    from iluflex_tools.core.startup_timer import STARTUP
+    STARTUP.mark("imports")            # tempo desde a marca anterior
+    with STARTUP.phase("page:conexao"):
+        ...
+    print(STARTUP.report())
+
+O relatório sai no console com ILUFLEX_STARTUP_REPORT=1 (ou DEBUG no main_app).
+"""
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+
+REPORT_ENV = "ILUFLEX_STARTUP_REPORT"
+
+
+class StartupTimer:
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.t0 = clock()
+        self._last = self.t0
+        self.phases: List[Tuple[str, float]] = []   # (nome, segundos)
+
+    def mark(self, name: str) -> float:
+        """Fecha a fase `name` (tempo desde a marca anterior). Retorna os segundos."""
+        now = self._clock()
+        dt = now - self._last
+        self._last = now
+        self.phases.append((name, dt))
+        return dt
+
+    @contextmanager
+    def phase(self, name: str):
+        """Mede só o bloco (não conta o tempo ocioso antes dele)."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            end = self._clock()
+            self.phases.append((name, end - start))
+            self._last = end
+
+    def elapsed(self) -> float:
+        return self._clock() - self.t0
+
+    def report(self) -> str:
+        lines = [f"{'fase':<32}{'ms':>9}"]
+        for name, dt in self.phases:
+            lines.append(f"{name:<32}{dt * 1e3:>9.1f}")
+        lines.append(f"{'total (desde o import)':<32}{self.elapsed() * 1e3:>9.1f}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def enabled() -> bool:
+        return os.environ.get(REPORT_ENV, "").strip().lower() in {"1", "true", "yes", "on", "sim"}
+
+
+# Instância global: criada no 1º import (o mais cedo possível no main_app)
+STARTUP = StartupTimer()
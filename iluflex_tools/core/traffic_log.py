@@ -0,0 +1,288 @@
+"""Registro do tráfego TX/RX do ConnectionService (buffer circular + índice).
+
+O TrafficLog é um listener do ConnectionService (um por conexão, via
+traffic_log_for) e guarda cada mensagem como TrafficRecord(seq, ts, direction,
+raw), com ts = time.monotonic():
+  - buffer circular de capacidade fixa: memória constante, as mais antigas
+    são sobrescritas;
+  - índice por prefixo de comando ("RRF", "RRF,15", "RRF,15,9" -> seqs), para
+    filtrar sem varrer o buffer: find("RRF,15,*");
+  - seq crescente: views guardam o último seq mostrado e pedem só o que
+    chegou depois (since), em vez de redesenhar tudo;
+  - captura opcional em disco, com rotação (capture.log, .1, .2, ...), uma
+    linha por mensagem: "<ts>\\t<rx|tx>\\t<bytes escapados>".
+
+Uso:
+    log = traffic_log_for(conn)
+    log.find("RRF,15,*")                      # respostas RRF,15,x no buffer
+    novos = log.records(since=ultimo_seq, direction=DIR_RX)
+    log.enable_capture("trafego.log", max_bytes=5_000_000, backups=3)
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+DEBUG = False
+
+DIR_RX = "rx"
+DIR_TX = "tx"
+
+DEFAULT_CAPACITY = 5000
+INDEX_DEPTH = 3            # "RRF", "RRF,15", "RRF,15,9"
+MAX_KEY_LEN = 32           # campos maiores que isso não são cabeçalho de comando
+
+
+@dataclass(slots=True)
+class TrafficRecord:
+    seq: int
+    ts: float              # time.monotonic()
+    direction: str         # DIR_RX | DIR_TX
+    raw: bytes
+
+    @property
+    def text(self) -> str:
+        return self.raw.decode("utf-8", errors="replace")
+
+
+def command_keys(raw: bytes, depth: int = INDEX_DEPTH) -> List[str]:
+    """Prefixos de comando da 1ª linha: b"RRF,15,9,30\\r" -> ["RRF", "RRF,15", "RRF,15,9"]."""
+    head = raw[:depth * (MAX_KEY_LEN + 1)].split(b"\r", 1)[0].split(b"\n", 1)[0]
+    parts = head.decode("latin-1").strip().split(",", depth)[:depth]
+    keys = []
+    for i, part in enumerate(parts):
+        if not part or len(part) > MAX_KEY_LEN:
+            break
+        keys.append(",".join(parts[:i + 1]))
+    return keys
+
+
+def _normalize_prefix(prefix: str) -> str:
+    p = prefix.strip()
+    if p.endswith("*"):
+        p = p[:-1]
+    return p.rstrip(",")
+
+
+def _starts_with_fields(raw: bytes, prefix: bytes) -> bool:
+    data = raw.lstrip()
+    return data.startswith(prefix) and data[len(prefix):len(prefix) + 1] in (b"", b",", b"\r", b"\n")
+
+
+# ---------------- captura em disco ----------------
+
+def escape_raw(raw: bytes) -> str:
+    """Bytes -> texto de uma linha, reversível (ver unescape_raw)."""
+    return raw.decode("latin-1").encode("unicode_escape").decode("ascii")
+
+
+def unescape_raw(text: str) -> bytes:
+    return text.encode("ascii").decode("unicode_escape").encode("latin-1")
+
+
+class RotatingCapture:
+    """Arquivo de captura com rotação por tamanho (path, path.1, ... path.N)."""
+
+    def __init__(self, path: str, max_bytes: int = 5_000_000, backups: int = 3):
+        self.path = path
+        self.max_bytes = max(1024, int(max_bytes))
+        self.backups = max(0, int(backups))
+        self._f = None
+        self._size = 0
+        self._open()
+
+    def _open(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._f = open(self.path, "a", encoding="ascii", buffering=1)
+        self._size = self._f.tell()
+
+    def _rotate(self):
+        self._f.close()
+        if self.backups:
+            for i in range(self.backups - 1, 0, -1):
+                src = f"{self.path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def write(self, rec: TrafficRecord) -> None:
+        line = f"{rec.ts:.6f}\t{rec.direction}\t{escape_raw(rec.raw)}\n"
+        if self._size and self._size + len(line) > self.max_bytes:
+            self._rotate()
+        self._f.write(line)
+        self._size += len(line)
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+def parse_capture_line(line: str) -> Optional[tuple[float, str, bytes]]:
+    try:
+        ts, direction, raw = line.rstrip("\n").split("\t", 2)
+        return float(ts), direction, unescape_raw(raw)
+    except Exception:
+        return None
+
+
+# ---------------- log ----------------
+
+class TrafficLog:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, clock=time.monotonic):
+        self.capacity = max(1, int(capacity))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buf: List[Optional[TrafficRecord]] = [None] * self.capacity
+        self._next_seq = 0
+        self._floor = 0          # seqs abaixo disto foram descartados por clear()
+        self._index: Dict[str, deque] = {}
+        self._capture: RotatingCapture | None = None
+        self._conn = None
+
+    # ---------------- origem ----------------
+    def attach(self, conn) -> None:
+        if self._conn is not None:
+            self._conn.remove_listener(self._on_event)
+        self._conn = conn
+        conn.add_listener(self._on_event)
+
+    def detach(self) -> None:
+        if self._conn is not None:
+            self._conn.remove_listener(self._on_event)
+            self._conn = None
+
+    def _on_event(self, ev: Dict[str, Any]) -> None:
+        typ = ev.get("type")
+        if typ not in (DIR_RX, DIR_TX):
+            return
+        raw = ev.get("raw")
+        if raw is None:
+            raw = str(ev.get("text") or "").encode("utf-8")
+        self.append(typ, bytes(raw))
+
+    # ---------------- gravação ----------------
+    def append(self, direction: str, raw: bytes) -> TrafficRecord:
+        keys = command_keys(raw)
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            rec = TrafficRecord(seq, self._clock(), direction, raw)
+            self._buf[seq % self.capacity] = rec
+            oldest = self._oldest_seq()
+            for k in keys:
+                dq = self._index.get(k)
+                if dq is None:
+                    dq = self._index[k] = deque()
+                while dq and dq[0] < oldest:
+                    dq.popleft()
+                dq.append(seq)
+            if seq and seq % self.capacity == 0:
+                self._prune_index(oldest)
+            capture = self._capture
+            if capture is not None:
+                try:
+                    capture.write(rec)
+                except Exception as e:
+                    if DEBUG: print(f"[TRAFFIC] falha na captura: {e}")
+        return rec
+
+    def _oldest_seq(self) -> int:
+        return max(self._floor, self._next_seq - self.capacity)
+
+    def _prune_index(self, oldest: int) -> None:
+        """Remove do índice os seqs que já saíram do buffer (chaves que sumiram)."""
+        for k in list(self._index):
+            dq = self._index[k]
+            while dq and dq[0] < oldest:
+                dq.popleft()
+            if not dq:
+                del self._index[k]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buf = [None] * self.capacity
+            self._index.clear()
+            self._floor = self._next_seq
+            # seq continua crescendo: views com `since` não se confundem
+
+    # ---------------- captura ----------------
+    def enable_capture(self, path: str, max_bytes: int = 5_000_000, backups: int = 3) -> None:
+        capture = RotatingCapture(path, max_bytes, backups)
+        with self._lock:
+            old, self._capture = self._capture, capture
+        if old is not None:
+            old.close()
+
+    def disable_capture(self) -> None:
+        with self._lock:
+            old, self._capture = self._capture, None
+        if old is not None:
+            old.close()
+
+    # ---------------- consulta ----------------
+    def __len__(self) -> int:
+        return self._next_seq - self._oldest_seq()
+
+    @property
+    def last_seq(self) -> int:
+        """Seq da última mensagem (-1 se nenhuma)."""
+        return self._next_seq - 1
+
+    def records(self, since: int = -1, direction: str | None = None,
+                limit: int | None = None) -> List[TrafficRecord]:
+        """Mensagens com seq > since ainda no buffer (mais antigas primeiro);
+        `limit` fica com as últimas."""
+        with self._lock:
+            start = max(since + 1, self._oldest_seq())
+            recs = [self._buf[s % self.capacity] for s in range(start, self._next_seq)]
+        recs = [r for r in recs if r is not None and (direction is None or r.direction == direction)]
+        return recs[-limit:] if limit else recs
+
+    def tail(self, n: int, direction: str | None = None) -> List[TrafficRecord]:
+        return self.records(direction=direction, limit=n)
+
+    def find(self, prefix: str, direction: str | None = None,
+             since: int = -1, limit: int | None = None) -> List[TrafficRecord]:
+        """Mensagens cujo comando começa por `prefix` ("RRF,15,*" ou "RRF,15"
+        casam RRF,15,x mas não RRF,150). Prefixos de até INDEX_DEPTH campos
+        usam o índice; mais longos (ex.: "RRF,15,9,30") varrem o buffer."""
+        p = _normalize_prefix(prefix)
+        if not p:
+            return self.records(since, direction, limit)
+        indexed = p.count(",") < INDEX_DEPTH and all(0 < len(f) <= MAX_KEY_LEN for f in p.split(","))
+        if indexed:
+            with self._lock:
+                start = max(since + 1, self._oldest_seq())
+                seqs = [s for s in self._index.get(p, ()) if s >= start]
+                recs = [self._buf[s % self.capacity] for s in seqs]
+        else:
+            pb = p.encode("utf-8")
+            recs = [r for r in self.records(since) if _starts_with_fields(r.raw, pb)]
+        recs = [r for r in recs if r is not None and (direction is None or r.direction == direction)]
+        return recs[-limit:] if limit else recs
+
+    def keys(self) -> List[str]:
+        """Prefixos de comando presentes no buffer."""
+        with self._lock:
+            oldest = self._oldest_seq()
+            return sorted(k for k, dq in self._index.items() if dq and dq[-1] >= oldest)
+
+
+def traffic_log_for(conn, capacity: int = DEFAULT_CAPACITY) -> TrafficLog:
+    """TrafficLog compartilhado por ConnectionService (criado na 1ª chamada)."""
+    log = getattr(conn, "_traffic_log", None)
+    if log is None:
+        log = TrafficLog(capacity)
+        log.attach(conn)
+        conn._traffic_log = log
+    return log
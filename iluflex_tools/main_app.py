@@ -1,21 +1,28 @@
+from iluflex_tools.core.startup_timer import STARTUP  # primeiro: mede os imports abaixo
+
+import importlib
+import os
+
 import customtkinter as ctk
+STARTUP.mark("import customtkinter")
 
 from iluflex_tools.theming.theme import apply_theme
 from iluflex_tools.core.services import ConnectionService, OtaService, NetworkService
-from iluflex_tools.core.settings import load_settings
+from iluflex_tools.core.settings import SETTINGS
 from iluflex_tools.ui.header import Header
 from iluflex_tools.ui.sidebar import Sidebar
-from iluflex_tools.ui.pages.dashboard import DashboardPage
-from iluflex_tools.ui.pages.conexao import ConexaoPage
-from iluflex_tools.ui.pages.gestao_dispositivos import GestaoDispositivosPage
-from iluflex_tools.ui.pages.fw_upgrade import FWUpgradePage
-from iluflex_tools.ui.pages.comandos_ir import ComandosIRPage
-from iluflex_tools.ui.pages.interface_programacao import InterfaceProgramacaoPage
-from iluflex_tools.ui.pages.configurar_master import ConfigurarMasterPage
-from iluflex_tools.ui.pages.configuracoes import PreferenciasPage
-from iluflex_tools.ui.pages.ajuda import AjudaPage
 from iluflex_tools.core.app_state import STATE
+from iluflex_tools.core.event_bus import STATE_TYPES, bus_for
+from iluflex_tools.core.traffic_log import traffic_log_for
 from iluflex_tools.widgets.icon import setup_window_icon
+STARTUP.mark("import app/core")
+
+DEBUG = False
+
+# As páginas são importadas e construídas no 1º navigate() (ver _register_page).
+# Depois da 1ª tela, os módulos abaixo são importados em tempo ocioso, um por vez.
+PREWARM_PAGES = ("conexao", "gestao_dispositivos", "comandos_ir", "configurar_master")
+PREWARM_INTERVAL_MS = 150
 
 
 MENU_ITEMS = [
@@ -41,15 +48,29 @@ class MainApp(ctk.CTk):
         self.geometry("900x720")
         self.minsize(800, 500)
 
-        self.settings = load_settings()
+        self.settings = SETTINGS.get()  # ao vivo (SettingsStore)
         # aplica o tema salvo no boot (evita iniciar sempre no "system")
         try:
             from iluflex_tools.theming.theme import apply_theme as _apply
             _apply(self.settings.theme)
         except Exception:
             pass
+        # tema trocado em Preferências é aplicado aqui (aviso do SettingsStore)
+        SETTINGS.add_listener(self._on_setting_changed)
 
         self.conn = ConnectionService()
+        # eventos de conexão chegam à UI em lotes, drenados no mainloop
+        self.bus = bus_for(self.conn, self)
+        # STATE.connected acompanha a conexão (páginas assinam o campo em vez de consultar)
+        self.bus.subscribe(self._on_conn_state, types=STATE_TYPES)
+        # histórico TX/RX desde o boot (buffer circular; captura em disco opcional)
+        self.traffic = traffic_log_for(self.conn)
+        capture = os.environ.get("ILUFLEX_TRAFFIC_CAPTURE", "").strip()
+        if capture:
+            try:
+                self.traffic.enable_capture(capture)
+            except OSError as e:
+                if DEBUG: print(f"[MainApp] captura de tráfego desativada: {e}")
         self.ota = OtaService()
         self.net = NetworkService()
 
@@ -67,37 +88,74 @@ class MainApp(ctk.CTk):
         self.content.grid_rowconfigure(0, weight=1)
         self.content.grid_columnconfigure(0, weight=1)
 
+        STARTUP.mark("janela, header e sidebar")
+
         self.pages = {}
+        self._page_factories = {}
         self._current_page = None
+        self._prewarm_queue = list(PREWARM_PAGES)
         self._mount_pages()
         # self._apply_global_table_font(nsize=10)  # Aplica fonte global para todas as tabelas não funciona
         self.navigate("dashboard")
+        self.after_idle(self._on_first_idle)
 
 
     def _mount_pages(self):
-        self.pages["dashboard"] = DashboardPage(self.content, on_quick_nav=self.navigate,menu_items=MENU_ITEMS)
-        self.pages["conexao"] = ConexaoPage(
-            self.content,
-            conn=self.conn,
-        )
+        """Registra as páginas como fábricas: módulo e widgets só no 1º navigate()."""
+        self._register_page("dashboard", "dashboard", "DashboardPage",
+                            on_quick_nav=self.navigate, menu_items=MENU_ITEMS)
+        self._register_page("conexao", "conexao", "ConexaoPage", conn=self.conn)
         # >>> alteração: passa conn também, para a página ouvir RX de RRF,10
-        self.pages["gestao_dispositivos"] = GestaoDispositivosPage(self.content, conn=self.conn)
-        self.pages["fw_upgrade"] = FWUpgradePage(self.content, run_ota=self.ota.run_fw_upgrade)
-        self.pages["comandos_ir"] = ComandosIRPage(self.content, conn=self.conn)
-        self.pages["interface_programacao"] = InterfaceProgramacaoPage(self.content)
-        self.pages["configurar_master"] = ConfigurarMasterPage(self.content, conn=self.conn)
-        self.pages["preferencias"] = PreferenciasPage(
-            self.content,
-            get_settings=lambda: self.settings,
-        )
-        self.pages["ajuda"] = AjudaPage(self.content)
-
-        for p in self.pages.values():
-            p.grid(row=0, column=0, sticky="nsew")
+        self._register_page("gestao_dispositivos", "gestao_dispositivos", "GestaoDispositivosPage", conn=self.conn)
+        self._register_page("fw_upgrade", "fw_upgrade", "FWUpgradePage", run_ota=self.ota.run_fw_upgrade)
+        self._register_page("comandos_ir", "comandos_ir", "ComandosIRPage", conn=self.conn)
+        self._register_page("interface_programacao", "interface_programacao", "InterfaceProgramacaoPage")
+        self._register_page("configurar_master", "configurar_master", "ConfigurarMasterPage", conn=self.conn)
+        self._register_page("preferencias", "configuracoes", "PreferenciasPage",
+                            get_settings=lambda: self.settings)
+        self._register_page("ajuda", "ajuda", "AjudaPage")
+
+    def _register_page(self, key: str, module: str, class_name: str, **kwargs):
+        self._page_factories[key] = (f"iluflex_tools.ui.pages.{module}", class_name, kwargs)
+
+    def _get_page(self, key: str):
+        """Página `key`, importando o módulo e construindo na 1ª vez."""
+        page = self.pages.get(key)
+        if page is not None or key not in self._page_factories:
+            return page
+        module, class_name, kwargs = self._page_factories[key]
+        with STARTUP.phase(f"import {module.rsplit('.', 1)[-1]}"):
+            cls = getattr(importlib.import_module(module), class_name)
+        with STARTUP.phase(f"página {key}"):
+            page = cls(self.content, **kwargs)
+            page.grid(row=0, column=0, sticky="nsew")
+        self.pages[key] = page
+        if DEBUG: print(f"[MainApp] página {key} criada")
+        return page
+
+    # ---- 1ª tela e pré-aquecimento ----
+    def _on_first_idle(self):
+        STARTUP.mark("primeira tela")
+        if DEBUG or STARTUP.enabled():
+            print(STARTUP.report())
+        self.after(PREWARM_INTERVAL_MS, self._prewarm_next)
+
+    def _prewarm_next(self):
+        """Importa (sem construir) o próximo módulo de página pesado, um por tick."""
+        while self._prewarm_queue:
+            key = self._prewarm_queue.pop(0)
+            if key in self.pages or key not in self._page_factories:
+                continue
+            try:
+                importlib.import_module(self._page_factories[key][0])
+            except Exception as e:
+                if DEBUG: print(f"[MainApp] prewarm {key} falhou: {e}")
+            self.after(PREWARM_INTERVAL_MS, self._prewarm_next)
+            return
 
 
     def navigate(self, key: str):
-        if key not in self.pages:
+        if key not in self.pages and key not in self._page_factories:
             return
 
         # desativa página atual, se aplicável
@@ -109,8 +167,8 @@ class MainApp(ctk.CTk):
                 except Exception:
                     pass
 
-        # ativa nova página
-        page = self.pages[key]
+        # ativa nova página (construída aqui na 1ª visita)
+        page = self._get_page(key)
         page.tkraise()
         self.sidebar.set_active(key)
         self._current_page = key
@@ -125,6 +183,23 @@ class MainApp(ctk.CTk):
     def _toggle_sidebar_collapse(self):
         self.sidebar.set_collapsed(not self.sidebar.collapsed)
 
+    def _on_conn_state(self, events: list[dict]):
+        for ev in events:  # um por um: desconecta+reconecta no mesmo lote também avisa
+            STATE.set("connected", ev.get("type") == "connect", persist=False)
+
+    def _on_setting_changed(self, name: str, value):
+        if name == "theme":
+            try:
+                apply_theme(value)
+            except Exception:
+                pass
+
+    def destroy(self):
+        SETTINGS.remove_listener(self._on_setting_changed)
+        SETTINGS.flush()  # não depende só do atexit
+        self.traffic.disable_capture()
+        super().destroy()
+
 def main():
     app = MainApp()
     app.mainloop()
@@ -1,5 +1,6 @@
 import customtkinter as ctk
 from iluflex_tools.widgets.status_led import StatusLed
+from iluflex_tools.core.event_bus import STATE_TYPES, bus_for
 
 DEBUG = False
 
@@ -7,13 +8,14 @@ class Header(ctk.CTkFrame):
     def __init__(self, master, conn, on_toggle_collapse=None):
         super().__init__(master, corner_radius=0, fg_color=("gray85","gray14"))
         self.conn = conn
-        self._listener = lambda ev: self._on_conn_event(ev)
+        # só o último evento de estado do lote interessa ao texto de status
+        self._listener = lambda evs: self._on_conn_event(evs[-1])
 
         self.toggle_collapse = on_toggle_collapse
         self._build()
         # assina eventos de conexão
         try:
-            self.conn.add_listener(self._listener)
+            bus_for(self.conn, self).subscribe(self._listener, types=STATE_TYPES | {"error"})
         except Exception as e:
             if DEBUG: print("Header Error", e )
             pass
@@ -60,6 +62,6 @@ class Header(ctk.CTkFrame):
 
     def destroy(self):
         try:
-            self.conn.remove_listener(self._listener)
+            bus_for(self.conn).unsubscribe(self._listener)
         except Exception:
             pass
\ No newline at end of file
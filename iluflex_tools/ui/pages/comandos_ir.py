@@ -4,11 +4,15 @@ from iluflex_tools.widgets.waveform_canvas import WaveformCanvas
 from iluflex_tools.widgets.cards import DropDownCard as dpc
 from iluflex_tools.widgets.buttontags import ButtonTagsWidget
 from iluflex_tools.widgets.page_title import PageTitle
-from iluflex_tools.core.ircode import IrCodeLib
+from iluflex_tools.core.ircode_cache import IR_CACHE
+from iluflex_tools.core.event_bus import bus_for
+from iluflex_tools.core.traffic_log import DIR_RX, traffic_log_for
 from iluflex_tools.core.validators import get_safe_int
 
 DEBUG = False
 
+RAW_VIEW_LINES = 10  # linhas RX mostradas no campo 'Entrada'
+
 class ComandosIRPage(ctk.CTkFrame):
     """
     - Campo 1: Capturado (sir,2)
@@ -21,12 +25,18 @@ class ComandosIRPage(ctk.CTkFrame):
         super().__init__(master)
         self.conn = conn
         
-        # escuta eventos da conexão para receber dados.
-        # self.conn.add_listener(self._on_conn_event) isso deixa de existir aqui.
-
-        # listener will be attached when the page is activated
+        # eventos da conexão chegam pelo EventBus: a inscrição
+        # (bus_for(self.conn, self).subscribe) é feita em on_page_activated
         self._listener_attached = False
 
+        # campo 'Entrada' acompanha o TrafficLog: só acrescenta o que chegou depois de _raw_seq
+        self._traffic = traffic_log_for(self.conn)
+        self._raw_seq = self._traffic.last_seq
+        self._raw_lines = 0
+
+        # conversões repetidas (mesmo comando e parâmetros) saem do cache, inclusive entre sessões
+        IR_CACHE.enable_disk()
+
         # --- Controles de zoom/pan (espelhando o learner) ---
         self.x_scale_var = ctk.DoubleVar(value=0.005)  # pixels por tick (1 tick ≈ 1.6 µs)
         self.x_scroll = None
@@ -45,7 +55,7 @@ class ComandosIRPage(ctk.CTkFrame):
     def destroy(self):
         # remove listener ao sair
         try:
-            self.conn.remove_listener(self._on_conn_event)
+            bus_for(self.conn).unsubscribe(self._on_conn_events)
         except Exception:
             pass
         return super().destroy()
@@ -53,14 +63,16 @@ class ComandosIRPage(ctk.CTkFrame):
     # called by main_app.navigate when the page becomes visible
     def on_page_activated(self):
         if not self._listener_attached:
-            self.conn.add_listener(self._on_conn_event)
+            bus_for(self.conn, self).subscribe(self._on_conn_events)
             self._listener_attached = True
+        # RX que chegou com a página oculta aparece no campo (sem reprocessar)
+        self._append_raw_from_log()
 
     # called by main_app.navigate when the page is hidden
     def on_page_deactivated(self):
         if self._listener_attached:
             try:
-                self.conn.remove_listener(self._on_conn_event)
+                bus_for(self.conn).unsubscribe(self._on_conn_events)
             finally:
                 self._listener_attached = False
 
@@ -256,7 +268,7 @@ class ComandosIRPage(ctk.CTkFrame):
             buttonTag = self.tag_picker.get_selected_tag()
             channel = int(self.cmd_channel_entry.get())
 
-            converted = IrCodeLib.convertIRCmd(sir, cmd_type, cmd_repeat, channel)
+            converted = IR_CACHE.convertIRCmd(sir, cmd_type, cmd_repeat, channel)
 
             if DEBUG: print(f"converteu algo: {converted}")
 
@@ -329,6 +341,7 @@ class ComandosIRPage(ctk.CTkFrame):
         self.txt_raw.configure(state=ctk.NORMAL)
         self.txt_raw.delete("1.0", "end")
         self.txt_raw.configure(state=ctk.DISABLED)
+        self._raw_lines = 0
 
         self.send_cmd_entry.delete(0, ctk.END)
         self.ir_command_converted_plot = ""
@@ -346,9 +359,30 @@ class ComandosIRPage(ctk.CTkFrame):
         
 
     # ---- eventos da conexão ----
-    def _on_conn_event(self, ev: dict):
-        # garantir thread-safe
-        self.after(0, lambda e=ev: self._handle_ev(e))
+    def _on_conn_events(self, events: list[dict]):
+        # lote entregue pelo EventBus já na thread do Tk
+        self._append_raw_from_log()
+        for ev in events:
+            self._handle_ev(ev)
+
+    def _append_raw_from_log(self):
+        """Acrescenta ao campo 'Entrada' só o RX novo do TrafficLog (um insert por
+        lote) e apaga do início o que passar de RAW_VIEW_LINES linhas."""
+        recs = self._traffic.records(since=self._raw_seq, direction=DIR_RX)
+        self._raw_seq = self._traffic.last_seq
+        texts = [t for t in (r.text.strip() for r in recs) if t]
+        if not texts:
+            return
+        block = "\n".join(texts)
+        self.txt_raw.configure(state=ctk.NORMAL)
+        self.txt_raw.insert(ctk.END, block + "\n")
+        self._raw_lines += block.count("\n") + 1
+        excess = self._raw_lines - RAW_VIEW_LINES
+        if excess > 0:
+            self.txt_raw.delete("1.0", f"{excess + 1}.0")
+            self._raw_lines = RAW_VIEW_LINES
+        self.txt_raw.see(ctk.END)
+        self.txt_raw.configure(state=ctk.DISABLED)
 
     def _handle_ev(self, ev: dict):
         # t = ev.get("ts", "--:--:--.---")
@@ -356,18 +390,8 @@ class ComandosIRPage(ctk.CTkFrame):
         buffer = ev.get("text")
         buffer = str(buffer).strip()
         if typ == "rx" and buffer:
-            # chegou dados, vamos colocar no campo 'Entrada'
+            # chegou dados (já mostrados no campo 'Entrada' por _append_raw_from_log)
             self.ir_received_cmd_raw = buffer
-            self.txt_raw.configure(state=ctk.NORMAL)
-            self.txt_raw.insert(ctk.END, buffer + "\n")
-            # Mantém apenas as 10 últimas linhas (não altera conteúdo crú)
-            lines = self.txt_raw.get("1.0", ctk.END).splitlines()
-            if len(lines) > 10:
-                lines = lines[-10:]
-                self.txt_raw.delete("1.0", ctk.END)
-                self.txt_raw.insert(ctk.END, "\n".join(lines) + "\n")
-            self.txt_raw.see(ctk.END)
-            self.txt_raw.configure(state=ctk.DISABLED)
             # Processa dados recebidos.
             self._parse_raw_income(buffer)
 
@@ -407,7 +431,7 @@ class ComandosIRPage(ctk.CTkFrame):
             max_frames = int(self.max_frames_cbox.get()) if self.max_frames_cbox else 3
             normalize = bool(self.normalize_switch.get()) if self.normalize_switch else True
 
-            normalizedCmd = IrCodeLib.preProcessIrCmd(self.ir_received_cmd_raw, pause_threshold, max_frames, normalize)
+            normalizedCmd = IR_CACHE.preProcessIrCmd(self.ir_received_cmd_raw, pause_threshold, max_frames, normalize)
             
             new_sir2 = normalizedCmd.get("new_sir2", "")
             if new_sir2:
@@ -535,6 +559,7 @@ class ComandosIRPage(ctk.CTkFrame):
         self.txt_raw.delete("1.0", ctk.END)
         self.txt_raw.insert("1.0", trimmed + '\n')
         self.txt_raw.configure(state=ctk.DISABLED)
+        self._raw_lines = trimmed.count("\n") + 1
 
         self._reprocess_from_raw()
 
@@ -5,11 +5,16 @@ from iluflex_tools.core.services import ConnectionService, NetworkService
 from iluflex_tools.widgets.page_title import PageTitle
 from iluflex_tools.core.validators import get_safe_int
 from iluflex_tools.core.app_state import STATE
+from iluflex_tools.core.discovery_cache import STATUS_MOVED, STATUS_NEW, STATUS_STALE
+from iluflex_tools.core.net_sweep import SubnetSweeper
 
 DEBUG = False
 
 TABLE_FONT_SIZE = 12
 
+# status do cache de descoberta -> tag de cor da tabela
+_STATUS_TAGS = {STATUS_NEW: ("disc_new",), STATUS_MOVED: ("disc_moved",), STATUS_STALE: ("disc_stale",)}
+
 class ConexaoPage(ctk.CTkFrame):
     def __init__(
         self,
@@ -19,12 +24,15 @@ class ConexaoPage(ctk.CTkFrame):
         super().__init__(master)
         self._scan_thread = None
         self._conn = conn
-        self.ip_entry_var = ctk.StringVar(value=STATE.data.ip) # guarde como atributo!
+        self.ip_entry_var = ctk.StringVar(value=STATE.last_known_address()[0]) # guarde como atributo!
         self.port_entry_var = ctk.StringVar(value=str(STATE.data.port)) # Entry trabalha com texto
         self.auto_recconect_switch_var = ctk.BooleanVar(value=STATE.data.auto_reconnect)
         self.net = NetworkService()
 
         self._build()
+        # campos seguem o STATE (conectar, master que mudou de IP, Configurar Master...)
+        self._on_state_changed({"auto_reconnect": STATE.data.auto_reconnect})
+        STATE.subscribe(self._on_state_changed, fields=("ip", "port", "mac", "auto_reconnect"))
 
     def _build(self):
         self.grid_columnconfigure(1, weight=1)
@@ -127,8 +135,10 @@ class ConexaoPage(ctk.CTkFrame):
         ip = self.ip_entry.get().strip()
         port = get_safe_int(self.port_entry.get(), 1, 65000, 4999)
         desired_auto = bool(self.auto_reconnect_switch.get())
-        # Precisa atualizar o STATE
+        # Precisa atualizar o STATE (MAC = chave do cache para achar a master se o IP mudar)
         STATE.set_ip_port(ip, port)
+        cached = STATE.discovery.by_ip(ip)
+        STATE.set("mac", cached.mac if cached else "")
         STATE.set("auto_reconnect", desired_auto)
         if self._conn is None:
             if DEBUG: print("[ConexaoPage] _connect: self._conn é None — verifique a injeção em main_app.py")
@@ -184,25 +194,50 @@ class ConexaoPage(ctk.CTkFrame):
             if DEBUG: print("[ConexaoPage] Erro ao alternar auto-reconnect:", e)
 
 
+    def _show_cached(self):
+        """Mostra na hora as masters do cache (com a cor do último status)."""
+        try:
+            entries = STATE.discovery.entries()
+        except Exception:
+            entries = []
+        for e in entries:
+            self._apply_cache_entry(e)
+
     def _buscar(self):
+        """Revalida o cache em segundo plano: broadcast + probe unicast das que
+        não responderam. As linhas são atualizadas conforme as respostas chegam."""
         if self._scan_thread and self._scan_thread.is_alive():
             return
         timeout = int(STATE.data.discovery_timeout_ms)
-        self.table.set_rows([])
-        self.table.set_font_size(TABLE_FONT_SIZE)
         self.btn_buscar.configure(state="disabled", text="Aguarde…")
         self.status.configure(text=f"Procurando (timeout={timeout}ms)…")
+        cache = STATE.discovery
 
         def worker():
-            items = self.net.scan_masters(
-                timeout_ms=timeout,
-                on_found=lambda d: self.after(0, self._append_row, d)
+            entries = cache.revalidate(
+                self.net.engine, timeout,
+                on_update=lambda e: self.after(0, self._apply_cache_entry, e),
+                sweeper=SubnetSweeper(self.net.engine),  # rede sem broadcast: varre a /24
             )
+            items = [e for e in entries if e.status != STATUS_STALE]
             self.after(0, self._on_scan_finished, items, timeout)
 
         self._scan_thread = threading.Thread(target=worker, daemon=True)
         self._scan_thread.start()
 
+    def _apply_cache_entry(self, e):
+        self._append_row(e.to_row())
+        try:
+            self.table.set_status_tags({e.mac or e.ip: _STATUS_TAGS.get(e.status, ())})
+        except Exception:
+            pass
+        # a master da última conexão mudou de IP: reconexão vai para o IP novo
+        if e.status == STATUS_MOVED and STATE.data.mac and e.mac == STATE.data.mac and e.ip != STATE.data.ip:
+            STATE.set("ip", e.ip)
+            self.ip_entry_var.set(e.ip)
+            if self._conn is not None and not self._conn.get_is_connected():
+                self._conn.set_remote(e.ip, STATE.data.port)
+
     def _on_scan_finished(self, items, timeout):
         self._scan_thread = None
         self.btn_buscar.configure(state="normal", text="Buscar master na rede")
@@ -249,29 +284,39 @@ class ConexaoPage(ctk.CTkFrame):
             "DHCP": item.get("DHCP",""),
         }
         try:
-            # upsert by IP (stable in same scan); fallback to MAC
-            key_cols = ["IP"] if "IP" in self.table._all_cols else ["MAC"]
+            # upsert por MAC (a mesma master pode voltar com outro IP)
+            key_cols = ["MAC"] if row["MAC"] else ["IP"]
             self.table.upsert_row(row, key_cols=key_cols)
-            self.table.set_font_size(TABLE_FONT_SIZE)
         except Exception:
             # fallback: rebuild all rows
             cur = getattr(self, "_rows", [])
             cur.append(row)
             self.table.set_rows(cur)
 
+    def _on_state_changed(self, changes: dict):
+        """Assinante do STATE: atualiza só os campos afetados."""
+        if changes.keys() & {"ip", "port", "mac"}:
+            ip, port = STATE.last_known_address()
+            if self.ip_entry_var.get() != ip:
+                self.ip_entry_var.set(ip)
+            if self.port_entry_var.get() != str(port):
+                self.port_entry_var.set(str(port))
+        if "auto_reconnect" in changes:
+            if changes["auto_reconnect"]:
+                self.auto_reconnect_switch.select()
+            else:
+                self.auto_reconnect_switch.deselect()
+
     def destroy(self):
+        STATE.unsubscribe(self._on_state_changed)
         return super().destroy()
 
     # called by main_app.navigate when the page becomes visible
     def on_page_activated(self):
         if DEBUG: print(f"[PAGINA CONEXAO] on page activated: STATE ip:{STATE.data.ip} port:{STATE.data.port}")
-        self.ip_entry_var.set(STATE.data.ip)
-        self.port_entry_var.set(str(STATE.data.port))
-        if STATE.data.auto_reconnect:
-            self.auto_reconnect_switch.select()
-        else:
-            self.auto_reconnect_switch.deselect()
-        self._buscar() # Busca ic´s na rede assim que carregar a página.
+        # IP/porta/auto reconectar já chegam por _on_state_changed
+        self._show_cached()  # masters já conhecidas aparecem na hora
+        self._buscar() # revalida em segundo plano assim que carregar a página.
 
     # called by main_app.navigate when the page is hidden
     #def on_page_deactivated(self):
@@ -87,14 +87,7 @@ class PreferenciasPage(ctk.CTkFrame):
             messagebox.showerror("Preferências", str(err))  # feedback não intrusivo
             return
 
-        save_settings(s)
-        # tenta aplicar tema, sem alterar layout externo
-        try:
-            from iluflex_tools.theming.theme import apply_theme
-
-            apply_theme(s.theme)
-        except Exception:
-            pass
+        save_settings(s)  # o MainApp aplica o tema ao receber o aviso do SettingsStore
         messagebox.showinfo("Preferências", "Preferências salvas com sucesso.")
 
     # ------------------------------ Util --------------------------------
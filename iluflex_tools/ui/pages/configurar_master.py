@@ -2,9 +2,11 @@ import customtkinter as ctk
 import threading
 from iluflex_tools.widgets.page_title import PageTitle
 from iluflex_tools.core.validators import get_safe_int
-from iluflex_tools.core.protocols import IPv4Config, IPv4ConfigValidator, build_srf16_sequence
+from iluflex_tools.core.protocols import IPv4Config, IPv4ConfigValidator, build_srf16_sequence, run_srf_sequence
 from iluflex_tools.core.protocols.rrf16 import RRF16_6Parser, RRF16_9Parser
 from iluflex_tools.core.app_state import STATE
+from iluflex_tools.core.request_engine import engine_for
+from iluflex_tools.core.event_bus import bus_for
 
 DEBUG = False
 
@@ -20,7 +22,7 @@ class ConfigurarMasterPage(ctk.CTkFrame):
 
         # Estado do worker de envio/verificação
         self._worker_running = False           # evita 2 workers em paralelo
-        self._ack_event = None                 # threading.Event criado por operação
+        self._send_window = 4                  # comandos SRF,16 em voo ao mesmo tempo
         self._verify_target = None             # dicionário do que vamos conferir no RRF,16,9
         self._pending_summary = ""             # texto curto do que está sendo salvo
 
@@ -35,7 +37,7 @@ class ConfigurarMasterPage(ctk.CTkFrame):
     def destroy(self):
         # remove listener ao sair
         try:
-            self.conn.remove_listener(self._on_conn_event)
+            bus_for(self.conn).unsubscribe(self._on_conn_events)
         except Exception:
             pass
         return super().destroy()
@@ -43,7 +45,7 @@ class ConfigurarMasterPage(ctk.CTkFrame):
     # called by main_app.navigate when the page becomes visible
     def on_page_activated(self):
         if not self._listener_attached:
-            self.conn.add_listener(self._on_conn_event)
+            bus_for(self.conn, self).subscribe(self._on_conn_events)
             self._listener_attached = True
         # MOSTRA/OCULTA o card conforme o estado atual
         self._update_cards_visibility()
@@ -54,7 +56,7 @@ class ConfigurarMasterPage(ctk.CTkFrame):
     def on_page_deactivated(self):
         if self._listener_attached:
             try:
-                self.conn.remove_listener(self._on_conn_event)
+                bus_for(self.conn).unsubscribe(self._on_conn_events)
             finally:
                 self._listener_attached = False
 
@@ -229,35 +231,37 @@ class ConfigurarMasterPage(ctk.CTkFrame):
         if self._worker_running:
             self.status.configure(text="Já existe um salvamento em andamento… aguarde."); return
         self._verify_target = ({k: getattr(cfg, k) for k in ("ip","netmask","gateway","dns1","dns2","hostname") if getattr(cfg, k)} | {"dhcp": "0" if cfg.dhcp else "1"})
-        self._ack_event = threading.Event(); self._worker_running = True
+        self._worker_running = True
         self.status.configure(text=f"Salvando configurações… {self._pending_summary}")
         threading.Thread(target=self._send_worker, args=(cmds,), daemon=True).start()
         
 
     def _send_worker(self, commands: list[str]):
-        import time
-        min_gap = 0.05
-        timeout = 3.0
-        last_ts = 0.0
+        """Executa a sequência em paralelo limitado; a UI só acompanha o progresso."""
+        total = len(commands)
+
+        def progress(i: int, step):
+            if DEBUG: print(f"[CONFIG_MASTER] {step.cmd!r} -> {step.reply!r} {step.error} ({step.elapsed_s*1e3:.0f} ms)")
+            self.after(0, lambda: self.status.configure(text=f"Salvando configurações… {i + 1}/{total}"))
+
         try:
-            for raw in commands:
-                dt = time.monotonic() - last_ts
-                if dt < min_gap:
-                    time.sleep(min_gap - dt)
-                cmd = raw.rstrip("\r\n") + "\r"
-                if DEBUG: print(f"[CONFIG_MASTER] TX -> {cmd!r}")
-                ok = self.conn.send(cmd)
-                last_ts = time.monotonic()
-                if not ok:
-                    self.after(0, lambda: self.status.configure(text="Falha ao enviar. Verifique a conexão.", text_color="red"))
-                    break
-                if self._ack_event:
-                    got = self._ack_event.wait(timeout)
-                    self._ack_event.clear()
-                    if not got and DEBUG:
-                        print("[CONFIG_MASTER] timeout aguardando RRF para", raw)
-            # terminou a fila
-            self.after(0, lambda: self.status.configure(text="Comandos enviados. Aguardando verificação (16,9)…"))
+            res = run_srf_sequence(engine_for(self.conn), commands, window=self._send_window, on_step=progress)
+            if DEBUG: print("[CONFIG_MASTER] stats:", res.stats())
+            if res.ok:
+                self.after(0, lambda: self.status.configure(text="Comandos enviados. Aguardando verificação (16,9)…"))
+            elif not res.aborted:
+                # só timeouts: a verificação (16,9) confirma o que foi aplicado
+                sem_resposta = ", ".join(s.cmd for s in res.steps if not s.ok)
+                self.after(0, lambda: self.status.configure(
+                    text=f"Comandos enviados (sem resposta: {sem_resposta}). Aguardando verificação (16,9)…"))
+            else:
+                bad = res.first_error
+                msg = f"Falha em {bad.cmd} ({bad.error}). Verifique a conexão." if bad else "Falha ao enviar."
+                self._verify_target = None
+                self.after(0, lambda: self.status.configure(text=msg, text_color="red"))
+        except Exception as e:
+            self._verify_target = None
+            self.after(0, lambda err=str(e): self.status.configure(text=f"Falha ao enviar: {err}", text_color="red"))
         finally:
             self._worker_running = False
 
@@ -282,9 +286,10 @@ class ConfigurarMasterPage(ctk.CTkFrame):
     #       EVENTOS DE CONEXÃO
     #-------------------------------------------------
    
-    def _on_conn_event(self, ev: dict):
-        # garantir thread-safe
-        self.after(0, lambda e=ev: self._handle_ev(e))
+    def _on_conn_events(self, events: list[dict]):
+        # lote entregue pelo EventBus já na thread do Tk
+        for ev in events:
+            self._handle_ev(ev)
 
     def _handle_ev(self, ev: dict):
         typ = ev.get("type")  # connect, disconnect, tx, rx, error
@@ -320,11 +325,6 @@ class ConfigurarMasterPage(ctk.CTkFrame):
     def _parse_SRF_income(self, message: str) -> None:
         if DEBUG: print(f"[CONFIG_MASTER] RX: {message}")
 
-        # ACK para o worker (RRF,15/16 liberam próximo envio)
-        if (message.startswith("RRF,15,") or message.startswith("RRF,16,")) and self._ack_event is not None:
-            try: self._ack_event.set()
-            except Exception: pass
-
         # 16,6 => estado atual de rede
         if self._p16_6.match(message):
             snap = self._p16_6.parse(message)
@@ -14,8 +14,12 @@ import tkinter as tk  # local, para não mexer nos imports do arquivo
 from tkinter import font as tkfont
 
 from iluflex_tools.widgets.table_tree import ColumnToggleTree
-from iluflex_tools.core.services import ConnectionService, parse_rrf10_lines
-from iluflex_tools.core.settings import load_settings, save_settings
+from iluflex_tools.core.services import ConnectionService
+from iluflex_tools.core.event_bus import bus_for
+from iluflex_tools.core.protocols.rrf10 import parse_rrf10_records
+from iluflex_tools.core.protocols.types import DeviceStatusRRF10
+from iluflex_tools.core.settings import SETTINGS, save_settings
+from iluflex_tools.core.app_state import STATE
 from iluflex_tools.widgets.page_title import PageTitle
 import time
 import re
@@ -30,7 +34,7 @@ class GestaoDispositivosPage(ctk.CTkFrame):
         super().__init__(master)
         self.conn = conn       # ConnectionService para ouvir RX
         self._send = send_func or self.conn.send  # função para enviar comandos TCP
-        self._settings = load_settings()
+        self._settings = SETTINGS.get()  # ao vivo: reflete as Preferências salvas depois
 
         # controle da barra de progresso do botão "Procurar Dispositivos"
         self._discover_after: str | None = None
@@ -47,13 +51,18 @@ class GestaoDispositivosPage(ctk.CTkFrame):
         # listener will be attached when the page is activated
         self._listener_attached = False
 
+        # lista precisa ser pedida de novo? (conexão nova ou outra master, via STATE)
+        self._list_stale = True
+        STATE.subscribe(self._on_state_changed, fields=("connected", "ip", "port"))
+
         self._build()
 
 
     def destroy(self):
+        STATE.unsubscribe(self._on_state_changed)
         try:
             if self.conn is not None:
-                self.conn.remove_listener(self._on_conn_event)
+                bus_for(self.conn).unsubscribe(self._on_conn_events)
         except Exception:
             pass
         return super().destroy()
@@ -62,7 +71,7 @@ class GestaoDispositivosPage(ctk.CTkFrame):
     def on_page_activated(self):
         """Chamar ao navegar para esta página para auto‑atualizar se conectado."""
         if not self._listener_attached:
-            self.conn.add_listener(self._on_conn_event)
+            bus_for(self.conn, self).subscribe(self._on_conn_events)
             self._listener_attached = True
         
         self._maybe_autorefresh()        
@@ -79,7 +88,7 @@ class GestaoDispositivosPage(ctk.CTkFrame):
     def on_page_deactivated(self):
         if self._listener_attached:
             try:
-                self.conn.remove_listener(self._on_conn_event)
+                bus_for(self.conn).unsubscribe(self._on_conn_events)
             finally:
                 self._listener_attached = False
 
@@ -118,7 +127,8 @@ class GestaoDispositivosPage(ctk.CTkFrame):
             {"key": "Sinal (dB)", "width": 70},
         ]
         
-        self.table = ColumnToggleTree(self, columns=[(c["key"], c["width"]) for c in cols], height=20)
+        # virtual: só as linhas visíveis viram itens do Treeview (meshes grandes)
+        self.table = ColumnToggleTree(self, columns=[(c["key"], c["width"]) for c in cols], height=20, virtual=True)
         self.table.grid(row=2, column=0, sticky="nsew", padx=10, pady=(6, 10))
         self.grid_rowconfigure(2, weight=1)
         self.grid_columnconfigure(0, weight=1)
@@ -215,35 +225,32 @@ class GestaoDispositivosPage(ctk.CTkFrame):
     # ------------------------------------------------------------------
     # Ingestão de RRF,10
     # ------------------------------------------------------------------
-    def ingest_rrf10(self, devices: list[dict]):
+    def ingest_rrf10(self, devices: list[DeviceStatusRRF10]):
         """Upsert por MAC + reordenar e colorir linhas."""
         if not devices:
             return
 
         last_mac: str | None = None
         for d in devices:
-            mac = (d.get("mac") or "").lower()
+            mac = (d.mac or "").lower()
             if not mac:
                 continue  # ignoramos sem MAC
             last_mac = mac
-            parent_raw = d.get("parent_mac")
-            # preserva 0 como "0" e evita .lower() em tipos não-str
-            parent_mac = "" if parent_raw is None else str(parent_raw).strip().lower()
-
+            # registro -> linha da tabela (único ponto onde vira dict)
             row = {
-                "Slave ID": d.get("slave_id", ""),
+                "Slave ID": d.slave_id,
                 "Mac Address": mac,
-                "Modelo": d.get("modelo", ""),
-                "Nome": d.get("nome", ""),
-                "FW": d.get("versao_fw", ""),
-                "HW": d.get("versao_hw", ""),
-                "Uplink": parent_mac,
-                "Sinal (dB)": d.get("sinal_db", ""),
+                "Modelo": d.modelo,
+                "Nome": d.nome,
+                "FW": d.versao_fw,
+                "HW": d.versao_hw,
+                "Uplink": (d.parent_mac or "").strip().lower(),
+                "Sinal (dB)": d.sinal_db,
             }
             # upsert por MAC no estado local
             self._rows_by_mac[mac] = row
 
-        # Recria dataset ordenado (estável p/ UI)
+        # Recria dataset ordenado (estável p/ UI) — uma ordenação por lote
         self._dataset = sorted(
             self._rows_by_mac.values(),
             key=lambda r: (
@@ -253,8 +260,8 @@ class GestaoDispositivosPage(ctk.CTkFrame):
             ),
         )
         try:
-            self.table.set_rows(self._dataset)
-            self.table.set_font_size(TABLE_FONT_SIZE)
+            # só insere/atualiza/move as linhas que mudaram
+            self.table.update_rows(self._dataset, key_cols=("Mac Address",))
         except Exception:
             # fallback: insere/atualiza linha-a-linha
             for r in self._dataset:
@@ -271,90 +278,79 @@ class GestaoDispositivosPage(ctk.CTkFrame):
     # Cores por regra
     # ------------------------------------------------------------------
     def _apply_row_colors(self, last_mac: str | None):
-
-        # Acessa Treeview interno (ColumnToggleTree deve expor como .tree ou .tv)
-        tv = getattr(self.table, "tree", getattr(self.table, "tv", None))
-        if tv is None:
-            return  # sem como aplicar cor, não quebra
-        
+        """Calcula a tag de cada MAC a partir do dataset; a tabela só toca nas
+        linhas cuja tag mudou."""
         def sid_str(x):
             s = str(x).strip()
             return s if s != "" else None
-        
+
         # Conta duplicidades de slave_id
         counts = Counter(s for s in (sid_str(r.get("Slave ID")) for r in self._dataset) if s is not None)
 
-        # Descobre índices das colunas
-        headers = []
-        try:
-            headers = [h for (h, _w) in getattr(self.table, "columns", [])]
-        except Exception:
-            pass
-        if not headers:
-            headers = ["Slave ID", "Mac Address"]  # suposição segura
-        try:
-            idx_sid = headers.index("Slave ID")
-            idx_mac = headers.index("Mac Address")
-        except ValueError:
-            return
-
-        # Limpa tags e reaplica
-        for iid in tv.get_children(""):
+        tags_by_mac: dict[str, tuple] = {}
+        for r in self._dataset:
             try:
-                vals = tv.item(iid, "values")
-                sid = sid_str(vals[idx_sid])
-                mac = str(vals[idx_mac]).lower()
+                sid = sid_str(r.get("Slave ID"))
+                mac = str(r.get("Mac Address") or "").lower()
                 n = counts.get(sid, 0)
-
-                tags = []
                 if last_mac and mac == last_mac:
-                    tags.append("last")  # última mensagem tem prioridade visual
-                elif int(sid) == 0 : 
-                    tags.append("sid_zero")
+                    tag = "last"  # última mensagem tem prioridade visual
+                elif int(sid) == 0:
+                    tag = "sid_zero"
                 elif n > 1:
-                    tags.append("dup_sid")
+                    tag = "dup_sid"
                 else:
-                    tags.append("uniq_sid")
-                if DEBUG: print(f"[gestao dispositivos._apply_row_colors] tags={tags} n = {n}")
-                tv.item(iid, tags=tuple(tags))
+                    tag = "uniq_sid"
+                tags_by_mac[mac] = (tag,)
             except Exception:
                 continue
+        if DEBUG: print(f"[gestao dispositivos._apply_row_colors] {len(tags_by_mac)} linhas")
+        try:
+            self.table.set_status_tags(tags_by_mac)
+        except Exception:
+            pass
 
     # ------------------------------------------------------------------
     # Eventos de conexão
     # ------------------------------------------------------------------
-    def _on_conn_event(self, ev: dict):
-        try:
-            ev_type = str(ev.get("type") or "")
-            # Atualiza lista automaticamente quando a conexão é (re)estabelecida
-            if ev_type == "connect":
-                self.after(0, self._on_click_atualizar)
-                return
+    def _on_conn_events(self, events: list[dict]):
+        """Lote de eventos do EventBus (já na thread do Tk)."""
+        rx_texts: list[str] = []
+        for ev in events:
+            try:
+                ev_type = str(ev.get("type") or "")
+                # (re)conexão: ver _on_state_changed
+                if ev_type != "rx":
+                    continue
 
-            if ev_type != "rx":
-                return
+                text = ev.get("text") or ""
+                # --- ACK do comando SRF,15,9,<tempo> ---
+                if "RRF,15,9," in text:
+                    for m in re.finditer(r"RRF,15,9,(\d+)", text):
+                        try:
+                            secs = int(m.group(1))
+                        except Exception:
+                            continue
+                        self._handle_rrf_15_9(secs)
+
+                timeout = int(getattr(self._settings, "mesh_discovery_timeout_sec", 120))
+                if text.strip() == f"RRF,15,1,{timeout}":
+                    if DEBUG: print("vai atualizar em 15 seg")
+                    self.after(15000, self._on_click_atualizar)
+
+                if "RRF,10," in text:
+                    rx_texts.append(text)
+            except Exception:
+                pass
 
-            text = ev.get("text") or ""       
-            # --- ACK do comando SRF,15,9,<tempo> ---
-            if "RRF,15,9," in text:
-                for m in re.finditer(r"RRF,15,9,(\d+)", text):
-                    try:
-                        secs = int(m.group(1))
-                    except Exception:
-                        continue
-                    self.after(0, self._handle_rrf_15_9, secs)
-
-            timeout = int(getattr(self._settings, "mesh_discovery_timeout_sec", 120))
-            if text.strip() == f"RRF,15,1,{timeout}":
-                if DEBUG: print("vai atualizar em 15 seg")
-                self.after(15000, self._on_click_atualizar)
-            
-            devices = parse_rrf10_lines(text)
-            if not devices:
-                return
-            self.after(0, self.ingest_rrf10, devices)
-        except Exception:
-            pass
+        # uma ingestão (ordenação + cores) por lote
+        if rx_texts:
+            try:
+                devices = parse_rrf10_records("\n".join(rx_texts))
+                if devices:
+                    self.ingest_rrf10(devices)
+            except Exception:
+                pass
 
     def _handle_rrf_15_9(self, seconds: int) -> None:
         """
@@ -413,6 +409,7 @@ class GestaoDispositivosPage(ctk.CTkFrame):
                 pass
             if callable(self._send):
                 self._send("SRF,10,255\r")
+                self._list_stale = False
             else:
                 if DEBUG: print("no callable")
         except Exception as e:
@@ -535,12 +532,22 @@ class GestaoDispositivosPage(ctk.CTkFrame):
 
     #------------ Navegação para essa página ----------------
     def _maybe_autorefresh(self):
+        """Ao voltar para a página, só pede a lista se ela ficou desatualizada."""
         try:
-            if getattr(self.conn, "connected", False):
+            if self._list_stale and getattr(self.conn, "connected", False):
                 self._on_click_atualizar()
         except Exception:
             pass
 
+    def _on_state_changed(self, changes: dict):
+        """Assinante do STATE: conexão (re)estabelecida ou outra master."""
+        if "ip" in changes or "port" in changes:
+            self._list_stale = True
+        if changes.get("connected"):
+            self._list_stale = True
+            if self._listener_attached:  # página visível: atualiza já
+                self.after(0, self._on_click_atualizar)
+
 
 
 
@@ -727,6 +734,12 @@ class GestaoDispositivosPage(ctk.CTkFrame):
             col_name = info["col_name"]
             row_iid = info["iid"]
             mac = info.get("mac")
+            if mac:
+                # tabela virtual: o item pode ter sido reaproveitado ao rolar
+                row_iid = self._row_iid_by_mac(mac)
+                if row_iid is None:
+                    self._cancel_cell_edit()
+                    return
 
             if col_name == "Slave ID":
                 try:
@@ -739,7 +752,7 @@ class GestaoDispositivosPage(ctk.CTkFrame):
                     return
 
             # Aplica na UI
-            self.table.tree.set(row_iid, col_name, new_val)
+            self.table.set_cell(row_iid, col_name, new_val)
 
             # Atualiza estado por MAC
             if mac:
@@ -815,12 +828,9 @@ class GestaoDispositivosPage(ctk.CTkFrame):
         if not mac:
             return None
         try:
-            for iid in self.table.tree.get_children(""):
-                if self.table.tree.set(iid, "Mac Address") == mac:
-                    return iid
+            return self.table.iid_for(mac)
         except Exception:
             return None
-        return None
 
 
 
@@ -853,29 +863,17 @@ class GestaoDispositivosPage(ctk.CTkFrame):
 
     def _update_row_edit_tag(self, mac: str) -> None:
         self._ensure_edit_tag_style()
-        iid = self._row_iid_by_mac(mac)
-        if not iid:
-            return
         d = self._edited_rows.get(mac, {})
         has_changes = any(k != "__baseline" for k in d.keys())
         try:
-            tags = set(self.table.tree.item(iid, "tags") or [])
-            if has_changes:
-                tags.add("edited")
-            else:
-                tags.discard("edited")
-            self.table.tree.item(iid, tags=tuple(tags))
+            self.table.set_row_flag(mac, "edited", has_changes)
         except Exception:
             pass
 
 
     def _clear_all_edit_tags(self) -> None:
         try:
-            for iid in self.table.tree.get_children(""):
-                tags = set(self.table.tree.item(iid, "tags") or [])
-                if "edited" in tags:
-                    tags.discard("edited")
-                    self.table.tree.item(iid, tags=tuple(tags))
+            self.table.clear_flag("edited")
         except Exception:
             pass
 
@@ -961,14 +959,7 @@ class GestaoDispositivosPage(ctk.CTkFrame):
                 safe_mac = self._mac_compact(mac)
                 if not safe_mac:
                     continue
-                iid_match = None
-                try:
-                    for iid in self.table.tree.get_children(""):
-                        if self.table.tree.set(iid, "Mac Address") == mac:
-                            iid_match = iid
-                            break
-                except Exception:
-                    iid_match = None
+                iid_match = self._row_iid_by_mac(mac)
 
                 if iid_match:
                     slave_id = self.table.tree.set(iid_match, "Slave ID")
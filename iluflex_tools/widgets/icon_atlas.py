@@ -0,0 +1,120 @@
+"""Índice dos ícones de theming/icons e atlas opcional (uma única PNG).
+
+Os ícones seguem o nome `<nome>_<tamanho>px_<light|dark>.png`. O índice é
+montado uma vez (um scandir) e o menu_button resolve (nome, tamanho, tema)
+sem sondar o disco.
+
+Atlas: para builds congeladas (PyInstaller/_MEIPASS), todos os ícones podem
+ser empacotados numa única PNG + JSON com as caixas; no boot decodifica-se
+um arquivo só e cada ícone é um recorte. Gerar antes do pyinstaller:
+    python -m iluflex_tools.widgets.icon_atlas
+(cria icons_atlas.png/icons_atlas.json em theming/icons; sem eles, os PNGs
+avulsos continuam sendo usados. Ícones acrescentados depois de gerar o atlas
+também: o índice é sempre o scandir, com o atlas por cima.)
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+ATLAS_PNG = "icons_atlas.png"
+ATLAS_JSON = "icons_atlas.json"
+
+_ICON_RE = re.compile(r"^(?P<name>.+)_(?P<size>\d+)px_(?P<variant>light|dark)\.png$")
+
+IconKey = Tuple[str, int, str]   # (nome, tamanho, "light"|"dark")
+
+
+def index_icons(filenames: Iterable[str]) -> Dict[IconKey, str]:
+    """{(nome, tamanho, variante): arquivo} para os nomes no padrão dos ícones."""
+    out: Dict[IconKey, str] = {}
+    for fn in filenames:
+        m = _ICON_RE.match(fn)
+        if m:
+            out[(m["name"], int(m["size"]), m["variant"])] = fn
+    return out
+
+
+def scan_icon_dir(icon_dir: Path) -> Dict[IconKey, str]:
+    try:
+        with os.scandir(icon_dir) as it:
+            return index_icons(e.name for e in it if e.is_file())
+    except OSError:
+        return {}
+
+
+def pack_layout(sizes: Dict[str, Tuple[int, int]], max_width: int = 512) -> Tuple[Dict[str, Tuple[int, int, int, int]], Tuple[int, int]]:
+    """Prateleiras simples: {arquivo: (x, y, w, h)} e o tamanho total do atlas."""
+    boxes: Dict[str, Tuple[int, int, int, int]] = {}
+    x = y = shelf_h = width = 0
+    for fn in sorted(sizes, key=lambda f: (-sizes[f][1], f)):
+        w, h = sizes[fn]
+        if x and x + w > max_width:
+            x, y, shelf_h = 0, y + shelf_h, 0
+        boxes[fn] = (x, y, w, h)
+        x += w
+        shelf_h = max(shelf_h, h)
+        width = max(width, x)
+    return boxes, (width, y + shelf_h)
+
+
+def build_atlas(icon_dir: Path) -> Tuple[Path, Path]:
+    """Gera icons_atlas.png/json em icon_dir a partir dos PNGs indexados."""
+    from PIL import Image
+
+    files = sorted(set(scan_icon_dir(icon_dir).values()))
+    images = {fn: Image.open(icon_dir / fn).convert("RGBA") for fn in files}
+    boxes, size = pack_layout({fn: im.size for fn, im in images.items()})
+    sheet = Image.new("RGBA", size, (0, 0, 0, 0))
+    for fn, (x, y, _w, _h) in boxes.items():
+        sheet.paste(images[fn], (x, y))
+    png, js = icon_dir / ATLAS_PNG, icon_dir / ATLAS_JSON
+    sheet.save(png, optimize=True)
+    js.write_text(json.dumps({"image": ATLAS_PNG, "boxes": boxes}, indent=1), encoding="utf-8")
+    return png, js
+
+
+def load_atlas(icon_dir: Path):
+    """(índice, {arquivo: PIL.Image}) do atlas, ou None se não houver atlas válido."""
+    js = icon_dir / ATLAS_JSON
+    if not js.is_file():
+        return None
+    try:
+        from PIL import Image
+
+        meta = json.loads(js.read_text(encoding="utf-8"))
+        sheet = Image.open(icon_dir / meta.get("image", ATLAS_PNG))
+        sheet.load()
+        crops = {fn: sheet.crop((x, y, x + w, y + h)) for fn, (x, y, w, h) in meta["boxes"].items()}
+        return index_icons(crops), crops
+    except Exception:
+        return None
+
+
+def load_icons(icon_dir: Path):
+    """(índice, {arquivo: PIL.Image}) para o menu_button: o scandir de icon_dir
+    com as entradas do atlas por cima; os recortes do atlas já vêm decodificados
+    e o que não estiver no atlas é lido do PNG avulso."""
+    index = scan_icon_dir(icon_dir)
+    atlas = load_atlas(icon_dir)
+    if atlas is None:
+        return index, {}
+    atlas_index, crops = atlas
+    index.update(atlas_index)
+    return index, dict(crops)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    icon_dir = Path(args[0]) if args else Path(__file__).resolve().parents[1] / "theming" / "icons"
+    png, js = build_atlas(icon_dir)
+    print(f"atlas: {png} ({len(json.loads(js.read_text(encoding='utf-8'))['boxes'])} ícones)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,9 +1,11 @@
 
 import os, sys
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from PIL import Image
 import customtkinter as ctk
 
+from iluflex_tools.widgets.icon_atlas import load_icons
+
 # Icons live in ../theming/icons relative to this file
 
 from pathlib import Path
@@ -19,35 +21,68 @@ ICON_DIR = _base_dir() / "theming" / "icons"
 
 # ICON_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "theming", "icons"))
 
+# Cache de ícones do processo inteiro:
+#  - _ICON_INDEX: (nome, tamanho, "light"|"dark") -> arquivo, montado uma vez
+#    (scandir de ICON_DIR com as entradas do atlas icons_atlas.json por cima);
+#  - _DECODED: arquivo -> PIL.Image já decodificada (recortes do atlas; os
+#    demais PNGs são lidos uma vez, na primeira vez que forem pedidos);
+#  - _CTK_CACHE: (nome, tamanho, tema) -> CTkImage compartilhada entre botões,
+#    reconstruções da sidebar e trocas de tema (a CTkImage já troca
+#    light/dark sozinha quando o appearance mode muda).
+_ICON_INDEX, _DECODED = load_icons(ICON_DIR)
+_CTK_CACHE: Dict[Tuple[str, int, str], ctk.CTkImage] = {}
+
+
 def _find_icon_pair(name: str, size: int):
     # tenta size pedido -> 28 -> 24
     for s in (size, 28, 24):
-        lp = ICON_DIR / f"{name}_{s}px_light.png"
-        dp = ICON_DIR / f"{name}_{s}px_dark.png"
-        l = lp if lp.exists() else None
-        d = dp if dp.exists() else None
-        if l and d:
-            return str(l), str(d)
+        l = _ICON_INDEX.get((name, s, "light"))
+        d = _ICON_INDEX.get((name, s, "dark"))
         if l or d:
-            return str(l) if l else None, str(d) if d else None
+            return l, d
     return None, None
 
+def _decode(filename: Optional[str]):
+    if not filename:
+        return None
+    img = _DECODED.get(filename)
+    if img is None:
+        img = Image.open(ICON_DIR / filename)
+        img.load()  # decodifica agora e libera o arquivo
+        _DECODED[filename] = img
+    return img
+
+def clear_icon_cache():
+    """Esquece as CTkImage e as imagens decodificadas (ex.: ícones trocados em disco)."""
+    global _ICON_INDEX, _DECODED
+    _CTK_CACHE.clear()
+    _ICON_INDEX, _DECODED = load_icons(ICON_DIR)
+
 def ctk_image(name: str, size: int) -> ctk.CTkImage:
+    key = (name, size, "auto")
+    img = _CTK_CACHE.get(key)
+    if img is not None:
+        return img
     light, dark = _find_icon_pair(name, size)
     if not (light or dark):
         # fallback neutro
         light, dark = _find_icon_pair("question-mark", size)
-    li = Image.open(light) if light else None
-    di = Image.open(dark)  if dark  else None
+    li = _decode(light)
+    di = _decode(dark)
     if not (li or di):
         # última proteção: não derrubar a UI silenciosamente
         raise FileNotFoundError(f"Icon '{name}' {size}px não encontrado em {ICON_DIR}")
-    return ctk.CTkImage(light_image=li or di, dark_image=di or li, size=(size, size))
+    img = _CTK_CACHE[key] = ctk.CTkImage(light_image=li or di, dark_image=di or li, size=(size, size))
+    return img
 
 def ctk_imageLight(name:str, size: int, theme: str = None) -> ctk.CTkImage:
-    light, dark = _find_icon_pair(name, size)
-    di = Image.open(dark)
-    return ctk.CTkImage( dark_image=di, size=(size, size))
+    key = (name, size, "dark")
+    img = _CTK_CACHE.get(key)
+    if img is None:
+        light, dark = _find_icon_pair(name, size)
+        di = _decode(dark)
+        img = _CTK_CACHE[key] = ctk.CTkImage( dark_image=di, size=(size, size))
+    return img
 
 
 class MenuButton(ctk.CTkButton):
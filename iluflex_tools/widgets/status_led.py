@@ -1,5 +1,6 @@
 import customtkinter as ctk
 from iluflex_tools.core.services import ConnectionService
+from iluflex_tools.core.event_bus import STATE_TYPES, bus_for
 
 
 
@@ -13,7 +14,7 @@ class StatusLed(ctk.CTkFrame):
         super().__init__(master, fg_color=fg, **kwargs)
         self._size = int(size)
         self._conn: ConnectionService | None = None
-        self._listener = lambda ev: self._on_event(ev)
+        self._listener = lambda evs: self._on_event(evs[-1])  # lote do EventBus
         # usa label com ponto para herdar transparência do CTk
         self._font = ctk.CTkFont(size=self._size)
         self._lbl = ctk.CTkLabel(self, text="●", font=self._font, text_color="#666666", fg_color="transparent")
@@ -39,13 +40,13 @@ class StatusLed(ctk.CTkFrame):
     def bind_conn(self, conn: ConnectionService | None):
         if self._conn is not None:
             try:
-                self._conn.remove_listener(self._listener)
+                bus_for(self._conn).unsubscribe(self._listener)
             except Exception:
                 pass
         self._conn = conn
         if conn is not None:
             try:
-                conn.add_listener(self._listener)
+                bus_for(conn, self).subscribe(self._listener, types=STATE_TYPES | {"error"})
                 self._set_color("#2ecc71" if conn.connected else "#e74c3c")
             except Exception:
                 pass
@@ -53,7 +54,7 @@ class StatusLed(ctk.CTkFrame):
     def destroy(self):
         try:
             if self._conn is not None:
-                self._conn.remove_listener(self._listener)
+                bus_for(self._conn).unsubscribe(self._listener)
         except Exception:
             pass
         return super().destroy()
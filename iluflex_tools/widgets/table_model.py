@@ -0,0 +1,180 @@
+"""Modelo de dados da tabela virtualizada (ColumnToggleTree(virtual=True)).
+
+Guarda todas as linhas em Python; o Treeview só materializa a janela visível.
+Ordenação e filtro trabalham sobre índices (`view`) com chaves de ordenação
+em cache por coluna, então reordenar 10k+ linhas não toca no Tk.
+Sem dependência de Tk (testável isoladamente).
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+
+def sort_key(v: Any) -> tuple:
+    """Numéricos juntos (por valor), depois textos (sem caixa)."""
+    try:
+        return (0, float(v))
+    except Exception:
+        return (1, str(v).strip().lower())
+
+
+class VirtualRowModel:
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self._rows: list[tuple] = []
+        self._keys: list = []
+        self._index: Dict[Any, int] = {}
+        self._key_cols: tuple[str, ...] | None = None
+        self._view: list[int] = []
+        self._sort_col: str | None = None
+        self._sort_asc = True
+        self._filter: Callable[[tuple], bool] | None = None
+        self._key_cache: Dict[int, list] = {}   # coluna -> chave de ordenação por linha
+
+    # ---------------- dados ----------------
+    def __len__(self) -> int:
+        return len(self._view)
+
+    @property
+    def total(self) -> int:
+        return len(self._rows)
+
+    def _values(self, row) -> tuple:
+        if isinstance(row, tuple):
+            return row
+        return tuple(row.get(c, "") for c in self.columns)
+
+    def _key(self, vals: tuple, pos: int):
+        if not self._key_cols:
+            return pos
+        key = tuple(str(vals[self.columns.index(k)]) if k in self.columns else "" for k in self._key_cols)
+        return key[0] if len(key) == 1 else key
+
+    def set_key(self, key_cols: Iterable[str] | None) -> None:
+        self._key_cols = tuple(key_cols) if key_cols else None
+        self._keys = [self._key(v, i) for i, v in enumerate(self._rows)]
+        self._index = {k: i for i, k in enumerate(self._keys)}
+
+    def set_rows(self, rows: Iterable, key_cols: Iterable[str] | None = None) -> None:
+        """Substitui tudo (mantém a ordem dada, salvo ordenação ativa)."""
+        if key_cols is not None:
+            self._key_cols = tuple(key_cols) or None
+        self._rows = [self._values(r) for r in rows]
+        self._key_cache.clear()
+        self.set_key(self._key_cols)
+        self._rebuild_view()
+
+    def upsert(self, row, key_cols: Iterable[str] | None = None) -> int:
+        """Insere/atualiza por chave. Retorna o índice da linha no modelo."""
+        i, changed = self._upsert_one(row, key_cols)
+        if changed:
+            self._rebuild_view()
+        return i
+
+    def upsert_many(self, rows: Iterable, key_cols: Iterable[str] | None = None) -> int:
+        """upsert de várias linhas reconstruindo a visão uma vez só.
+        Retorna quantas linhas mudaram."""
+        changed = 0
+        for row in rows:
+            changed += self._upsert_one(row, key_cols)[1]
+        if changed:
+            self._rebuild_view()
+        return changed
+
+    def _upsert_one(self, row, key_cols) -> tuple[int, bool]:
+        if key_cols is not None and tuple(key_cols) != self._key_cols:
+            self.set_key(key_cols)
+        vals = self._values(row)
+        key = self._key(vals, len(self._rows))
+        i = self._index.get(key)
+        if i is None:
+            i = len(self._rows)
+            self._rows.append(vals)
+            self._keys.append(key)
+            self._index[key] = i
+            for col, cache in self._key_cache.items():
+                cache.append(sort_key(vals[col]))
+        elif self._rows[i] != vals:
+            self._rows[i] = vals
+            for col, cache in self._key_cache.items():
+                cache[i] = sort_key(vals[col])
+        else:
+            return i, False
+        return i, True
+
+    def set_value(self, idx: int, col: str, value) -> None:
+        c = self.columns.index(col)
+        vals = list(self._rows[idx])
+        vals[c] = value
+        self._rows[idx] = tuple(vals)
+        if c in self._key_cache:
+            self._key_cache[c][idx] = sort_key(value)
+        if self._key_cols and col in self._key_cols:
+            self._index.pop(self._keys[idx], None)
+            self._keys[idx] = self._key(self._rows[idx], idx)
+            self._index[self._keys[idx]] = idx
+        # a linha pode mudar de posição (coluna ordenada) ou entrar/sair do filtro
+        if col == self._sort_col or self._filter is not None:
+            self._rebuild_view()
+
+    def clear(self) -> None:
+        self.set_rows([])
+
+    # ---------------- consulta ----------------
+    def row(self, idx: int) -> tuple:
+        return self._rows[idx]
+
+    def key_of(self, idx: int):
+        return self._keys[idx]
+
+    def index_of(self, key) -> int | None:
+        return self._index.get(key)
+
+    def view_pos(self, key) -> int | None:
+        """Posição da chave na visão atual (None se filtrada/inexistente)."""
+        i = self._index.get(key)
+        if i is None:
+            return None
+        try:
+            return self._view.index(i)
+        except ValueError:
+            return None
+
+    def window(self, start: int, count: int) -> List[int]:
+        """Índices do modelo das linhas visíveis [start, start+count)."""
+        return self._view[max(0, start):max(0, start) + max(0, count)]
+
+    # ---------------- ordenação / filtro ----------------
+    def sort(self, col: str | None, ascending: bool = True) -> None:
+        self._sort_col = col
+        self._sort_asc = bool(ascending)
+        self._rebuild_view()
+
+    @property
+    def sort_state(self) -> tuple[str | None, bool]:
+        return self._sort_col, self._sort_asc
+
+    def set_filter(self, pred: Callable[[tuple], bool] | str | None) -> None:
+        """Predicado sobre a tupla de valores, texto (contém, sem caixa) ou None."""
+        if isinstance(pred, str):
+            needle = pred.strip().lower()
+            pred = (lambda vals, n=needle: any(n in str(v).lower() for v in vals)) if needle else None
+        self._filter = pred
+        self._rebuild_view()
+
+    def _sort_keys(self, c: int) -> list:
+        cache = self._key_cache.get(c)
+        if cache is None:
+            cache = self._key_cache[c] = [sort_key(v[c]) for v in self._rows]
+        return cache
+
+    def _rebuild_view(self) -> None:
+        if self._filter is None:
+            view = list(range(len(self._rows)))
+        else:
+            rows, pred = self._rows, self._filter
+            view = [i for i in range(len(rows)) if pred(rows[i])]
+        if self._sort_col in self.columns:
+            keys = self._sort_keys(self.columns.index(self._sort_col))
+            view.sort(key=keys.__getitem__, reverse=not self._sort_asc)
+        self._view = view
@@ -8,6 +8,8 @@ from tkinter import ttk
 from tkinter import font as tkfont
 import customtkinter as ctk
 
+from iluflex_tools.widgets.table_model import VirtualRowModel, sort_key
+
 
 # =============================================================================
 # ÚNICA FONTE DE CORES DA TABELA (por tema)
@@ -56,7 +58,10 @@ class ColumnToggleTree(ctk.CTkFrame):
 
     DEFAULT_FONT_SIZE = 12
 
-    def __init__(self, master, columns, height=12, font_size: int | None = None):
+    def __init__(self, master, columns, height=12, font_size: int | None = None,
+                 virtual: bool = False, overscan: int = 8):
+        """virtual=True: o dataset fica num VirtualRowModel e o Treeview só
+        materializa as linhas visíveis + `overscan` (para 10k+ linhas)."""
         super().__init__(master)
         # ---- normaliza colunas ----
         norm_columns = []
@@ -102,10 +107,28 @@ class ColumnToggleTree(ctk.CTkFrame):
             self.tree.heading(col, text=col, anchor=anchor, command=lambda c=col: self._on_heading_click(c))
             self.tree.column(col, width=width, anchor=anchor, stretch=True)
 
+        # modo virtual: modelo em Python + janela de itens reaproveitados
+        self._vmodel: VirtualRowModel | None = VirtualRowModel(self._all_cols) if virtual else None
+        self._v_overscan = max(0, int(overscan))
+        self._v_top = 0
+        self._v_pool: list[str] = []              # iids materializados (reaproveitados)
+        self._v_shown: dict[str, tuple] = {}      # iid -> (índice no modelo, valores, tags)
+        self._v_status: dict = {}                 # chave -> tags de status
+        self._v_flags: dict = {}                  # chave -> marcas extras
+        self._v_selected: set = set()             # chaves selecionadas
+
         # Scrollbars CTk
-        self.vsb = ctk.CTkScrollbar(self, command=self.tree.yview)
+        if self._vmodel is None:
+            self.vsb = ctk.CTkScrollbar(self, command=self.tree.yview)
+            self.tree.configure(yscrollcommand=self.vsb.set)
+        else:
+            self.vsb = ctk.CTkScrollbar(self, command=self._v_on_scroll)
+            for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.tree.bind(seq, self._v_on_wheel)
+            self.tree.bind("<Configure>", lambda _e: self._v_render(), add="+")
+            self.tree.bind("<<TreeviewSelect>>", self._v_on_select, add="+")
         self.hsb = ctk.CTkScrollbar(self, command=self.tree.xview, orientation="horizontal")
-        self.tree.configure(yscrollcommand=self.vsb.set, xscrollcommand=self.hsb.set)
+        self.tree.configure(xscrollcommand=self.hsb.set)
 
         # Layout
         self.tree.grid(row=0, column=0, sticky="nsew")
@@ -138,6 +161,17 @@ class ColumnToggleTree(ctk.CTkFrame):
         self._auto_sort_col = None
         self._auto_sort_asc = True
 
+        # modelo de linhas: chave -> iid, valores e tags já aplicados no Treeview
+        # (permite atualizar só o que mudou, sem apagar/reinserir tudo)
+        self._key_cols: tuple[str, ...] | None = None
+        self._iid_by_key: dict = {}
+        self._key_by_iid: dict = {}
+        self._values: dict[str, tuple] = {}
+        self._order: list[str] = []               # espelho de tree.get_children("")
+        self._status_tags: dict[str, tuple] = {}  # tags de cor definidas pela página
+        self._flag_tags: dict[str, set] = {}      # marcas extras (ex.: "edited")
+        self._applied_tags: dict[str, tuple] = {}
+
     # ---------- API de fonte ----------
     @classmethod
     def set_default_font_size(cls, size: int) -> None:
@@ -251,6 +285,10 @@ class ColumnToggleTree(ctk.CTkFrame):
             self.tree.tag_configure("dup_sid",  background="#FAE467", foreground="#111111")
             self.tree.tag_configure("sid_zero", background="#FAE467", foreground="#111111")
             self.tree.tag_configure("uniq_sid", background="#89E889", foreground="#111111")
+            # ---- busca de masters (cache de descoberta) ----
+            self.tree.tag_configure("disc_new",   background="#89E889", foreground="#111111")
+            self.tree.tag_configure("disc_moved", background="#FAE467", foreground="#111111")
+            self.tree.tag_configure("disc_stale", foreground="#8a8a8a")
         except Exception:
             pass
 
@@ -331,40 +369,271 @@ class ColumnToggleTree(ctk.CTkFrame):
         else:
             self._apply_hide(name)
         # refaz zebra
-        for i, iid in enumerate(self.tree.get_children("")):
-            self.tree.item(iid, tags=(("even" if i % 2 == 0 else "odd"),))
+        self._refresh_tags()
+
+    # ---------- modelo de linhas ----------
+    def _row_values(self, row) -> tuple:
+        return tuple(row.get(c, "") for c in self._all_cols)
+
+    def _key_from_values(self, vals: tuple):
+        idx = [self._all_cols.index(k) if k in self._all_cols else None for k in self._key_cols]
+        key = tuple("" if i is None or i >= len(vals) else str(vals[i]) for i in idx)
+        return key[0] if len(key) == 1 else key
+
+    def _key_of(self, row):
+        key = tuple(str(row.get(k, "")) for k in self._key_cols)
+        return key[0] if len(key) == 1 else key
+
+    def _use_key(self, key_cols) -> None:
+        """Define as colunas-chave; reindexa as linhas existentes se mudou."""
+        key_cols = tuple(key_cols)
+        if key_cols == self._key_cols:
+            return
+        self._key_cols = key_cols
+        self._iid_by_key.clear()
+        self._key_by_iid.clear()
+        for iid in self._order:
+            key = self._key_from_values(self._values.get(iid, ()))
+            self._iid_by_key[key] = iid
+            self._key_by_iid[iid] = key
+
+    def _insert(self, vals: tuple, key=None) -> str:
+        iid = self.tree.insert("", "end", values=vals)
+        self._values[iid] = vals
+        self._order.append(iid)
+        if key is not None:
+            self._iid_by_key[key] = iid
+            self._key_by_iid[iid] = key
+        return iid
+
+    def _forget(self, iid: str) -> None:
+        self._values.pop(iid, None)
+        self._status_tags.pop(iid, None)
+        self._flag_tags.pop(iid, None)
+        self._applied_tags.pop(iid, None)
+        key = self._key_by_iid.pop(iid, None)
+        if key is not None and self._iid_by_key.get(key) == iid:
+            del self._iid_by_key[key]
+
+    def _apply_order(self, desired: list[str]) -> None:
+        """Move só os itens fora de posição."""
+        if desired == self._order:
+            return
+        cur = list(self._order)
+        for i, iid in enumerate(desired):
+            if i < len(cur) and cur[i] == iid:
+                continue
+            self.tree.move(iid, "", i)
+            cur.remove(iid)
+            cur.insert(i, iid)
+        self._order = cur
+
+    def _tags_for(self, iid: str, pos: int) -> tuple:
+        base = self._status_tags.get(iid) or (("even" if pos % 2 == 0 else "odd"),)
+        flags = self._flag_tags.get(iid)
+        return tuple(sorted(flags)) + base if flags else base
+
+    def _refresh_tags(self) -> None:
+        """Aplica zebra/status só nas linhas cujas tags mudaram."""
+        if self._vmodel is not None:
+            self._v_render()
+            return
+        applied = self._applied_tags
+        for pos, iid in enumerate(self._order):
+            tags = self._tags_for(iid, pos)
+            if applied.get(iid) != tags:
+                self.tree.item(iid, tags=tags)
+                applied[iid] = tags
 
     # ---------- API de dados ----------
+    def clear(self) -> None:
+        if self._vmodel is not None:
+            self._vmodel.clear()
+            self._v_status.clear()
+            self._v_flags.clear()
+            self._v_selected.clear()
+            self._v_top = 0
+            self._v_render()
+            return
+        if self._order:
+            self.tree.delete(*self._order)
+        self._iid_by_key.clear()
+        self._key_by_iid.clear()
+        self._values.clear()
+        self._order = []
+        self._status_tags.clear()
+        self._flag_tags.clear()
+        self._applied_tags.clear()
+
     def set_rows(self, rows):
-        self.tree.delete(*self.tree.get_children(""))
+        """Substitui o conteúdo. Com colunas-chave definidas (update_rows/
+        upsert_row) aplica só as diferenças; senão reconstrói."""
         if not rows:
+            self.clear()
+            return
+        if self._vmodel is not None:
+            self._vmodel.set_rows(rows)
+            self._v_render()
             return
-        # reconstrução simples com zebra + tag de fonte base
-        for idx, row in enumerate(rows):
-            values = [row.get(c, "") for c in self._all_cols]
-            zebra = ("even" if idx % 2 == 0 else "odd")
-            self.tree.insert("", "end", values=values, tags=("__basefont__", zebra))
+        if self._key_cols:
+            self.update_rows(rows)
+            return
+        self.clear()
+        for row in rows:
+            self._insert(self._row_values(row))
         self._auto_sort_if_needed()
+        self._refresh_tags()
+
+    def update_rows(self, rows, key_cols=None, remove_missing: bool = True) -> None:
+        """Sincroniza a tabela com `rows` (na ordem dada) por chave: insere as
+        novas, atualiza só as alteradas, move as fora de posição e, com
+        remove_missing, remove as que sumiram. Ordena uma vez se houver
+        ordenação por cabeçalho ativa."""
+        if self._vmodel is not None:
+            # no modo virtual o modelo é substituído (só a janela toca no Tk)
+            if remove_missing:
+                self._vmodel.set_rows(rows, key_cols=key_cols)
+            else:
+                self._vmodel.upsert_many(rows, key_cols)
+            self._v_render()
+            return
+        if key_cols is not None:
+            self._use_key(key_cols)
+        if not self._key_cols:
+            raise ValueError("update_rows precisa de key_cols")
+        seen: dict[str, None] = {}
+        for row in rows:
+            key = self._key_of(row)
+            vals = self._row_values(row)
+            iid = self._iid_by_key.get(key)
+            if iid is None:
+                iid = self._insert(vals, key)
+            elif self._values.get(iid) != vals:
+                self.tree.item(iid, values=vals)
+                self._values[iid] = vals
+            seen[iid] = None
+        if remove_missing:
+            gone = [iid for iid in self._order if iid not in seen]
+            if gone:
+                self.tree.delete(*gone)
+                for iid in gone:
+                    self._forget(iid)
+                self._order = [iid for iid in self._order if iid in seen]
+            desired = list(seen)
+        else:
+            desired = list(self._order)
+        if getattr(self, "_auto_sort_col", None):
+            desired = self._sorted_iids(desired, self._auto_sort_col)
+        if desired is not None:
+            self._apply_order(desired)
+        self._refresh_tags()
 
     def upsert_row(self, row, key_cols=("MAC",)) -> None:
-        key = tuple(row.get(k, "") for k in key_cols)
-        target = None
-        for iid in self.tree.get_children(""):
-            vals = self.tree.item(iid, "values")
-            cur_key = tuple(
-                vals[self._all_cols.index(k)] if k in self._all_cols else None for k in key_cols
-            )
-            if cur_key == key:
-                target = iid
-                break
-        values = [row.get(col, "") for col in self._all_cols]
+        if self._vmodel is not None:
+            self._vmodel.upsert(row, key_cols)
+            self._v_render()
+            return
+        self._use_key(key_cols)
+        key = self._key_of(row)
+        values = self._row_values(row)
+        target = self._iid_by_key.get(key)
         if target is None:
-            i = len(self.tree.get_children(""))
-            tag = "even" if i % 2 == 0 else "odd"
-            self.tree.insert("", "end", values=values, tags=(tag,))
-        else:
+            self._insert(values, key)
+        elif self._values.get(target) != values:
             self.tree.item(target, values=values)
+            self._values[target] = values
         self._auto_sort_if_needed()
+        self._refresh_tags()
+
+    def iid_for(self, key) -> str | None:
+        """iid da linha com a chave dada (ex.: MAC), ou None.
+        No modo virtual só linhas materializadas têm iid."""
+        if self._vmodel is not None:
+            idx = self._vmodel.index_of(key)
+            return next((iid for iid, shown in self._v_shown.items() if shown[0] == idx), None)
+        return self._iid_by_key.get(key)
+
+    def set_cell(self, iid: str, col: str, value) -> None:
+        """Altera uma célula mantendo o modelo em dia (usar no lugar de tree.set)."""
+        if self._vmodel is not None:
+            shown = self._v_shown.get(iid)
+            if shown is not None:
+                self._vmodel.set_value(shown[0], col, value)
+                self._v_render()
+            return
+        self.tree.set(iid, col, value)
+        vals = list(self._values.get(iid, ()))
+        try:
+            i = self._all_cols.index(col)
+        except ValueError:
+            return
+        if i < len(vals):
+            vals[i] = value
+            self._values[iid] = tuple(vals)
+        if self._key_cols and col in self._key_cols:
+            old = self._key_by_iid.pop(iid, None)
+            if old is not None and self._iid_by_key.get(old) == iid:
+                del self._iid_by_key[old]
+            key = self._key_from_values(self._values[iid])
+            self._iid_by_key[key] = iid
+            self._key_by_iid[iid] = key
+
+    def set_status_tags(self, tags_by_key: dict) -> None:
+        """Tags de cor por chave ({mac: ("dup_sid",)}); substituem a zebra na
+        linha. Só as linhas com tags diferentes são tocadas no Treeview."""
+        if self._vmodel is not None:
+            for key, tags in tags_by_key.items():
+                self._v_status[key] = tuple(tags or ())
+            self._v_render()
+            return
+        for key, tags in tags_by_key.items():
+            iid = self._iid_by_key.get(key)
+            if iid is not None:
+                self._status_tags[iid] = tuple(tags or ())
+        self._refresh_tags()
+
+    def set_row_flag(self, key, tag: str, on: bool = True) -> None:
+        """Liga/desliga uma marca extra (ex.: "edited") na linha da chave."""
+        if self._vmodel is not None:
+            flags = self._v_flags.setdefault(key, set())
+            flags.add(tag) if on else flags.discard(tag)
+            if not flags:
+                self._v_flags.pop(key, None)
+            self._v_render()
+            return
+        iid = self._iid_by_key.get(key)
+        if iid is None:
+            return
+        flags = self._flag_tags.setdefault(iid, set())
+        if on:
+            flags.add(tag)
+        else:
+            flags.discard(tag)
+            if not flags:
+                self._flag_tags.pop(iid, None)
+        self._refresh_tags()
+
+    def clear_flag(self, tag: str) -> None:
+        if self._vmodel is not None:
+            for key in list(self._v_flags):
+                self._v_flags[key].discard(tag)
+                if not self._v_flags[key]:
+                    del self._v_flags[key]
+            self._v_render()
+            return
+        for iid in list(self._flag_tags):
+            self._flag_tags[iid].discard(tag)
+            if not self._flag_tags[iid]:
+                del self._flag_tags[iid]
+        self._refresh_tags()
+
+    def clear_all_tags(self) -> None:
+        """Remove status e marcas; volta à zebra."""
+        self._v_status.clear()
+        self._v_flags.clear()
+        self._status_tags.clear()
+        self._flag_tags.clear()
+        self._refresh_tags()
 
     def get_selected_row(self):
         sel = self.tree.selection()
@@ -388,34 +657,159 @@ class ColumnToggleTree(ctk.CTkFrame):
             self._auto_sort_asc = bool(ascending)
         self._sort_by(col, toggle=False)
 
-    def _sort_by(self, col: str, toggle: bool = True) -> None:
+    def _sorted_iids(self, iids: list[str], col: str) -> list[str] | None:
         try:
             idx = self._all_cols.index(col)
         except ValueError:
-            return
-        children = list(self.tree.get_children(""))
+            return None
+        values = self._values
 
         def _key(iid):
-            vals = self.tree.item(iid, "values")
-            v = vals[idx] if idx < len(vals) else ""
-            try:
-                return (0, float(v))                # numéricos juntos
-            except Exception:
-                return (1, str(v).strip().lower())  # textos juntos
-
+            vals = values.get(iid, ())
+            return sort_key(vals[idx] if idx < len(vals) else "")
 
         reverse = not getattr(self, "_auto_sort_asc", True)
-        children.sort(key=_key, reverse=reverse)
-        for i, iid in enumerate(children):
-            self.tree.move(iid, "", i)
-        for i, iid in enumerate(self.tree.get_children("")):
-            self.tree.item(iid, tags=(("even" if i % 2 == 0 else "odd"),))
+        return sorted(iids, key=_key, reverse=reverse)
+
+    def _sort_by(self, col: str, toggle: bool = True) -> None:
+        if self._vmodel is not None:
+            # ordena índices no modelo com chaves em cache; o Tk só redesenha a janela
+            self._vmodel.sort(col, getattr(self, "_auto_sort_asc", True))
+            self._v_render()
+            if toggle:
+                self._auto_sort_asc = not self._auto_sort_asc
+            return
+        desired = self._sorted_iids(self._order, col)
+        if desired is None:
+            return
+        self._apply_order(desired)
+        self._refresh_tags()
         if toggle:
             self._auto_sort_asc = not self._auto_sort_asc
 
     def _auto_sort_if_needed(self) -> None:
         if getattr(self, "_auto_sort_col", None):
             self._sort_by(self._auto_sort_col, toggle=False)
+
+    # ---------- modo virtual ----------
+    def set_filter(self, pred) -> None:
+        """Filtra as linhas (texto contido em qualquer coluna, predicado sobre
+        a tupla de valores, ou None). Só no modo virtual."""
+        if self._vmodel is None:
+            raise RuntimeError("set_filter requer ColumnToggleTree(virtual=True)")
+        self._vmodel.set_filter(pred)
+        self._v_top = 0
+        self._v_render()
+
+    def scroll_to(self, key) -> None:
+        """Rola (modo virtual) até a linha da chave."""
+        if self._vmodel is None:
+            iid = self._iid_by_key.get(key)
+            if iid:
+                self.tree.see(iid)
+            return
+        pos = self._vmodel.view_pos(key)
+        if pos is not None:
+            win = self._v_visible_rows()
+            if not self._v_top <= pos < self._v_top + win:
+                self._v_top = max(0, pos - win // 2)
+                self._v_render()
+
+    def _v_visible_rows(self) -> int:
+        try:
+            h = int(self.tree.winfo_height())
+            rh = int(self._style.lookup(self._style_tv, "rowheight") or 0)
+            if h > 1 and rh > 0:
+                return max(1, h // rh)
+        except Exception:
+            pass
+        try:
+            return max(1, int(self.tree.cget("height")))
+        except Exception:
+            return 12
+
+    def _v_render(self) -> None:
+        m = self._vmodel
+        if m is None:
+            return
+        n = len(m)
+        win = self._v_visible_rows()
+        self._v_top = max(0, min(self._v_top, n - win))
+        idxs = m.window(self._v_top, win + self._v_overscan)
+
+        # ajusta o pool de itens (reaproveitados entre rolagens)
+        pool = self._v_pool
+        while len(pool) < len(idxs):
+            pool.append(self.tree.insert("", "end", values=()))
+        if len(pool) > len(idxs):
+            extra = pool[len(idxs):]
+            self.tree.delete(*extra)
+            for iid in extra:
+                self._v_shown.pop(iid, None)
+            del pool[len(idxs):]
+
+        select = []
+        for i, (iid, idx) in enumerate(zip(pool, idxs)):
+            vals = m.row(idx)
+            key = m.key_of(idx)
+            pos = self._v_top + i
+            tags = self._v_status.get(key) or (("even" if pos % 2 == 0 else "odd"),)
+            flags = self._v_flags.get(key)
+            if flags:
+                tags = tuple(sorted(flags)) + tags
+            prev = self._v_shown.get(iid)
+            if prev is None or prev[1] != vals:
+                self.tree.item(iid, values=vals, tags=tags)
+            elif prev[2] != tags:
+                self.tree.item(iid, tags=tags)
+            self._v_shown[iid] = (idx, vals, tags)
+            if key in self._v_selected:
+                select.append(iid)
+        self._v_syncing = True
+        try:
+            if tuple(self.tree.selection()) != tuple(select):
+                self.tree.selection_set(select)
+        finally:
+            self._v_syncing = False
+        self.tree.yview_moveto(0)
+        if n:
+            self.vsb.set(self._v_top / n, min(1.0, (self._v_top + win) / n))
+        else:
+            self.vsb.set(0.0, 1.0)
+
+    def _v_scroll_rows(self, delta: int) -> None:
+        top = self._v_top + int(delta)
+        if top != self._v_top:
+            self._v_top = max(0, top)
+            self._v_render()
+
+    def _v_on_scroll(self, *args) -> None:
+        """Comando da scrollbar: ('moveto', f) ou ('scroll', n, 'units'|'pages')."""
+        if not args or self._vmodel is None:
+            return
+        win = self._v_visible_rows()
+        if args[0] == "moveto":
+            self._v_top = int(float(args[1]) * len(self._vmodel))
+            self._v_render()
+        elif args[0] == "scroll":
+            n = int(args[1])
+            self._v_scroll_rows(n * win if len(args) > 2 and args[2] == "pages" else n)
+
+    def _v_on_wheel(self, event):
+        if getattr(event, "num", None) == 4:
+            step = -3
+        elif getattr(event, "num", None) == 5:
+            step = 3
+        else:
+            step = -3 if getattr(event, "delta", 0) > 0 else 3
+        self._v_scroll_rows(step)
+        return "break"
+
+    def _v_on_select(self, _event=None) -> None:
+        if getattr(self, "_v_syncing", False) or self._vmodel is None:
+            return
+        self._v_selected = {self._vmodel.key_of(self._v_shown[iid][0])
+                            for iid in self.tree.selection() if iid in self._v_shown}
             
 
 """
@@ -4,6 +4,8 @@ import math
 from typing import List, Dict, Optional
 import customtkinter as ctk
 
+from iluflex_tools.widgets.waveform_lod import WaveTrack
+
 # --------------------------------------------------------------------
 # Paleta alinhada ao table_tree (mantém line1/line2/line3 e contraste)
 # --------------------------------------------------------------------
@@ -41,6 +43,8 @@ def _palette() -> dict:
 # Conversão de ticks x tempo (fidelidade com o learner)
 TICKS_PER_MS = 625.0  # 1 ms ≈ 625 ticks (1.6 µs por tick)
 
+RESIZE_DEBOUNCE_MS = 40  # espera entre o último <Configure> e o redraw
+
 # --------------------------------------------------------------------
 # Funções com MESMOS NOMES do learner (para comparação 1:1)
 # --------------------------------------------------------------------
@@ -90,9 +94,17 @@ def get_rep_from_cmd(cmd: Optional[str]) -> int:
     except Exception:
         return 1
 
-def draw_waveform_overlay(canvas: tk.Canvas, series: List[Dict], height: int, x_scale: float):
+TRACK_BASE_Y = 22  # centro da 1ª trilha
+TRACK_GAP = 28     # distância vertical entre trilhas
+
+
+def draw_waveform_overlay(canvas: tk.Canvas, series: List[Dict], height: int, x_scale: float,
+                          view: Optional[tuple] = None):
     """Desenha múltiplas trilhas no canvas (fiel ao learner).
     series: lista de dicts { 'pulses': list[int], 'label': str, 'color': str }
+            (opcional 'track': WaveTrack com os tempos acumulados já calculados)
+    view: faixa (x_min, x_max) em coordenadas do canvas a desenhar; None = tudo.
+    Cada trilha vira uma única polyline; pulsos menores que 1 px viram envelope min/max.
     """
     if canvas is None:
         return
@@ -102,90 +114,78 @@ def draw_waveform_overlay(canvas: tk.Canvas, series: List[Dict], height: int, x_
     if not valid_series:
         return
 
-    # comprimento total (para scroll)
-    lengths = [sum(s['pulses']) for s in valid_series]
-    if not lengths:
-        return
-
-    max_len = max(lengths)
+    tracks = [s.get('track') or WaveTrack(s['pulses']) for s in valid_series]
+    max_len = max(t.total for t in tracks)
     content_width = max_len * x_scale + 20
     canvas.config(scrollregion=(0, 0, content_width, height))
 
-    # Desenha trilhas (osciloscópio)
-    def draw_oscilloscope(pulses: List[int], base_y: int, color: str):
-        x = 10.0
-        high = base_y - 10
-        low  = base_y + 10
-        is_on = True
-        for duration in pulses:
-            length = duration * x_scale
-            if is_on:
-                # vertical + horizontal em "alto" com espessura 2 (como no learner)
-                canvas.create_line(x, low, x, high, fill=color, width=2)
-                canvas.create_line(x, high, x + length, high, fill=color, width=2)
-                canvas.create_line(x + length, high, x + length, low, fill=color, width=2)
-            else:
-                # trilha baixa mais fina (width=1)
-                canvas.create_line(x, low, x + length, low, fill=color, width=1)
-            x += length
-            is_on = not is_on
-
-    base = 22
-    gap  = 28
-    for idx, s in enumerate(valid_series):
-        draw_oscilloscope(s['pulses'], base_y=base + idx * gap, color=s.get('color', 'black'))
-
-    # ---------------- Régua de tempo (ms) no rodapé -------------------
-    def _choose_steps(px_per_ms: float) -> tuple[float, float]:
-        # devolve (major_ms, minor_ms)
-        if px_per_ms >= 80:  return 1.0, 0.5
-        if px_per_ms >= 40:  return 2.0, 1.0
-        if px_per_ms >= 20:  return 5.0, 1.0
-        if px_per_ms >= 10:  return 10.0, 5.0
-        return 20.0, 10.0
-
-    # total em ticks e ms
-    max_len_ticks = max_len
-    total_ms = max_len_ticks / TICKS_PER_MS
+    x_min, x_max = view if view else (None, None)
+
+    # Desenha trilhas (osciloscópio): uma polyline por trilha
+    for idx, (s, t) in enumerate(zip(valid_series, tracks)):
+        base_y = TRACK_BASE_Y + idx * TRACK_GAP
+        pts = t.points(x_scale, base_y - 10, base_y + 10, x0=10.0, x_min=x_min, x_max=x_max)
+        if len(pts) >= 4:
+            canvas.create_line(pts, fill=s.get('color', 'black'), width=2, tags=("wave",))
+
+    draw_time_ruler(canvas, max_len, height, x_scale, view)
+
+
+def _choose_steps(px_per_ms: float) -> tuple[float, float]:
+    # devolve (major_ms, minor_ms)
+    if px_per_ms >= 80:  return 1.0, 0.5
+    if px_per_ms >= 40:  return 2.0, 1.0
+    if px_per_ms >= 20:  return 5.0, 1.0
+    if px_per_ms >= 10:  return 10.0, 5.0
+    return 20.0, 10.0
+
+
+def draw_time_ruler(canvas: tk.Canvas, total_ticks: int, height: int, x_scale: float,
+                    view: Optional[tuple] = None, tags: tuple = ("ruler",)):
+    """Régua de tempo (ms) no rodapé; com view, só as marcas dentro da faixa."""
+    total_ms = total_ticks / TICKS_PER_MS
     px_per_ms = x_scale * TICKS_PER_MS
+    if px_per_ms <= 0:
+        return
 
     base_y = height - 15
     left_x = 10.0
-    right_x = 10.0 + max_len_ticks * x_scale
+    right_x = 10.0 + total_ticks * x_scale
+    v0, v1 = view if view else (left_x, right_x)
+    v0, v1 = max(left_x, v0), min(right_x, v1)
+    if v1 < v0:
+        return
 
     # linha base da régua (colada embaixo)
-    canvas.create_line(left_x, base_y, right_x, base_y, fill="#888", width=1)
+    canvas.create_line(v0, base_y, v1, base_y, fill="#888", width=1, tags=tags)
 
     major_ms, minor_ms = _choose_steps(px_per_ms)
+    ms_lo = (v0 - left_x) / px_per_ms
+    ms_hi = min(total_ms, (v1 - left_x) / px_per_ms)
 
     # "0 ms"
-    canvas.create_text(left_x, base_y + 2, text="0",   anchor="n",
-                       font=("TkDefaultFont", 9), fill="#666")
-    canvas.create_text(left_x + 14, base_y + 2, text="ms", anchor="n",
-                       font=("TkDefaultFont", 9), fill="#666")
+    if v0 <= left_x + 14:
+        canvas.create_text(left_x, base_y + 2, text="0",   anchor="n",
+                           font=("TkDefaultFont", 9), fill="#666", tags=tags)
+        canvas.create_text(left_x + 14, base_y + 2, text="ms", anchor="n",
+                           font=("TkDefaultFont", 9), fill="#666", tags=tags)
 
     # major ticks + labels
-    n_major = int(math.floor(total_ms / major_ms)) + 1 if major_ms > 0 else 0
-    for k in range(1, n_major + 1):
+    for k in range(max(1, math.ceil(ms_lo / major_ms)), int(math.floor(ms_hi / major_ms)) + 1):
         ms = k * major_ms
         x = left_x + ms * px_per_ms
-        if x > right_x:
-            break
-        canvas.create_line(x, base_y, x, base_y - 6, fill="#777", width=1)
+        canvas.create_line(x, base_y, x, base_y - 6, fill="#777", width=1, tags=tags)
         canvas.create_text(x, base_y + 2, text=f"{int(ms)}", anchor="n",
-                           font=("TkDefaultFont", 9), fill="#666")
+                           font=("TkDefaultFont", 9), fill="#666", tags=tags)
 
     # minor ticks (sem rótulo; pula se coincide com major)
     if minor_ms > 0:
-        n_minor = int(math.floor(total_ms / minor_ms)) + 1
-        for j in range(n_minor + 1):
+        for j in range(math.ceil(ms_lo / minor_ms), int(math.floor(ms_hi / minor_ms)) + 1):
             ms = j * minor_ms
             if abs((ms / major_ms) - round(ms / major_ms)) < 1e-6:
                 continue
             x = left_x + ms * px_per_ms
-            if x > right_x:
-                break
-            canvas.create_line(x, base_y, x, base_y - 4, fill="#bbb", width=1)
+            canvas.create_line(x, base_y, x, base_y - 4, fill="#bbb", width=1, tags=tags)
 
 # --------------------------------------------------------------------
 # Widget: prepara as séries e chama draw_waveform_overlay (learner-like)
@@ -215,16 +215,24 @@ class WaveformCanvas(tk.Canvas):
         self.ir_command_pre_process: str = ""
         self.ir_command_converted_plot: str = ""
 
-        # caches
+        # caches: uma WaveTrack (pulsos + tempos acumulados) por série
+        self._tracks: Dict[str, WaveTrack] = {}
         self._pulses_received: List[int] = []
         self._pulses_pre: List[int] = []
         self._pulses_conv: List[int] = []
 
+        # id da polyline de cada série (reaproveitada entre redraws)
+        self._lines: Dict[str, int] = {}
+
         # escala horizontal (px por TICK)
         self._x_scale: float = 0.05
 
-        # redraw ao redimensionar
-        self.bind("<Configure>", lambda e: self.redraw())
+        # faixa (x0, x1) desenhada por último e redraw agendado
+        self._drawn: Optional[tuple] = None
+        self._redraw_job = None
+
+        # redraw ao redimensionar (debounce: só depois que o usuário para de arrastar)
+        self.bind("<Configure>", lambda e: self._schedule_redraw(RESIZE_DEBOUNCE_MS))
 
     # -------- API pública ------------------------------------------------
     def set_zoom(self, px_per_tick: float) -> None:
@@ -245,50 +253,152 @@ class WaveformCanvas(tk.Canvas):
             self.ir_command_pre_process = pre or ""
         if converted is not None:
             self.ir_command_converted_plot = converted or ""
-        self._rebuild_pulse_cache()
-        self.redraw()
+        if self._rebuild_pulse_cache():
+            self.redraw()
 
     def set_received(self, s: Optional[str]) -> None:
         self.received_cmd_raw = s or ""
-        self._rebuild_pulse_cache()
-        self.redraw()
+        if self._rebuild_pulse_cache(("received",)):
+            self.redraw()
 
     def set_preprocessed(self, s: Optional[str]) -> None:
         self.ir_command_pre_process = s or ""
-        self._rebuild_pulse_cache()
-        self.redraw()
+        if self._rebuild_pulse_cache(("pre",)):
+            self.redraw()
 
     def set_converted(self, s: Optional[str]) -> None:
         self.ir_command_converted_plot = s or ""
-        self._rebuild_pulse_cache()
-        self.redraw()
+        if self._rebuild_pulse_cache(("conv",)):
+            self.redraw()
+
+    # -------- Rolagem horizontal ----------------------------------------
+    # Rolar só desloca a vista do canvas (os itens já desenhados não mudam).
+    # Só a região visível (com uma tela de margem de cada lado) é desenhada;
+    # ao rolar para fora dela, agenda um redraw que reaproveita as polylines.
+    def xview(self, *args):
+        res = super().xview(*args)
+        if args:
+            self._ensure_rendered()
+        return res
+
+    def xview_moveto(self, fraction):
+        super().xview_moveto(fraction)
+        self._ensure_rendered()
+
+    def xview_scroll(self, number, what):
+        super().xview_scroll(number, what)
+        self._ensure_rendered()
 
     # -------- Implementação ---------------------------------------------
-    def _rebuild_pulse_cache(self) -> None:
-        """Extrai/atualiza as três listas de pulsos para desenho."""
-        self._pulses_received = extract_pulses_from_sir2(self.received_cmd_raw)
-        self._pulses_pre      = extract_pulses_from_sir2(self.ir_command_pre_process)
+    def _visible_range(self) -> tuple:
+        try:
+            x0 = float(self.canvasx(0))
+            w = float(self.winfo_width()) or 1.0
+        except Exception:
+            return (None, None)
+        return (x0, x0 + w)
+
+    def _ensure_rendered(self) -> None:
+        if self._drawn is None:
+            return
+        x0, x1 = self._visible_range()
+        if x0 is None:
+            return
+        if x0 < self._drawn[0] or x1 > self._drawn[1]:
+            self._schedule_redraw(0)
 
-        self._pulses_conv = extract_pulses_from_sir2(self.ir_command_converted_plot)
-        if self._pulses_conv:
-            rep = get_rep_from_cmd(self.ir_command_converted_plot)
-            self._pulses_conv = repeat_pulses(self._pulses_conv, rep)
+    def _schedule_redraw(self, delay_ms: int) -> None:
+        """Agrupa pedidos de redraw (resize/scroll) num único desenho."""
+        try:
+            if self._redraw_job is not None:
+                self.after_cancel(self._redraw_job)
+            if delay_ms > 0:
+                self._redraw_job = self.after(delay_ms, self._run_scheduled_redraw)
+            else:
+                self._redraw_job = self.after_idle(self._run_scheduled_redraw)
+        except Exception:
+            self._redraw_job = None
+            self.redraw()
+
+    def _run_scheduled_redraw(self) -> None:
+        self._redraw_job = None
+        self.redraw()
+
+    # chave -> (atributo com o comando, rótulo, cor da paleta)
+    _SERIES = (
+        ("received", "received_cmd_raw", "capturado", "line1"),
+        ("pre", "ir_command_pre_process", "otimizado", "line2"),
+        ("conv", "ir_command_converted_plot", "convertido", "line3"),
+    )
+
+    def _rebuild_pulse_cache(self, keys: Optional[tuple] = None) -> bool:
+        """Extrai os pulsos só das séries cujo comando mudou. Retorna True se alguma mudou."""
+        changed = False
+        for key, attr, _label, _color in self._SERIES:
+            if keys is not None and key not in keys:
+                continue
+            src = getattr(self, attr) or ""
+            track = self._tracks.get(key)
+            if track is not None and track.source == src:
+                continue
+            pulses = extract_pulses_from_sir2(src)
+            if key == "conv" and pulses:
+                pulses = repeat_pulses(pulses, get_rep_from_cmd(src))
+            self._tracks[key] = WaveTrack(pulses, source=src)
+            changed = True
+
+        self._pulses_received = self._tracks["received"].pulses if "received" in self._tracks else []
+        self._pulses_pre = self._tracks["pre"].pulses if "pre" in self._tracks else []
+        self._pulses_conv = self._tracks["conv"].pulses if "conv" in self._tracks else []
+        return changed
 
     def redraw(self) -> None:
-        """Redesenha o canvas com as trilhas disponíveis (usa draw_waveform_overlay)."""
-        # monta séries (ordem: capturado, otimizado, convertido)
-        series: List[Dict] = []
-        if self._pulses_received:
-            series.append({"pulses": self._pulses_received, "label": "capturado", "color": self._pal["line1"]})
-        if self._pulses_pre:
-            series.append({"pulses": self._pulses_pre, "label": "otimizado", "color": self._pal["line2"]})
-        if self._pulses_conv:
-            series.append({"pulses": self._pulses_conv, "label": "convertido", "color": self._pal["line3"]})
+        """Redesenha as trilhas visíveis (ordem: capturado, otimizado, convertido).
+        As polylines existentes são atualizadas com coords(); a régua é refeita
+        só para a faixa desenhada."""
+        series = [(key, self._tracks[key], self._pal[color])
+                  for key, _attr, _label, color in self._SERIES
+                  if key in self._tracks and self._tracks[key].pulses]
 
         if not series:
+            self._drawn = None
+            self._lines.clear()
             self.delete("all")
-            self.create_text(8, 8, text="Waveform (sem dados)", anchor="nw", fill=self._pal["text"])
+            self.create_text(8, 8, text="Waveform (sem dados)", anchor="nw", fill=self._pal["text"],
+                             tags=("empty_msg",))
             return
 
+        self.delete("empty_msg")
         h = self.winfo_height() or 110
-        draw_waveform_overlay(self, series=series, height=h, x_scale=float(self._x_scale))
+        x_scale = float(self._x_scale)
+        max_len = max(t.total for _k, t, _c in series)
+        self.config(scrollregion=(0, 0, max_len * x_scale + 20, h))
+
+        x0, x1 = self._visible_range()
+        view = None
+        if x0 is not None:
+            margin = x1 - x0
+            view = (max(0.0, x0 - margin), x1 + margin)
+        x_min, x_max = view if view else (None, None)
+
+        for idx, (key, track, color) in enumerate(series):
+            base_y = TRACK_BASE_Y + idx * TRACK_GAP
+            pts = track.points(x_scale, base_y - 10, base_y + 10, x0=10.0, x_min=x_min, x_max=x_max)
+            item = self._lines.get(key)
+            if len(pts) < 4:
+                if item is not None:
+                    self.itemconfigure(item, state="hidden")
+                continue
+            if item is None:
+                self._lines[key] = self.create_line(pts, fill=color, width=2, tags=("wave",))
+            else:
+                self.coords(item, pts)
+                self.itemconfigure(item, state="normal", fill=color)
+
+        present = {key for key, _t, _c in series}
+        for key in [k for k in self._lines if k not in present]:
+            self.delete(self._lines.pop(key))
+
+        self.delete("ruler")
+        draw_time_ruler(self, max_len, h, x_scale, view)
+        self._drawn = view or (float("-inf"), float("inf"))
@@ -0,0 +1,120 @@
+"""Geometria das trilhas do WaveformCanvas com nível de detalhe (LOD).
+
+Cada trilha vira UMA polyline (lista plana x0, y0, x1, y1, ...):
+  - só o trecho [x_min, x_max] é gerado (culling da região visível); o
+    primeiro pulso visível é achado por busca binária no vetor de tempos
+    acumulados (starts), sem percorrer o começo da captura;
+  - as transições são agrupadas por coluna de pixel: pulsos menores que um
+    pixel viram um envelope min/max vertical (no máximo 3 pontos por coluna).
+Sem dependência de Tk (testável isoladamente).
+"""
+from __future__ import annotations
+
+import math
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Optional, Sequence
+
+
+def cumulative(pulses: Sequence[int]) -> List[int]:
+    """Tempos acumulados: starts[i] = início do pulso i (em ticks); starts[-1] = total."""
+    return list(accumulate(pulses, initial=0))
+
+
+def track_points(pulses: Sequence[int], x_scale: float, y_high: float, y_low: float,
+                 x0: float = 10.0, x_min: float | None = None, x_max: float | None = None,
+                 starts: Optional[Sequence[int]] = None) -> List[float]:
+    """Polyline de uma trilha: pulsos alternam alto/baixo começando em alto (ON).
+    starts: vetor de cumulative(pulses) já calculado (evita refazer a cada desenho).
+    """
+    if not pulses:
+        return []
+    if starts is None:
+        starts = cumulative(pulses)
+    lo = -math.inf if x_min is None else float(x_min)
+    hi = math.inf if x_max is None else float(x_max)
+    out: List[float] = []
+
+    col = None          # coluna de pixel aberta
+    first = last = 0.0  # nível ao entrar/sair da coluna
+    both = False        # a coluna passou pelos dois níveis
+
+    def flush():
+        if col is None:
+            return
+        out.extend((col, first))
+        if both and first == last:
+            out.extend((col, y_high if first == y_low else y_low, col, last))
+        elif last != first:
+            out.extend((col, last))
+
+    n = len(pulses)
+    # primeiro pulso que pode aparecer: o que contém x_min
+    i0 = 0
+    if x_min is not None and x_scale > 0:
+        i0 = max(0, bisect_right(starts, (lo - x0) / x_scale) - 1)
+    level = y_low if i0 == 0 else (y_high if (i0 - 1) % 2 == 0 else y_low)
+    started = False
+    for i in range(i0, n + 1):
+        x = x0 + starts[i] * x_scale
+        # transição no início do pulso i (ou volta ao nível baixo no fim)
+        if i < n:
+            new = y_high if i % 2 == 0 else y_low
+        else:
+            new = y_low
+        if x > hi:
+            break
+        if x >= lo:
+            if not started:
+                started = True
+                if x > lo and x0 < lo:
+                    out.extend((lo, level))  # entra na janela no meio de um nível
+            c = round(x)
+            if c == col:
+                both = both or new != last or new != first
+                last = new
+            else:
+                flush()
+                col, first, last = c, level, new
+                both = new != level
+        level = new
+    else:
+        # chegou ao fim dos pulsos dentro da janela
+        flush()
+        return out
+
+    # cortou à direita da janela
+    flush()
+    if not started and x0 < lo:
+        out.extend((lo, level))
+    out.extend((hi, level))
+    return out
+
+
+class WaveTrack:
+    """Pulsos de uma trilha + vetor de tempos acumulados (calculado uma vez)."""
+    __slots__ = ("source", "pulses", "starts")
+
+    def __init__(self, pulses: Sequence[int], source: str = ""):
+        self.source = source
+        self.pulses = list(pulses)
+        self.starts = cumulative(self.pulses)
+
+    def __len__(self) -> int:
+        return len(self.pulses)
+
+    @property
+    def total(self) -> int:
+        return self.starts[-1]
+
+    def visible_range(self, x_scale: float, x_min: float, x_max: float, x0: float = 10.0) -> tuple[int, int]:
+        """Índices [i0, i1) dos pulsos que tocam a faixa [x_min, x_max]."""
+        if not self.pulses or x_scale <= 0:
+            return (0, 0)
+        i0 = max(0, bisect_right(self.starts, (x_min - x0) / x_scale) - 1)
+        i1 = min(len(self.pulses), bisect_right(self.starts, (x_max - x0) / x_scale))
+        return (min(i0, i1), i1)
+
+    def points(self, x_scale: float, y_high: float, y_low: float, x0: float = 10.0,
+               x_min: float | None = None, x_max: float | None = None) -> List[float]:
+        return track_points(self.pulses, x_scale, y_high, y_low, x0, x_min, x_max, starts=self.starts)
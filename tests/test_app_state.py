@@ -0,0 +1,58 @@
+import pytest
+
+from iluflex_tools.core.app_state import AppStateManager
+from iluflex_tools.core.settings import SettingsStore
+
+
+@pytest.fixture
+def state(tmp_path):
+    return AppStateManager(store=SettingsStore(path=str(tmp_path / "s.json"), debounce_s=60.0))
+
+
+def test_coercion_is_per_field(state):
+    state.set("port", "5001")
+    state.set("auto_reconnect", "sim")
+    state.set("connected", "off")
+    state.set("nope", 1)
+    assert state.data.port == 5001 and state.data.auto_reconnect is True and state.data.connected is False
+    state.set("port", "abc")   # inválido: mantém o texto, como antes
+    assert state.data.port == "abc"
+
+
+def test_subscribers_get_only_their_fields_and_real_changes(state):
+    ip_events, all_events = [], []
+    state.subscribe(ip_events.append, fields="ip")
+    state.subscribe(all_events.append)
+    state.set("ip", "10.0.0.1")
+    state.set("ip", "10.0.0.1")          # sem mudança: sem aviso
+    state.set("theme", "dark")
+    assert ip_events == [{"ip": "10.0.0.1"}]
+    assert all_events == [{"ip": "10.0.0.1"}, {"theme": "dark"}]
+    state.unsubscribe(ip_events.append)
+    state.set("ip", "10.0.0.2")
+    assert len(ip_events) == 1
+
+
+def test_batch_emits_one_coalesced_event(state):
+    events = []
+    state.subscribe(events.append, fields=("ip", "port", "mac"))
+    with state.batch():
+        state.set_ip_port("10.0.0.9", 5000)   # batch aninhado
+        state.set("mac", "aa")
+        state.set("ip", "10.0.0.10")          # último valor vence
+        assert events == []
+    assert events == [{"ip": "10.0.0.10", "port": 5000, "mac": "aa"}]
+
+    with pytest.raises(RuntimeError):
+        with state.batch():
+            state.set("mac", "bb")
+            raise RuntimeError
+    assert events[-1] == {"mac": "bb"}
+
+
+def test_settings_changes_reach_subscribers(state):
+    events = []
+    state.subscribe(events.append, fields="discovery_timeout_ms")
+    state._store.set("discovery_timeout_ms", "2500")
+    assert state.data.discovery_timeout_ms == 2500
+    assert events == [{"discovery_timeout_ms": 2500}]
@@ -0,0 +1,130 @@
+import asyncio
+import importlib.util
+import re
+import sys
+import time
+from pathlib import Path
+
+
+def _load_async_client():
+    path = Path(__file__).resolve().parents[1] / "iluflex_tools" / "core" / "async_client.py"
+    spec = importlib.util.spec_from_file_location("_async_client", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # dataclasses resolvem anotações pelo módulo
+    spec.loader.exec_module(module)
+    return module
+
+
+ac = _load_async_client()
+
+
+async def _fake_master(reader, writer):
+    """Responde SRF,a,b com RRF,a,b e fecha ao receber QUIT."""
+    while True:
+        line = await reader.readuntil(b"\r")
+        if line == b"QUIT\r":
+            writer.close()
+            return
+        if line.startswith(b"SRF,"):
+            writer.write(b"RRF," + line[4:-1] + b",ok\r")
+        if line == b"PARTIAL\r":
+            writer.write(b"SEM_TERMINADOR")
+        await writer.drain()
+
+
+def test_connect_request_and_event_contract():
+    async def main():
+        server = await asyncio.start_server(_fake_master, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        conn = ac.AsyncConnectionService(msg_timeout=0.1)
+        events = []
+        conn.add_listener(events.append)
+
+        assert await conn.connect("127.0.0.1", port)
+        assert await conn.request("SRF,16,9\r", expect="RRF,16,9") == "RRF,16,9,ok\r"
+        assert await conn.request("SRF,10\r", expect=re.compile(r"^RRF,10")) == "RRF,10,ok\r"
+
+        await conn.send("PARTIAL\r")
+        await asyncio.sleep(0.4)  # flush após msg_timeout
+
+        try:
+            await conn.request("NADA\r", expect="RRF,99", timeout=0.1)
+            raise AssertionError("deveria expirar")
+        except asyncio.TimeoutError:
+            pass
+
+        await conn.disconnect()
+        server.close()
+        await server.wait_closed()
+        return events
+
+    events = asyncio.run(main())
+    types = [ev["type"] for ev in events]
+    assert types[:2] == ["connecting", "connect"]
+    assert types[-1] == "disconnect"
+    rx = [ev["raw"] for ev in events if ev["type"] == "rx"]
+    assert rx == [b"RRF,16,9,ok\r", b"RRF,10,ok\r", b"SEM_TERMINADOR"]
+    assert all(ev["remote"][0] == "127.0.0.1" and len(ev["ts"]) == 12 for ev in events)
+
+
+def test_auto_reconnect_after_remote_close():
+    async def main():
+        server = await asyncio.start_server(_fake_master, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        conn = ac.AsyncConnectionService()
+        conn.enable_auto_reconnect(True, ac.ReconnectPolicy(initial=0.05, maximum=0.1, max_attempts=5))
+        events = []
+        conn.add_listener(lambda ev: events.append(ev["type"]))
+
+        assert await conn.connect("127.0.0.1", port)
+        await conn.send("QUIT\r")
+        for _ in range(50):
+            await asyncio.sleep(0.02)
+            if events.count("connect") == 2:
+                break
+        ok = conn.get_is_connected()
+        await conn.disconnect()
+        server.close()
+        await server.wait_closed()
+        return ok, events
+
+    ok, events = asyncio.run(main())
+    assert ok
+    assert events[:3] == ["connecting", "connect", "tx"]
+    assert events[3:7] == ["disconnect", "reconnecting", "connecting", "connect"]
+
+
+def test_reconnect_policy_backoff():
+    assert list(ac.ReconnectPolicy(initial=1, maximum=5, factor=2, max_attempts=5).delays()) == [1, 2, 4, 5, 5]
+
+
+class _FakeTk:
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, fn):
+        self.pending.append(fn)
+        return len(self.pending)
+
+    def after_cancel(self, _id):
+        pass
+
+
+def test_tk_adapter_runs_coroutines_from_after_ticks():
+    root = _FakeTk()
+    bridge = ac.TkAsyncioLoop(root, interval_ms=1)
+    results = []
+
+    async def work():
+        await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        return 42
+
+    bridge.submit(work(), on_done=results.append)
+    for _ in range(200):
+        if results:
+            break
+        time.sleep(0.001)
+        root.pending.pop(0)()
+    bridge.close()
+    assert results == [42]
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _run_batch(*args, stdin=None):
+    return subprocess.run(
+        [sys.executable, "-m", "iluflex_tools.batch", *args],
+        cwd=ROOT, input=stdin, capture_output=True, text=True, timeout=60,
+    )
+
+
+def test_batch_pool_preserves_order_and_reports_errors(tmp_path):
+    lines = (ROOT / "comandos.txt").read_text(encoding="utf-8").splitlines()
+    lines.insert(2, "sem_tab sir,4,1,2")
+    lines.insert(5, "formato_ruim\tsir,9,1,2,3")
+    src = tmp_path / "lib.txt"
+    src.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    serial = _run_batch(str(src), "--tipo", "long", "-j", "1")
+    pool = _run_batch(str(src), "--tipo", "long", "-j", "2", "--chunk-size", "2")
+
+    assert serial.returncode == pool.returncode == 1
+    assert pool.stdout == serial.stdout
+    names = [ln.split("\t")[0] for ln in pool.stdout.splitlines()]
+    assert names == [ln.split("\t")[0].strip() for ln in lines if "\t" in ln and "sir,9" not in ln]
+    assert all("\tsir,2," in ln for ln in pool.stdout.splitlines())
+    erros = [ln.split("\t") for ln in pool.stderr.splitlines() if ln[:1].isdigit() and "\t" in ln]
+    assert [(e[0], e[1]) for e in erros] == [("3", ""), ("6", "formato_ruim")]
+
+
+def test_batch_short_from_stdin():
+    line = (ROOT / "comandos.txt").read_text(encoding="utf-8").splitlines()[0]
+    name, cmd = line.split("\t", 1)
+    res = _run_batch("-", "--tipo", "short", "--repeat", "2", "-j", "1", stdin=f"{name}\t{cmd}\n")
+    assert res.returncode == 0
+    out_name, out_cmd = res.stdout.strip().split("\t")
+    assert out_name == name.strip()
+    assert out_cmd.startswith("sir,4,") and out_cmd.split(",")[6] == "2"
@@ -0,0 +1,107 @@
+import json
+
+from iluflex_tools.core.app_state import AppStateManager
+from iluflex_tools.core.discovery_cache import DiscoveryCache
+
+
+def _dev(i, ip=None):
+    return {"NAME": f"Master {i}", "MAC": f"AA:BB:CC:00:00:0{i}", "IP": ip or f"192.168.1.{70 + i}",
+            "MASCARA": "255.255.255.0", "GATEWAY": "192.168.1.1", "DHCP": "DHCP", "FLAG": ""}
+
+
+class _FakeEngine:
+    """Responde ao broadcast com `alive` e ao probe unicast só nos IPs de `unicast_only`."""
+    port = 30303
+
+    def __init__(self, alive, unicast_only=()):
+        self.alive = alive
+        self.unicast_only = list(unicast_only)
+        self.calls = []
+
+    def scan(self, timeout_ms, on_found=None, expected=None, targets=None):
+        self.calls.append(targets)
+        if targets is None:
+            devs = self.alive
+        else:
+            ips = {ip for ip, _port in targets}
+            devs = [d for d in self.unicast_only if d["IP"] in ips]
+        for d in devs:
+            on_found(d)
+        return devs
+
+
+def test_save_is_atomic_and_load_drops_expired_entries(tmp_path):
+    path = tmp_path / "masters.json"
+    c = DiscoveryCache(str(path), ttl_s=100)
+    c.update_found(_dev(1), now=1000)
+    c.update_found(_dev(2), now=1090)
+    c.save()
+    assert [p.name for p in tmp_path.iterdir()] == ["masters.json"]
+    assert {e["mac"] for e in json.loads(path.read_text())} == {"aa:bb:cc:00:00:01", "aa:bb:cc:00:00:02"}
+
+    d = DiscoveryCache(str(path), ttl_s=100)
+    assert d.load(now=1150) == 1
+    e = d.get("AA:BB:CC:00:00:02")
+    assert (e.name, e.ip, e.mask, e.gateway, e.dhcp) == ("Master 2", "192.168.1.72", "255.255.255.0",
+                                                         "192.168.1.1", "DHCP")
+    assert d.rows() == [{"NAME": "Master 2", "MAC": "aa:bb:cc:00:00:02", "IP": "192.168.1.72",
+                         "MASCARA": "255.255.255.0", "GATEWAY": "192.168.1.1", "DHCP": "DHCP"}]
+    assert DiscoveryCache(str(tmp_path / "nada.json")).load() == 0
+
+
+def test_revalidate_marks_new_moved_stale_and_probes_missing_by_unicast(tmp_path):
+    c = DiscoveryCache(str(tmp_path / "m.json"))
+    for i in (1, 2, 3, 4):
+        c.update_found(_dev(i))
+    eng = _FakeEngine(alive=[_dev(1), _dev(2, ip="192.168.1.200"), _dev(5)],
+                      unicast_only=[_dev(3)])
+    updates = []
+    c.revalidate(eng, 1000, on_update=lambda e: updates.append((e.mac[-2:], e.status)))
+
+    st = {e.mac[-2:]: e.status for e in c.entries()}
+    assert st == {"01": "ok", "02": "moved", "03": "ok", "04": "stale", "05": "new"}
+    assert c.get("aa:bb:cc:00:00:02").prev_ip == "192.168.1.72"
+    assert sorted(eng.calls[1]) == [("192.168.1.73", 30303), ("192.168.1.74", 30303)]
+    assert ("04", "stale") in updates and ("05", "new") in updates
+    assert DiscoveryCache(str(tmp_path / "m.json")).load() == 5
+
+    # nova rodada: quem voltou a responder deixa de ser new/moved
+    c.revalidate(_FakeEngine(alive=[_dev(2, ip="192.168.1.200"), _dev(5)]), 1000)
+    st = {e.mac[-2:]: e.status for e in c.entries()}
+    assert st["02"] == "ok" and st["05"] == "ok" and st["01"] == "stale"
+
+
+def test_state_uses_last_known_address_of_the_cached_mac(tmp_path):
+    state = AppStateManager(persist_default=False)
+    state._discovery = DiscoveryCache(str(tmp_path / "m.json"))
+    state.set_ip_port("192.168.1.71", 4999)
+    assert state.last_known_address() == ("192.168.1.71", 4999)
+
+    state.set("mac", "AA:BB:CC:00:00:01")
+    state.discovery.update_found(_dev(1, ip="192.168.1.99"))
+    assert state.last_known_address() == ("192.168.1.99", 4999)
+
+
+class _FakeSweeper:
+    def __init__(self, devs):
+        self.devs = devs
+        self.calls = 0
+
+    def sweep(self, cidr, timeout_ms, on_found=None):
+        self.calls += 1
+        for d in self.devs:
+            on_found(d)
+        return self.devs
+
+
+def test_sweep_fallback_runs_only_when_broadcast_finds_nothing(tmp_path):
+    c = DiscoveryCache(str(tmp_path / "m.json"))
+    tcp_only = {"NAME": "", "MAC": "", "IP": "192.168.1.9", "FLAG": "tcp"}
+    sw = _FakeSweeper([_dev(1), tcp_only])
+    updates = []
+    c.revalidate(_FakeEngine(alive=[]), 1000, on_update=updates.append, sweeper=sw)
+    assert sw.calls == 1 and len(c) == 1 and c.get("aa:bb:cc:00:00:01").status == "new"
+    assert [(u.mac, u.ip) for u in updates] == [("aa:bb:cc:00:00:01", "192.168.1.71"), ("", "192.168.1.9")]
+
+    c.revalidate(_FakeEngine(alive=[_dev(1)]), 1000, sweeper=sw)
+    assert sw.calls == 1
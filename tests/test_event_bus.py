@@ -0,0 +1,104 @@
+import threading
+
+from iluflex_tools.core.event_bus import STATE_TYPES, EventBus, bus_for
+
+
+class _FakeConn:
+    def __init__(self):
+        self.listeners = []
+
+    def add_listener(self, cb):
+        self.listeners.append(cb)
+
+    def remove_listener(self, cb):
+        self.listeners.remove(cb)
+
+    def emit(self, ev):
+        for cb in list(self.listeners):
+            cb(ev)
+
+
+class _FakeTk:
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, fn):
+        self.pending.append((ms, fn))
+        return len(self.pending)
+
+    def after_cancel(self, _id):
+        pass
+
+    def winfo_toplevel(self):
+        return self
+
+    def run_once(self):
+        pending, self.pending = self.pending, []
+        for _ms, fn in pending:
+            fn()
+
+
+def _ev(typ, text="", remote=("10.0.0.2", 4999)):
+    return {"type": typ, "text": text, "remote": remote, "ts": "00:00:00.000"}
+
+
+def test_events_are_batched_and_delivered_on_tk_tick():
+    conn, tk = _FakeConn(), _FakeTk()
+    bus = bus_for(conn, tk)
+    assert bus_for(conn) is bus and conn.listeners == [bus.post]
+    batches = []
+    bus.subscribe(batches.append)
+
+    threads = [threading.Thread(target=lambda i=i: [conn.emit(_ev("rx", f"RRF,10,{i},{j}")) for j in range(50)])
+               for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert batches == [] and bus.metrics()["queue_depth"] == 200
+
+    tk.run_once()
+    assert len(batches) == 1 and len(batches[0]) == 200
+    assert tk.pending and tk.pending[0][0] == bus.interval_ms  # reagendado
+    m = bus.metrics()
+    assert m["queue_depth"] == 0 and m["max_depth"] == 200 and m["batches"] == 1
+    assert m["delivered"] == 200 and m["last_latency_ms"] >= 0
+
+
+def test_repeated_state_events_are_coalesced_and_filtered_by_type():
+    conn = _FakeConn()
+    bus = EventBus(conn, max_batch=100)
+    states, everything = [], []
+    bus.subscribe(states.append, types=STATE_TYPES)
+    bus.subscribe(everything.append)
+    for ev in [_ev("connecting"), _ev("connect"), _ev("connect"), _ev("rx", "a"), _ev("connect"),
+               _ev("error", "x"), _ev("error", "x"), _ev("disconnect"), _ev("connect")]:
+        conn.emit(ev)
+    bus.drain()
+    assert [e["type"] for e in states[0]] == ["connecting", "connect", "disconnect", "connect"]
+    assert [e["type"] for e in everything[0]] == ["connecting", "connect", "rx", "error", "disconnect", "connect"]
+    assert bus.metrics()["coalesced"] == 3
+
+    conn.emit(_ev("connect"))  # mesmo estado já entregue
+    assert bus.drain() == 0
+
+    # o mesmo erro em outro lote (ex.: 2º envio sem conexão) chega de novo
+    conn.emit(_ev("error", "x"))
+    assert bus.drain() == 1
+    conn.emit(_ev("error", "x"))
+    assert bus.drain() == 1 and everything[-1][0]["text"] == "x"
+
+
+def test_max_batch_and_failing_subscriber():
+    conn = _FakeConn()
+    bus = EventBus(conn, max_batch=10)
+    got = []
+    bus.subscribe(lambda evs: 1 / 0)
+    bus.subscribe(got.extend)
+    for i in range(25):
+        conn.emit(_ev("rx", str(i)))
+    assert [bus.drain(), bus.drain(), bus.drain(), bus.drain()] == [10, 10, 5, 0]
+    assert [e["text"] for e in got] == [str(i) for i in range(25)]
+    bus.unsubscribe(got.extend)
+    bus.close()
+    assert conn.listeners == [] and bus.metrics()["subscribers"] == 0
@@ -0,0 +1,75 @@
+import importlib.util
+import random
+import socket
+from pathlib import Path
+
+
+def _load_framer():
+    framer_path = Path(__file__).resolve().parents[1] / "iluflex_tools" / "core" / "framer.py"
+    spec = importlib.util.spec_from_file_location("_framer", framer_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.RxFramer
+
+
+RxFramer = _load_framer()
+
+
+def _mixed_frames(n, seed=0):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        if rng.random() < 0.3:
+            payload = bytes(rng.randrange(256) for _ in range(rng.randint(0, 40)))
+            out.append(bytes([0xA5, rng.randrange(256), len(payload)]) + payload + b"\xCD")
+        else:
+            out.append(f"RRF,10,{i},AABBCCDDEEFF,1,2,3,4,5".encode() + b"\r")
+    return out
+
+
+def test_frames_split_across_arbitrary_chunks_with_compaction():
+    frames = _mixed_frames(3000)
+    data = b"".join(frames)
+    f = RxFramer(capacity=256, min_recv=64)
+    rng = random.Random(1)
+    got, i = [], 0
+    while i < len(data):
+        n = rng.randint(1, 97)
+        f.feed(data[i:i + n])
+        i += n
+        got += [bytes(m) for m in f.frames()]
+    assert got == frames
+    assert f.pending() == 0
+    assert f.compactions > 0
+
+
+def test_long_text_line_grows_buffer():
+    f = RxFramer(capacity=128, min_recv=32)
+    line = b"x" * 5000 + b"\r"
+    for k in range(0, len(line), 50):
+        f.feed(line[k:k + 50])
+    assert [bytes(m) for m in f.frames()] == [line]
+
+
+def test_flush_stale_delivers_partial_message_after_timeout():
+    f = RxFramer(msg_timeout=0.4)
+    f.feed(b"OK\rPARTIAL")
+    assert [bytes(m) for m in f.frames()] == [b"OK\r"]
+    assert f.flush_stale(now=f.last_rx + 0.1) is None
+    assert bytes(f.flush_stale(now=f.last_rx + 0.5)) == b"PARTIAL"
+    assert f.pending() == 0
+
+
+def test_recv_into_from_socket():
+    s1, s2 = socket.socketpair()
+    try:
+        f = RxFramer()
+        s2.sendall(b"\xA5\x01\x02AB\xCDHELLO\r")
+        s2.shutdown(socket.SHUT_WR)
+        got = []
+        while f.recv_into(s1):
+            got += [bytes(m) for m in f.frames()]
+        assert got == [b"\xA5\x01\x02AB\xCD", b"HELLO\r"]
+    finally:
+        s1.close()
+        s2.close()
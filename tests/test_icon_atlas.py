@@ -0,0 +1,57 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def _load():
+    path = Path(__file__).resolve().parents[1] / "iluflex_tools" / "widgets" / "icon_atlas.py"
+    spec = importlib.util.spec_from_file_location("_icon_atlas", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+atlas = _load()
+ICON_DIR = Path(__file__).resolve().parents[1] / "iluflex_tools" / "theming" / "icons"
+
+
+def test_index_parses_name_size_variant_and_ignores_others():
+    idx = atlas.index_icons(["mesh-network_28px_dark.png", "server-cog_24px_light.png",
+                             "readme.txt", "foo_28px_dim.png", atlas.ATLAS_PNG])
+    assert idx == {("mesh-network", 28, "dark"): "mesh-network_28px_dark.png",
+                   ("server-cog", 24, "light"): "server-cog_24px_light.png"}
+
+
+def test_repo_icons_are_indexed_in_pairs():
+    idx = atlas.scan_icon_dir(ICON_DIR)
+    names = {k[0] for k in idx}
+    assert "question-mark" in names
+    for name, size, _v in idx:
+        assert (name, size, "light") in idx and (name, size, "dark") in idx
+
+
+def test_pack_layout_boxes_do_not_overlap_and_fit():
+    sizes = {f"i{n}": (28, 28) for n in range(30)}
+    sizes["big"] = (40, 40)
+    boxes, (w, h) = atlas.pack_layout(sizes, max_width=128)
+    assert w <= 128
+    rects = list(boxes.values())
+    for i, (x, y, bw, bh) in enumerate(rects):
+        assert x + bw <= w and y + bh <= h
+        for x2, y2, w2, h2 in rects[i + 1:]:
+            assert x + bw <= x2 or x2 + w2 <= x or y + bh <= y2 or y2 + h2 <= y
+
+
+def test_icons_added_after_the_atlas_are_still_indexed(tmp_path, monkeypatch):
+    for fn in ("old_28px_light.png", "old_28px_dark.png", "new_28px_light.png"):
+        (tmp_path / fn).write_bytes(b"")
+    crops = {"old_28px_light.png": "recorte-l", "old_28px_dark.png": "recorte-d"}
+    monkeypatch.setattr(atlas, "load_atlas", lambda d: (atlas.index_icons(crops), crops))
+    index, decoded = atlas.load_icons(tmp_path)
+    assert index[("new", 28, "light")] == "new_28px_light.png"
+    assert index[("old", 28, "dark")] == "old_28px_dark.png"
+    assert decoded == crops and decoded is not crops
+
+    monkeypatch.setattr(atlas, "load_atlas", lambda d: None)
+    assert atlas.load_icons(tmp_path) == (atlas.scan_icon_dir(tmp_path), {})
@@ -0,0 +1,88 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from iluflex_tools.core import ircode, ircode_cache
+from iluflex_tools.core.ircode import IrCodeLib
+from iluflex_tools.core.ircode_cache import CACHE_NAMESPACE, ConversionCache
+
+ROOT = Path(__file__).resolve().parents[1]
+CMDS = [l.split("\t", 1)[1].strip() for l in (ROOT / "comandos.txt").read_text(encoding="utf-8").splitlines() if "\t" in l]
+TIPO = "Iluflex Long"
+
+
+def _convert_all(cache):
+    return [cache.convertIRCmd(cmd, TIPO, 1, 1) for cmd in CMDS]
+
+
+def test_lru_matches_ircodelib_and_counts_evictions():
+    c = ConversionCache(maxsize=4)
+    assert _convert_all(c) == [IrCodeLib.convertIRCmd(cmd, TIPO, 1, 1) for cmd in CMDS]
+    # mesmo comando com espaços/terminador diferente -> mesma chave
+    c.convertIRCmd(CMDS[-1] + "\r\n", TIPO, 1, 1)
+    st = c.stats()
+    assert st["misses"] == len(CMDS) and st["hits"] == 1
+    assert st["size"] == 4 and st["evictions"] == len(CMDS) - 4
+
+
+def test_results_are_deep_copies():
+    c = ConversionCache()
+    first = c.convertIRCmd(CMDS[0], TIPO, 1, 1)
+    first["converted"] = "alterado pelo chamador"
+    assert c.convertIRCmd(CMDS[0], TIPO, 1, 1) == IrCodeLib.convertIRCmd(CMDS[0], TIPO, 1, 1)
+
+    c._store("k", {"converted": "x", "frames": [[1, 2]]})
+    c._get_or_compute("k", lambda: None)["frames"][0].append(3)
+    assert c._get_or_compute("k", lambda: None)["frames"] == [[1, 2]]
+
+
+def test_disk_is_reused_by_a_new_instance(tmp_path):
+    first = _convert_all(ConversionCache(maxsize=4, cache_dir=str(tmp_path)))
+    d = ConversionCache(cache_dir=str(tmp_path))
+    assert _convert_all(d) == first
+    d.convertIRCmd(CMDS[0], TIPO, 2, 1)  # parâmetro diferente -> miss
+    st = d.stats()
+    assert st["hits"] == st["disk_hits"] == len(CMDS)
+    assert st["misses"] == 1
+
+
+def test_errors_are_not_cached(tmp_path):
+    c = ConversionCache(cache_dir=str(tmp_path))
+    c.convertIRCmd("sir,9,1", TIPO, 1, 1)
+    c.convertIRCmd("sir,9,1", TIPO, 1, 1)
+    st = c.stats()
+    assert st["misses"] == 2 and st["size"] == 0
+
+
+def test_codec_version_change_invalidates_memory_and_disk(tmp_path, monkeypatch):
+    _convert_all(ConversionCache(cache_dir=str(tmp_path)))
+    monkeypatch.setattr(ircode_cache, "CODEC_VERSION", ircode.CODEC_VERSION + 1)
+    e = ConversionCache(cache_dir=str(tmp_path))
+    e.convertIRCmd(CMDS[0], TIPO, 1, 1)
+    st = e.stats()
+    assert st["misses"] == 1 and st["hits"] == 0
+    assert os.listdir(tmp_path / CACHE_NAMESPACE) == [f"v{ircode.CODEC_VERSION + 1}"]
+
+
+def test_pruning_only_touches_marked_version_dirs(tmp_path, monkeypatch):
+    # pastas do usuário no mesmo diretório nunca são apagadas
+    for nome in ("venv", "videos", "v1"):
+        (tmp_path / nome).mkdir()
+    (tmp_path / CACHE_NAMESPACE / "v0").mkdir(parents=True)   # sem marcador: não é nossa
+    ConversionCache(cache_dir=str(tmp_path))
+    monkeypatch.setattr(ircode_cache, "CODEC_VERSION", ircode.CODEC_VERSION + 1)
+    ConversionCache(cache_dir=str(tmp_path))
+
+    assert sorted(os.listdir(tmp_path)) == [CACHE_NAMESPACE, "v1", "venv", "videos"]
+    assert sorted(os.listdir(tmp_path / CACHE_NAMESPACE)) == ["v0", f"v{ircode.CODEC_VERSION + 1}"]
+
+
+@pytest.mark.parametrize("disk", [False, True])
+def test_clear_resets_counters(tmp_path, disk):
+    c = ConversionCache(cache_dir=str(tmp_path))
+    c.convertIRCmd(CMDS[0], TIPO, 1, 1)
+    c.clear(disk=disk)
+    assert c.stats()["size"] == 0 and c.stats()["misses"] == 0
+    c.convertIRCmd(CMDS[0], TIPO, 1, 1)
+    assert c.stats()["disk_hits"] == (0 if disk else 1)
@@ -0,0 +1,69 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+GOLDEN = json.loads((ROOT / "tests" / "data" / "ircode_golden.json").read_text(encoding="utf-8"))
+COMPRESS_GOLDEN = json.loads((ROOT / "tests" / "data" / "ircode_compress_golden.json").read_text(encoding="utf-8"))
+
+
+def _load_ircode():
+    ircode_path = ROOT / "iluflex_tools" / "core" / "ircode.py"
+    spec = importlib.util.spec_from_file_location("_ircode", ircode_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+ircode = _load_ircode()
+
+
+@pytest.mark.parametrize("case", GOLDEN, ids=lambda c: repr(c["input"][:40]))
+def test_conversion_matches_golden_corpus(case):
+    if "raises" in case:
+        with pytest.raises(Exception) as exc:
+            ircode.conversion(case["input"])
+        assert type(exc.value).__name__ == case["raises"]
+    else:
+        assert ircode.conversion(case["input"]) == case["output"]
+
+
+def test_conversion_sir4_from_comandos_txt():
+    line = (ROOT / "comandos.txt").read_text(encoding="utf-8").splitlines()[0]
+    cmd = line.split("\t", 1)[1].strip()
+    pulsos = ircode.conversion(cmd + "\r")
+    assert pulsos[:8] == [356, 28, 1, 40000, 1, 1, 23, 714]
+    assert pulsos[-2:] == [0, 0]
+    # sem terminador a máquina de estados nunca fecha
+    assert ircode.conversion(cmd) == []
+
+
+def test_conversion_sir2_returns_compatibility_vector():
+    pulsos = ircode.conversion("sir,2,4,1,1,263,1,1,100,200,300,400\r")
+    # Per=263 -> freq = 1e7 // 263 ; tempos em ciclos = round_half_up(16*t/263)
+    assert pulsos == [4, 1, 1, 38022, 1, 1, 6, 12, 18, 24]
+
+
+@pytest.mark.parametrize("case", COMPRESS_GOLDEN, ids=lambda c: f"n{c['input'][0]}")
+def test_compress_sir4_matches_golden_corpus(case):
+    pulso = list(case["input"])
+    if "raises" in case:
+        with pytest.raises(Exception) as exc:
+            ircode.CompatibilityToCompressII(pulso)
+        assert type(exc.value).__name__ == case["raises"]
+    else:
+        assert ircode.CompatibilityToCompressII(pulso) == case["output"]
+    assert pulso == case["input"]
+
+
+def test_compress_sir4_roundtrip_comandos_txt():
+    # sir,4 -> sir,2 -> pulsos -> sir,4 mantém as referências do código original
+    for line in (ROOT / "comandos.txt").read_text(encoding="utf-8").splitlines():
+        cmd = line.split("\t", 1)[1].strip()
+        pulsos = ircode.conversion(ircode.sir34tosir2(cmd) + "\r")
+        out = ircode.CompatibilityToCompressII(pulsos)
+        assert out.startswith("sir,4,")
+        assert len(out.split(",")) == len(cmd.split(","))
+
@@ -0,0 +1,84 @@
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_ircode():
+    ircode_path = ROOT / "iluflex_tools" / "core" / "ircode.py"
+    spec = importlib.util.spec_from_file_location("_ircode_np", ircode_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+ircode = _load_ircode()
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Força o caminho NumPy mesmo para vetores curtos."""
+    monkeypatch.setattr(ircode, "USE_NUMPY", True)
+    monkeypatch.setattr(ircode, "NUMPY_MIN_LEN", 0)
+    return ircode
+
+
+def test_array_conversions_match_scalar_round_half_up(backend):
+    rnd = random.Random(7)
+    tempos = [0, 1, 7, 8, 9, 65500] + [rnd.randint(0, 65500) for _ in range(500)]
+    for per in (1, 16, 263, 264, 1000):
+        got = backend.sir2_to_sir34_per_array(np.asarray(tempos, dtype=np.int32), per)
+        assert got.tolist() == [backend.sir2_to_sir34_per(t, per) for t in tempos]
+    for freq in (36000, 38022, 40000, 56000):
+        got = backend.sir34_to_sir2_array(np.asarray(tempos, dtype=np.int32), freq)
+        assert got.tolist() == [backend.sir34_to_sir2(n, freq) for n in tempos]
+
+
+def test_array_conversion_zero_denominator(backend):
+    with pytest.raises(ZeroDivisionError):
+        backend.sir34_to_sir2_array([1, 2, 3], 0)
+
+
+def test_half_even_array_matches_python_round(backend):
+    rnd = random.Random(5)
+    ciclos = [0, 1, 4, 12, 65500] + [rnd.randint(0, 65500) for _ in range(500)]
+    for freq in (36000, 38022, 40000, 56000):
+        got = backend.sir34_to_sir2_array(ciclos, freq, half_even=True)
+        assert got.tolist() == [round((625000 * n) / freq) for n in ciclos]
+    # empate exato (62,5): round() vai para o par, a versão half-up para cima
+    assert backend.sir34_to_sir2_array([4], 40000, half_even=True).tolist() == [62]
+    assert backend.sir34_to_sir2_array([4], 40000).tolist() == [63]
+    with pytest.raises(ZeroDivisionError):
+        backend.sir34_to_sir2_array([1], 0, half_even=True)
+
+
+def test_average_multiple_blocks_rounds_half_to_even_like_python(backend, monkeypatch):
+    blocks = [[[1, 2], [10, 11]], [[2, 3], [11, 12]]]  # médias x.5
+    monkeypatch.setattr(backend, "USE_NUMPY", False)
+    esperado = backend.average_multiple_blocks(blocks)
+    monkeypatch.setattr(backend, "USE_NUMPY", True)
+    assert backend.average_multiple_blocks(blocks) == esperado == [[2, 2], [10, 12]]
+
+
+def test_repeat_pulses_array(backend):
+    arr = np.asarray([5, 6, 7], dtype=np.int32)
+    assert backend.repeat_pulses(arr, 3).tolist() == [5, 6, 7] * 3
+    assert backend.repeat_pulses(arr, 1) is arr
+
+
+def test_sir34tosir2_same_output_both_backends(backend, monkeypatch):
+    chamadas = []
+    original = backend.sir34_to_sir2_array
+    monkeypatch.setattr(backend, "sir34_to_sir2_array", lambda N, freq, **kw: chamadas.append(freq) or original(N, freq, **kw))
+    for line in (ROOT / "comandos.txt").read_text(encoding="utf-8").splitlines():
+        cmd = line.split("\t", 1)[1].strip()
+        monkeypatch.setattr(backend, "USE_NUMPY", True)
+        vetorizado = backend.sir34tosir2(cmd)
+        monkeypatch.setattr(backend, "USE_NUMPY", False)
+        assert vetorizado == backend.sir34tosir2(cmd)
+    assert chamadas
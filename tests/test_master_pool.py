@@ -0,0 +1,158 @@
+import asyncio
+
+from iluflex_tools.core.master_pool import MasterPool
+from iluflex_tools.core.protocols import reply_matcher
+
+
+class _FakeMaster:
+    """Servidor que responde SRF,a,b,... com RRF,a,b,<valor>; 'SRF,99' nunca
+    responde e 'SRF,16,4,...' é rejeitado com RRF,16,4,0."""
+    active = 0
+    peak = 0
+
+    def __init__(self, name):
+        self.name = name
+        self.received = []
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = (await reader.readuntil(b"\r")).decode()
+                self.received.append(line.strip())
+                if line.startswith("SRF,99"):
+                    continue
+                if line.startswith("SRF,16,4,"):  # rejeita: RRF,16,4,0 = erro
+                    writer.write(b"RRF,16,4,0\r")
+                    await writer.drain()
+                    continue
+                _FakeMaster.active += 1
+                _FakeMaster.peak = max(_FakeMaster.peak, _FakeMaster.active)
+                await asyncio.sleep(0.02)
+                _FakeMaster.active -= 1
+                parts = line.strip().split(",")
+                writer.write((",".join(["RRF"] + parts[1:3] + [self.name]) + "\r").encode())
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+
+async def _start(n):
+    masters, servers = [], []
+    for i in range(n):
+        m = _FakeMaster(f"m{i}")
+        srv = await asyncio.start_server(m.handle, "127.0.0.1", 0)
+        masters.append((m, srv.sockets[0].getsockname()[1]))
+        servers.append(srv)
+    return masters, servers
+
+
+async def _stop(pool, servers):
+    await pool.close_all()
+    for srv in servers:
+        srv.close()
+        await srv.wait_closed()
+
+
+def test_reply_matcher_distinguishes_subcommands():
+    m = reply_matcher("SRF,16,1,192.168.1.1")
+    assert m("RRF,16,1,192.168.1.1\r") and m("RRF,16,1")
+    assert not m("RRF,16,10,1") and not m("RRF,15,1,1")
+
+
+def test_broadcast_runs_sequence_on_all_masters_with_bounded_concurrency():
+    async def main():
+        _FakeMaster.active = _FakeMaster.peak = 0
+        masters, servers = await _start(6)
+        pool = MasterPool(max_concurrency=3)
+        per_key = []
+        for i, (m, port) in enumerate(masters):
+            pool.register(f"AA:BB:CC:00:00:0{i}", "127.0.0.1", port)
+        pool.add_listener(per_key.append, key="aa:bb:cc:00:00:02")
+
+        cmds = ["SRF,16,5,0", "SRF,16,7,casa", "SRF,16,9"]
+        results = await pool.broadcast(cmds)
+        await _stop(pool, servers)
+        return masters, results, per_key
+
+    masters, results, per_key = asyncio.run(main())
+    assert list(results) == [f"aa:bb:cc:00:00:0{i}" for i in range(6)]
+    for i, res in enumerate(results.values()):
+        assert res.ok
+        assert [s.reply for s in res.steps] == [f"RRF,16,5,m{i}", f"RRF,16,7,m{i}", f"RRF,16,9,m{i}"]
+    assert all(m.received == ["SRF,16,5,0", "SRF,16,7,casa", "SRF,16,9"] for m, _ in masters)
+    assert 1 < _FakeMaster.peak <= 3
+    assert per_key and all(ev["key"] == "aa:bb:cc:00:00:02" for ev in per_key)
+    assert {ev["type"] for ev in per_key} >= {"connect", "tx", "rx"}
+
+
+def test_sequence_stops_on_timeout_and_unreachable_master_is_reported():
+    async def main():
+        masters, servers = await _start(1)
+        pool = MasterPool()
+        pool.register("ok", "127.0.0.1", masters[0][1])
+        pool.register("off", "127.0.0.1", 1)  # porta fechada
+        results = await pool.broadcast(["SRF,16,5,0", "SRF,99,1", "SRF,16,9"], timeout=0.2)
+        await _stop(pool, servers)
+        return results
+
+    results = asyncio.run(main())
+    ok = results["ok"]
+    assert not ok.ok and [s.error for s in ok.steps] == ["", "timeout"]
+    assert results["off"].error and not results["off"].steps
+
+
+def test_max_connections_and_idle_eviction():
+    async def main():
+        masters, servers = await _start(3)
+        pool = MasterPool(max_connections=2, idle_timeout=60)
+        for i, (_m, port) in enumerate(masters):
+            pool.register(f"k{i}", "127.0.0.1", port)
+        for k in ("k0", "k1", "k2"):
+            await pool.request(k, "SRF,16,9")
+        open_after_three = sorted(pool._conns)
+        evicted = await pool.evict_idle(now=10**9)
+        st = pool.stats()
+        await _stop(pool, servers)
+        return open_after_three, evicted, st
+
+    open_after_three, evicted, st = asyncio.run(main())
+    assert open_after_three == ["k1", "k2"]  # k0 foi a menos usada
+    assert sorted(evicted) == ["k1", "k2"]
+    assert st["open"] == 0 and st["evictions"] == 3
+
+
+def test_sequence_uses_shared_error_check():
+    async def main():
+        masters, servers = await _start(1)
+        pool = MasterPool()
+        pool.register("m", "127.0.0.1", masters[0][1])
+        res = await pool.run_sequence("m", ["SRF,16,5,0", "SRF,16,4,dhcp", "SRF,16,9"], timeout=0.5)
+        await _stop(pool, servers)
+        return masters[0][0], res
+
+    master, res = asyncio.run(main())
+    assert not res.ok and [s.error for s in res.steps] == ["", "erro"]
+    assert res.steps[1].reply == "RRF,16,4,0" and master.received[-1] == "SRF,16,4,dhcp"
+
+
+def test_idle_sessions_are_closed_without_new_requests():
+    async def main():
+        masters, servers = await _start(2)
+        pool = MasterPool(idle_timeout=0.1)
+        for i, (_m, port) in enumerate(masters):
+            pool.register(f"k{i}", "127.0.0.1", port)
+        await pool.request("k0", "SRF,16,9")
+        await pool.request("k1", "SRF,16,9")
+        opened = len(pool._conns)
+        for _ in range(40):
+            if not pool._conns:
+                break
+            await asyncio.sleep(0.05)
+        st = pool.stats()
+        reaper_done = pool._reaper is None
+        await _stop(pool, servers)
+        return opened, st, reaper_done
+
+    opened, st, reaper_done = asyncio.run(main())
+    assert opened == 2 and st["open"] == 0 and st["evictions"] == 2
+    assert reaper_done
@@ -0,0 +1,108 @@
+import socket
+import threading
+import time
+
+from iluflex_tools.core import net_discovery as nd
+from iluflex_tools.core.services import NetworkService
+
+
+def _found(i):
+    return (f"Found:\r\nMaster {i}\r\nAA:BB:CC:00:00:0{i}\r\n192.168.1.{70 + i}\r\n"
+            f"255.255.255.0\r\n192.168.1.1\r\nDHCP\r\n").encode()
+
+
+class _FakeMasters:
+    """Responde a cada datagrama de descoberta com n masters (com atraso entre elas)."""
+
+    def __init__(self, n, delay=0.01, host="127.0.0.1"):
+        self.n = n
+        self.delay = delay
+        self.requests = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, 0))
+        self.sock.settimeout(0.1)
+        self.port = self.sock.getsockname()[1]
+        self._stop = False
+        self._t = threading.Thread(target=self._run, daemon=True)
+        self._t.start()
+
+    def _run(self):
+        while not self._stop:
+            try:
+                data, addr = self.sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.requests.append(data)
+            self.sock.sendto(b"lixo\r\n", addr)
+            for i in range(self.n):
+                time.sleep(self.delay)
+                self.sock.sendto(_found(i), addr)
+
+    def close(self):
+        self._stop = True
+        self._t.join(1)
+        self.sock.close()
+
+
+LO = [nd.LocalInterface("127.0.0.1", 8, "lo")]
+
+
+def test_parse_found_accepts_only_found_payloads():
+    dev = nd.parse_found(_found(3))
+    assert dev == {"NAME": "Master 3", "MAC": "aa:bb:cc:00:00:03", "IP": "192.168.1.73",
+                   "MASCARA": "255.255.255.0", "GATEWAY": "192.168.1.1", "DHCP": "DHCP", "FLAG": ""}
+    assert nd.parse_found(b"Hello\nFound:\n") is None
+    assert nd.parse_found(b"FOUND:\nX")["NAME"] == "X"
+
+
+def test_broadcast_targets_per_interface():
+    eng = nd.DiscoveryEngine(port=30303)
+    itf = nd.LocalInterface("10.1.2.3", 16)
+    assert eng.broadcast_targets(itf) == [("10.1.255.255", 30303), ("255.255.255.255", 30303)]
+    assert eng.broadcast_targets(nd.LocalInterface("10.1.2.3", 32)) == [("255.255.255.255", 30303)]
+    assert itf.contains("10.1.200.1") and not itf.contains("10.2.0.1")
+    assert all(i.ip and not i.ip.startswith("127.") for i in nd.local_ipv4_interfaces())
+
+
+def test_streams_results_and_returns_when_expected_count_is_reached():
+    fake = _FakeMasters(3)
+    try:
+        eng = nd.DiscoveryEngine(port=fake.port, interfaces=LO, retransmits=2, interval_s=0.05)
+        seen_at = []
+        t0 = time.monotonic()
+        devs = eng.scan(5000, on_found=lambda d: seen_at.append(time.monotonic() - t0),
+                        expected=3, targets=[("127.0.0.1", fake.port)])
+        elapsed = time.monotonic() - t0
+    finally:
+        fake.close()
+    assert [d["NAME"] for d in devs] == ["Master 0", "Master 1", "Master 2"]
+    assert seen_at == sorted(seen_at) and seen_at[0] < seen_at[-1]
+    assert elapsed < 1.0 and eng.stats["reason"] == "expected"
+
+
+def test_quiet_period_ends_scan_and_retransmits_are_deduplicated():
+    fake = _FakeMasters(2, delay=0)
+    try:
+        eng = nd.DiscoveryEngine(port=fake.port, interfaces=LO, retransmits=2, interval_s=0.05, quiet_s=0.2)
+        t0 = time.monotonic()
+        devs = eng.scan(5000, targets=[("127.0.0.1", fake.port)])
+        elapsed = time.monotonic() - t0
+    finally:
+        fake.close()
+    assert len(devs) == 2
+    assert len(fake.requests) == 3 and all(r == nd.DISCOVERY_PAYLOAD for r in fake.requests)
+    assert eng.stats["reason"] == "quiet" and elapsed < 1.0
+    assert eng.stats["received"] >= 6
+
+
+def test_network_service_uses_directed_broadcast_of_each_interface():
+    fake = _FakeMasters(1, host="")  # recebe o broadcast 127.255.255.255
+    try:
+        svc = NetworkService(engine=nd.DiscoveryEngine(port=fake.port, interfaces=LO, quiet_s=0.2))
+        found = []
+        items = svc.scan_masters(3000, on_found=found.append)
+    finally:
+        fake.close()
+    assert items == found and items[0]["MAC"] == "aa:bb:cc:00:00:00"
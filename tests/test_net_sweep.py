@@ -0,0 +1,86 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from iluflex_tools.core import net_discovery as nd
+from iluflex_tools.core import net_sweep as ns
+
+
+def _responder(ip, port, name, mac):
+    """Master falsa que responde à descoberta em ip:port."""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.bind((ip, port))
+    s.settimeout(0.1)
+    stop = threading.Event()
+
+    def run():
+        while not stop.is_set():
+            try:
+                _data, addr = s.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            s.sendto(f"Found:\n{name}\n{mac}\n{ip}\n255.255.255.248\n127.0.0.1\nDHCP\n".encode(), addr)
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+
+    def close():
+        stop.set()
+        t.join(1)
+        s.close()
+    return close
+
+
+def _free_udp_port():
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.bind(("127.0.0.2", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def test_parse_network_validates_and_limits_size():
+    assert str(ns.parse_network("192.168.1.10/24")) == "192.168.1.0/24"
+    assert str(ns.parse_network("10.0.0.0/255.255.255.0")) == "10.0.0.0/24"
+    assert str(ns.parse_network("10.0.5.7")) == "10.0.5.0/24"
+    with pytest.raises(ValueError, match="inválida"):
+        ns.parse_network("10.0.0.300/24")
+    with pytest.raises(ValueError, match="grande demais"):
+        ns.parse_network("10.0.0.0/16")
+
+
+def test_local_networks_use_the_interface_slash_24():
+    itfs = [nd.LocalInterface("10.1.2.3", 16), nd.LocalInterface("192.168.0.9", 28),
+            nd.LocalInterface("10.1.2.4", 16)]
+    assert [str(n) for n in ns.local_networks(itfs)] == ["10.1.2.0/24", "192.168.0.0/28"]
+
+
+def test_sweep_finds_udp_and_tcp_only_hosts_through_one_callback():
+    port = _free_udp_port()
+    closers = [_responder("127.0.0.2", port, "Master A", "AA:00:00:00:00:02"),
+               _responder("127.0.0.5", port, "Master B", "AA:00:00:00:00:05")]
+    tcp = socket.socket()
+    tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    tcp.bind(("127.0.0.3", 0))
+    tcp.listen(8)
+    try:
+        eng = nd.DiscoveryEngine(port=port, interfaces=[nd.LocalInterface("127.0.0.1", 8)],
+                                 retransmits=1, interval_s=0.05, quiet_s=0.3)
+        sw = ns.SubnetSweeper(eng, tcp_port=tcp.getsockname()[1], host_timeout_s=0.3)
+        assert sw.hosts("127.0.0.0/29") == [f"127.0.0.{i}" for i in range(2, 7)]  # sem o próprio IP
+        found = []
+        t0 = time.monotonic()
+        devs = sw.sweep("127.0.0.0/29", 3000, on_found=found.append)
+        elapsed = time.monotonic() - t0
+    finally:
+        for close in closers:
+            close()
+        tcp.close()
+    assert devs == found
+    assert sorted((d["NAME"], d["IP"]) for d in devs[:2]) == [("Master A", "127.0.0.2"), ("Master B", "127.0.0.5")]
+    assert devs[2] == {"NAME": "", "MAC": "", "IP": "127.0.0.3", "MASCARA": "", "GATEWAY": "", "DHCP": "", "FLAG": "tcp"}
+    assert len(devs) == 3 and elapsed < 2.0
@@ -0,0 +1,78 @@
+from iluflex_tools.core.protocols import make_default_registry
+from iluflex_tools.core.protocols.base import BaseParser
+from iluflex_tools.core.protocols.registry import ParserRegistry
+from iluflex_tools.core.protocols.types import DeviceStatusRRF10, DiscoveryFoundRaw, IPv4Snapshot
+
+LINES = [
+    "RRF,10,1,AA:BB:CC:DD:EE:01,-40,00:00:00:00:00:00,IC-315,1,20,2023-01-01,4,2,Sala",
+    "RRF,16,6,10.0.0.2,255.255.255.0,10.0.0.1,8.8.8.8,1.1.1.1,AA:BB:CC:DD:EE:FF,1,casa",
+    "RRF,16,9,10.0.0.3,255.255.255.0,10.0.0.1,8.8.8.8,1.1.1.1,AA:BB:CC:DD:EE:FF,0,casa",
+    "Found: IC-315 10.0.0.2",
+    "RRF,16,60,x",
+    "RRF,15,9,1",
+    "RRF,10,quebrado",
+]
+
+
+def _linear(registry, text):
+    """Despacho original: testa match() de cada parser em ordem."""
+    out = []
+    for raw in text.splitlines():
+        line = raw.strip()
+        for p in registry._parsers:
+            if line and p.match(line):
+                obj = p.parse(line)
+                if obj is not None:
+                    out.append(obj)
+                break
+    return out
+
+
+def test_prefix_dispatch_matches_linear_scan():
+    reg = make_default_registry()
+    text = "\r\n".join(LINES * 3)
+    got = reg.parse_lines(text)
+    assert got == _linear(make_default_registry(), text)
+    assert [type(o) for o in got[:4]] == [DeviceStatusRRF10, IPv4Snapshot, IPv4Snapshot, DiscoveryFoundRaw]
+    st = reg.stats()
+    assert st["RRF10Parser"]["hits"] == 6 and st["RRF10Parser"]["parsed"] == 3
+    assert st["RRF16_9Parser"]["parsed"] == 3 and st["RRF16_9Parser"]["time_s"] >= 0
+    assert reg.unmatched == 6  # RRF,16,60 e RRF,15,9
+
+
+class _Any(BaseParser):
+    """Sem prefixos: testado em toda linha, mas respeita a ordem de registro."""
+
+    def match(self, line):
+        return line.startswith("RRF,")
+
+    def parse(self, line):
+        return ("any", line)
+
+
+def test_parsers_without_prefix_keep_registration_order():
+    reg = ParserRegistry().register(_Any()).register(make_default_registry()._parsers[1])
+    assert reg.parse_line("RRF,10,1,x") == ("any", "RRF,10,1,x")
+    reg = make_default_registry().register(_Any())
+    assert isinstance(reg.parse_line(LINES[0]), DeviceStatusRRF10)
+    assert reg.parse_line("RRF,15,9,1") == ("any", "RRF,15,9,1")
+
+
+def test_parse_iter_handles_split_chunks():
+    data = ("\r".join(LINES) + "\r").encode()
+    chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+    reg = make_default_registry()
+    assert list(reg.parse_iter(chunks)) == make_default_registry().parse_lines("\n".join(LINES))
+    # última linha sem terminador é entregue no fim
+    assert list(reg.parse_iter(["Found: a", "bc"])) == [DiscoveryFoundRaw(raw="Found: abc")]
+
+
+def test_parse_iter_joins_multibyte_char_split_across_chunks():
+    data = "RRF,10,1,AA:BB:CC:DD:EE:01,-40,00:00:00:00:00:00,IC-315,1,20,2023-01-01,4,2,Cozinha ç\r".encode()
+    cut = data.index("ç".encode()) + 1          # corta no meio dos 2 bytes do "ç"
+    reg = make_default_registry()
+    streamed = list(reg.parse_iter([data[:cut], data[cut:]]))
+    assert streamed == make_default_registry().parse_lines(data.decode())
+    assert "�" not in repr(streamed)
+    # byte truncado no fim do fluxo vira U+FFFD (final=True), não some
+    assert list(ParserRegistry().register(_Any()).parse_iter([b"RRF,x\xc3"])) == [("any", "RRF,x\ufffd")]
@@ -0,0 +1,90 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from iluflex_tools.core.request_engine import RequestEngine
+from iluflex_tools.core.services import ConnectionService
+
+
+class _FakeMaster(threading.Thread):
+    """Responde cada SRF,a,b,x com RRF,a,b,x (na ordem); ignora SRF,99."""
+
+    def __init__(self, sock, delay=0.0):
+        super().__init__(daemon=True)
+        self.sock, self.delay = sock, delay
+        self.received = []
+
+    def run(self):
+        buf = b""
+        try:
+            while True:
+                data = self.sock.recv(4096)
+                if not data:
+                    return
+                buf += data
+                while b"\r" in buf:
+                    line, buf = buf.split(b"\r", 1)
+                    cmd = line.decode()
+                    self.received.append((time.monotonic(), cmd))
+                    if cmd.startswith("SRF,99"):
+                        continue
+                    time.sleep(self.delay)
+                    self.sock.sendall(("RRF" + cmd[3:] + "\r").encode())
+        except OSError:
+            pass
+
+
+@pytest.fixture
+def setup():
+    s1, s2 = socket.socketpair()
+    cs = ConnectionService()
+    cs._sock = s1
+    cs.connected = True
+    rx = threading.Thread(target=cs._recv_loop, daemon=True)
+    rx.start()
+    master = _FakeMaster(s2, delay=0.01)
+    master.start()
+    eng = RequestEngine(cs)
+    yield cs, eng, master, s2
+    eng.close()
+    cs._stop.set()
+    s2.close()
+
+
+def test_pipelined_requests_resolve_in_order(setup):
+    cs, eng, master, _s2 = setup
+    cmds = ["SRF,16,0,10.0.0.2", "SRF,16,1,10.0.0.1", "SRF,16,2,255.255.255.0", "SRF,16,5,1", "SRF,16,9"]
+    t0 = time.monotonic()
+    futs = eng.submit_many(cmds)
+    replies = [f.result(timeout=2) for f in futs]
+    assert replies == ["RRF" + c[3:] for c in cmds]
+    # todos saem antes da primeira resposta (sem espera fixa entre comandos)
+    assert master.received[-1][0] - t0 < 0.05 + 0.01 * len(cmds)
+    assert eng.pending() == 0 and eng.stats["replied"] == len(cmds)
+
+
+def test_same_subcommand_prefix_is_not_confused(setup):
+    _cs, eng, _m, _s2 = setup
+    f10 = eng.submit("SRF,16,10,x")
+    f1 = eng.submit("SRF,16,1,y")
+    assert f1.result(timeout=2) == "RRF,16,1,y"
+    assert f10.result(timeout=2) == "RRF,16,10,x"
+
+
+def test_timeout_and_custom_expect(setup):
+    _cs, eng, _m, _s2 = setup
+    lost = eng.submit("SRF,99,1", timeout=0.1)
+    with pytest.raises(TimeoutError):
+        lost.result(timeout=2)
+    assert eng.request("SRF,10,255", expect="RRF,10,", timeout=1) == "RRF,10,255"
+    assert eng.stats["timeouts"] == 1 and eng.pending() == 0
+
+
+def test_disconnect_fails_pending(setup):
+    cs, eng, _m, _s2 = setup
+    fut = eng.submit("SRF,99,2", timeout=5)
+    cs.disconnect()
+    with pytest.raises(ConnectionError):
+        fut.result(timeout=2)
@@ -0,0 +1,36 @@
+import pytest
+
+from iluflex_tools.core import services
+from iluflex_tools.core.protocols import make_default_registry
+from iluflex_tools.core.protocols.rrf10 import parse_rrf10_line, parse_rrf10_lines, parse_rrf10_records
+from iluflex_tools.core.protocols.types import DeviceStatusRRF10
+
+DUMP = "\r\n".join([
+    "RRF,10,0,AA:BB:CC:DD:EE:00,0,00:00:00:00:00:00,IC-315,2,150,20250814,0,0,Master",
+    "RRF,10,3, aabbccddee03 , -61 ,AA:BB:CC:DD:EE:00, IC-215 ,1,120,20240101,4,2, Sala , de estar ",
+    "RRF,10,4,AA:BB:CC:DD:EE:04,x,AA:BB:CC:DD:EE:00,IC-215,1,120,20240101,4,2,ruim",
+    "RRF,10,5,curta",
+    "RRF,16,9,10.0.0.2",
+])
+
+
+def test_records_are_slotted_and_parse_all_fields():
+    recs = parse_rrf10_records(DUMP)
+    assert [r.slave_id for r in recs] == [0, 3]
+    r = recs[1]
+    assert (r.mac, r.sinal_db, r.parent_mac, r.modelo, r.nome) == (
+        "aabbccddee03", -61, "AA:BB:CC:DD:EE:00", "IC-215", "Sala,de estar")
+    assert (r.versao_hw, r.versao_fw, r.data_producao, r.n_saidas, r.n_entradas) == (1, 120, "20240101", 4, 2)
+    assert not hasattr(r, "__dict__")
+    with pytest.raises(AttributeError):
+        r.extra = 1
+
+
+def test_single_parser_shared_by_services_registry_and_dict_helpers():
+    line = DUMP.splitlines()[0]
+    rec = parse_rrf10_line(line)
+    assert make_default_registry().parse_line(line) == rec
+    assert services.parse_rrf10_line(line) == rec.to_dict()
+    assert services.parse_rrf10_lines(DUMP) == parse_rrf10_lines(DUMP) == [r.to_dict() for r in parse_rrf10_records(DUMP)]
+    assert rec.to_dict()["raw"] == line and isinstance(rec, DeviceStatusRRF10)
+    assert parse_rrf10_line("") is None and parse_rrf10_line("RRF,10,5,curta") is None
@@ -0,0 +1,46 @@
+import json
+import os
+
+from iluflex_tools.core.app_state import AppStateManager
+from iluflex_tools.core.settings import SettingsStore
+
+
+def _store(tmp_path, debounce_s=60.0):
+    return SettingsStore(path=str(tmp_path / "settings.json"), debounce_s=debounce_s)
+
+
+def test_burst_of_changes_is_one_atomic_write(tmp_path):
+    store = _store(tmp_path)
+    state = AppStateManager(store=store)
+    state.set_ip_port("10.0.0.5", "5000")
+    state.set_many({"mac": "AA:BB", "theme": "dark", "connected": True})
+    assert not os.path.exists(store.path)   # write-behind: nada gravado ainda
+    assert store.dirty == {"last_ip", "last_port", "last_mac", "theme"}
+
+    assert store.flush() is True
+    assert store.flush() is False            # nada pendente
+    assert store.stats["writes"] == 1
+    data = json.loads(open(store.path, encoding="utf-8").read())
+    assert data["last_ip"] == "10.0.0.5" and data["last_port"] == 5000 and data["theme"] == "dark"
+    assert [p.name for p in tmp_path.iterdir()] == ["settings.json"]   # sem temporários
+
+    fresh = AppStateManager(store=_store(tmp_path))
+    fresh.sync_from_settings()
+    assert (fresh.data.ip, fresh.data.port, fresh.data.mac) == ("10.0.0.5", 5000, "AA:BB")
+
+
+def test_debounce_timer_flushes_in_background(tmp_path):
+    store = _store(tmp_path, debounce_s=0.05)
+    store.set("discovery_timeout_ms", 3000)
+    store._timer.join(2.0)
+    assert json.loads(open(store.path, encoding="utf-8").read())["discovery_timeout_ms"] == 3000
+
+
+def test_listeners_see_only_real_changes_and_state_follows(tmp_path):
+    store = _store(tmp_path)
+    state = AppStateManager(store=store)
+    seen = []
+    store.add_listener(lambda name, value: seen.append((name, value)))
+    store.update({"mesh_discovery_timeout_sec": "45", "theme": store.get().theme, "nope": 1})
+    assert seen == [("mesh_discovery_timeout_sec", 45)]
+    assert state.data.mesh_discovery_timeout_sec == 45   # Preferências -> STATE sem reler o arquivo
@@ -0,0 +1,99 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from iluflex_tools.core.protocols import IPv4Config, build_srf16_sequence, run_srf_sequence
+from iluflex_tools.core.protocols.rrf16 import is_error_reply
+
+
+class _FakeEngine:
+    """Responde cada submit após `delay` com RRF + eco; `replies` sobrescreve por comando."""
+
+    def __init__(self, delay=0.02, replies=None, drop=None):
+        self.delay = delay
+        self.replies = replies or {}
+        self.drop = dict(drop or {})  # cmd -> quantas vezes não responder
+        self.sent = []
+        self.inflight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def submit(self, cmd, timeout=None):
+        fut = Future()
+        with self._lock:
+            self.sent.append(cmd)
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+        if self.drop.get(cmd):
+            self.drop[cmd] -= 1
+            reply = None
+        else:
+            reply = self.replies.get(cmd, "RRF" + cmd[3:])
+
+        def finish():
+            with self._lock:
+                self.inflight -= 1
+            if reply is None:
+                fut.set_exception(TimeoutError(cmd))
+            else:
+                fut.set_result(reply)
+        threading.Timer(self.delay, finish).start()
+        return fut
+
+
+def _cmds():
+    cfg = IPv4Config(dhcp=False, ip="10.0.0.2", netmask="255.255.255.0", gateway="10.0.0.1",
+                     dns1="8.8.8.8", dns2="1.1.1.1", hostname="casa")
+    return build_srf16_sequence(cfg)
+
+
+def test_window_limits_inflight_and_verify_is_a_barrier():
+    eng = _FakeEngine()
+    seen = []
+    res = run_srf_sequence(eng, _cmds(), window=3, on_step=lambda i, s: seen.append(i))
+    assert res.ok and [s.reply for s in res.steps] == ["RRF" + c[3:] for c in _cmds()]
+    assert eng.peak == 3
+    assert sorted(seen) == list(range(len(res.steps)))
+    st = res.stats()
+    assert st["ok"] == st["total"] == 8 and st["retries"] == 0
+    # 7 comandos em janelas de 3 + barreira: bem menos que 8 round trips
+    assert res.elapsed_s < 8 * eng.delay
+
+
+def test_timeout_is_retried():
+    eng = _FakeEngine(drop={"SRF,16,7,casa": 1})
+    res = run_srf_sequence(eng, _cmds(), window=4, retries=1, timeout=0.02)
+    assert res.ok
+    step = next(s for s in res.steps if s.cmd == "SRF,16,7,casa")
+    assert step.attempts == 2 and res.stats()["retries"] >= 1
+    # o reenvio não pode ultrapassar os seguintes: a última cópia de cada
+    # comando chega à master na ordem da sequência
+    ultimo = {c: i for i, c in enumerate(eng.sent)}
+    assert [ultimo[c] for c in _cmds()] == sorted(ultimo[c] for c in _cmds())
+
+
+def test_timeout_after_retries_is_reported_without_abort():
+    alvo = _cmds()[3]
+    eng = _FakeEngine(drop={alvo: 2})
+    res = run_srf_sequence(eng, _cmds(), window=4, retries=1, timeout=0.02)
+    assert not res.aborted and not res.ok
+    assert [s.cmd for s in res.steps if not s.ok] == [alvo]
+    assert res.first_error.error == "timeout" and res.first_error.attempts == 2
+    assert eng.sent[-1] == "SRF,16,9" and res.steps[-1].ok
+
+
+def test_error_reply_aborts_but_dhcp_zero_ack_does_not():
+    assert is_error_reply("SRF,16,0,10.0.0.2", "RRF,16,0,0")
+    assert not is_error_reply("SRF,16,5,0", "RRF,16,5,0")
+    assert not is_error_reply("SRF,16,0,10.0.0.2", "RRF,16,0,10.0.0.2")
+
+    eng = _FakeEngine(replies={"SRF,16,1,10.0.0.1": "RRF,16,1,0"})
+    res = run_srf_sequence(eng, _cmds(), window=1)
+    assert res.aborted and not res.ok
+    assert res.first_error.cmd == "SRF,16,1,10.0.0.1" and res.first_error.error == "erro"
+    assert "SRF,16,9" not in eng.sent
+    assert [s.error for s in res.steps[2:]] == ["não enviado"] * 6
+    assert res.stats()["skipped"] == 6
+
+    dhcp = build_srf16_sequence(IPv4Config(dhcp=True))
+    assert run_srf_sequence(_FakeEngine(), dhcp).ok
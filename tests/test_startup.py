@@ -0,0 +1,46 @@
+import ast
+from pathlib import Path
+
+from iluflex_tools.core.startup_timer import StartupTimer
+
+ROOT = Path(__file__).resolve().parents[1] / "iluflex_tools"
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 100.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_marks_and_phases_report_per_phase_times():
+    clock = _Clock()
+    st = StartupTimer(clock)
+    clock.t += 0.120
+    assert round(st.mark("import customtkinter"), 3) == 0.120
+    clock.t += 0.500  # ocioso: não conta para a fase seguinte
+    with st.phase("página dashboard"):
+        clock.t += 0.030
+    clock.t += 0.010
+    st.mark("primeira tela")
+    assert [(n, round(dt, 3)) for n, dt in st.phases] == [
+        ("import customtkinter", 0.12), ("página dashboard", 0.03), ("primeira tela", 0.01)]
+    rep = st.report().splitlines()
+    assert rep[1].split()[-1] == "120.0" and rep[-1].split()[-1] == "660.0"
+
+
+def test_registered_page_factories_point_to_existing_classes():
+    """As páginas são importadas sob demanda: confere módulo/classe sem importar a UI."""
+    tree = ast.parse((ROOT / "main_app.py").read_text(encoding="utf-8"))
+    calls = [n for n in ast.walk(tree) if isinstance(n, ast.Call)
+             and getattr(n.func, "attr", "") == "_register_page"]
+    menu = next(n for n in tree.body if isinstance(n, ast.Assign) and n.targets[0].id == "MENU_ITEMS")
+    keys = set()
+    for call in calls:
+        key, module, cls = (a.value for a in call.args[:3])
+        keys.add(key)
+        src = ast.parse((ROOT / "ui" / "pages" / f"{module}.py").read_text(encoding="utf-8"))
+        assert cls in {n.name for n in src.body if isinstance(n, ast.ClassDef)}, (module, cls)
+    menu_keys = {elt.elts[1].value for elt in menu.value.elts}
+    assert len(calls) == 9 and menu_keys <= keys
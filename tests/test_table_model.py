@@ -0,0 +1,83 @@
+import importlib.util
+import random
+import sys
+import time
+from pathlib import Path
+
+
+def _load():
+    path = Path(__file__).resolve().parents[1] / "iluflex_tools" / "widgets" / "table_model.py"
+    spec = importlib.util.spec_from_file_location("_table_model", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+tm = _load()
+COLS = ["Slave ID", "Mac Address", "Nome"]
+
+
+def _rows(n, seed=0):
+    rng = random.Random(seed)
+    return [{"Slave ID": rng.randint(0, 127), "Mac Address": f"aa:{i:06x}", "Nome": f"Nó {rng.randint(0, 999)}"}
+            for i in range(n)]
+
+
+def test_sort_filter_and_window():
+    m = tm.VirtualRowModel(COLS)
+    rows = _rows(2000)
+    m.set_rows(rows, key_cols=("Mac Address",))
+    assert len(m) == 2000 and [m.row(i)[1] for i in m.window(0, 3)] == ["aa:000000", "aa:000001", "aa:000002"]
+
+    m.sort("Slave ID")
+    sids = [m.row(i)[0] for i in m.window(0, len(m))]
+    assert sids == sorted(r["Slave ID"] for r in rows)
+    m.sort("Nome", ascending=False)
+    nomes = [m.row(i)[2] for i in m.window(0, len(m))]
+    assert nomes == sorted((r["Nome"] for r in rows), key=str.lower, reverse=True)
+
+    m.set_filter("nó 7")
+    assert len(m) and all("Nó 7" in m.row(i)[2] for i in m.window(0, len(m)))
+    m.set_filter(None)
+    assert len(m) == 2000 and m.window(1990, 50) == m.window(1990, 10)
+
+
+def test_upsert_updates_cached_sort_keys():
+    m = tm.VirtualRowModel(COLS)
+    m.set_rows(_rows(100), key_cols=("Mac Address",))
+    m.sort("Slave ID")
+    m.upsert({"Slave ID": -5, "Mac Address": "aa:000050", "Nome": "x"})
+    m.upsert({"Slave ID": 999, "Mac Address": "novo", "Nome": "y"})
+    first, last = m.window(0, 1)[0], m.window(len(m) - 1, 1)[0]
+    assert m.key_of(first) == "aa:000050" and m.row(last)[1] == "novo"
+    assert m.total == 101 and m.view_pos("novo") == 100
+    m.set_value(m.index_of("novo"), "Slave ID", -10)
+    assert m.view_pos("novo") == 0          # visão reordenada sem novo sort()
+    m.set_filter("y")
+    m.set_value(m.index_of("novo"), "Nome", "z")
+    assert m.view_pos("novo") is None       # saiu do filtro
+
+
+def test_upsert_many_rebuilds_view_once():
+    m = tm.VirtualRowModel(COLS)
+    m.set_rows(_rows(100), key_cols=("Mac Address",))
+    m.sort("Slave ID")
+    calls = []
+    rebuild = m._rebuild_view
+    m._rebuild_view = lambda: (calls.append(1), rebuild())
+    novas = [{"Slave ID": -i, "Mac Address": f"n{i}", "Nome": ""} for i in range(1, 50)]
+    assert m.upsert_many(novas + _rows(100), key_cols=("Mac Address",)) == 49
+    assert calls == [1] and m.total == 149
+    assert m.key_of(m.window(0, 1)[0]) == "n49"
+    assert m.upsert_many(_rows(100)) == 0 and calls == [1]
+
+
+def test_sorting_10k_rows_is_fast():
+    m = tm.VirtualRowModel(COLS)
+    m.set_rows(_rows(10_000), key_cols=("Mac Address",))
+    m.sort("Nome")  # aquece o cache de chaves
+    t0 = time.perf_counter()
+    for asc in (True, False, True, False):
+        m.sort("Nome", asc)
+    assert (time.perf_counter() - t0) / 4 < 0.05
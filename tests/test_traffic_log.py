@@ -0,0 +1,85 @@
+from iluflex_tools.core.traffic_log import (
+    DIR_RX, DIR_TX, TrafficLog, command_keys, parse_capture_line, traffic_log_for,
+)
+
+
+class _FakeConn:
+    def __init__(self):
+        self.listeners = []
+
+    def add_listener(self, cb):
+        self.listeners.append(cb)
+
+    def remove_listener(self, cb):
+        self.listeners.remove(cb)
+
+    def emit(self, ev):
+        for cb in list(self.listeners):
+            cb(ev)
+
+
+def test_command_keys():
+    assert command_keys(b"RRF,15,9,30\r") == ["RRF", "RRF,15", "RRF,15,9"]
+    assert command_keys(b"RIR,LEARNER,ON\r\nsir,2,...") == ["RIR", "RIR,LEARNER", "RIR,LEARNER,ON"]
+    assert command_keys(b"\xa5\x01") == ["\xa5\x01"]
+    assert command_keys(b"") == []
+
+
+def test_ring_buffer_keeps_last_capacity_records():
+    log = TrafficLog(capacity=4)
+    for i in range(10):
+        log.append(DIR_RX, f"RRF,10,{i}\r".encode())
+    assert len(log) == 4 and log.last_seq == 9
+    assert [r.seq for r in log.records()] == [6, 7, 8, 9]
+    assert [r.text for r in log.records(since=7)] == ["RRF,10,8\r", "RRF,10,9\r"]
+    assert [r.seq for r in log.tail(2)] == [8, 9]
+    log.clear()
+    assert len(log) == 0 and log.records(since=-1) == [] and log.last_seq == 9
+
+
+def test_find_uses_field_boundaries_and_direction():
+    log = TrafficLog(capacity=100)
+    log.append(DIR_TX, b"SRF,15,9,30\r")
+    log.append(DIR_RX, b"RRF,15,9,30\r")
+    log.append(DIR_RX, b"RRF,150,1\r")
+    log.append(DIR_RX, b"RRF,15,1,120\r")
+    log.append(DIR_RX, b"RRF,15,9,300\r")
+    assert [r.seq for r in log.find("RRF,15,*")] == [1, 3, 4]
+    assert [r.seq for r in log.find("RRF,15")] == [1, 3, 4]
+    assert [r.seq for r in log.find("RRF,15,9,30")] == [1]       # sem índice: varredura
+    assert [r.seq for r in log.find("*RF", direction=DIR_TX)] == []
+    assert [r.seq for r in log.find("SRF", direction=DIR_TX)] == [0]
+    assert [r.seq for r in log.find("RRF,15,*", since=1, limit=1)] == [4]
+    assert "RRF,150" in log.keys()
+
+
+def test_index_forgets_evicted_records():
+    log = TrafficLog(capacity=3)
+    log.append(DIR_RX, b"RRF,16,1\r")
+    for i in range(6):
+        log.append(DIR_RX, b"RRF,10,1\r")
+    assert log.find("RRF,16") == []
+    assert "RRF,16" not in log._index and "RRF,16" not in log.keys()
+
+
+def test_attached_to_connection_and_capture_rotates(tmp_path):
+    conn = _FakeConn()
+    log = traffic_log_for(conn, capacity=10)
+    assert traffic_log_for(conn) is log
+    path = str(tmp_path / "cap.log")
+    log.enable_capture(path, max_bytes=1024, backups=2)
+    payload = b"RRF,10," + b"x" * 200 + b"\r\n\x00"
+    for _ in range(20):
+        conn.emit({"type": "rx", "text": "...", "raw": payload})
+    conn.emit({"type": "connect"})
+    conn.emit({"type": "tx", "text": "SRF,10,255\r"})
+    log.disable_capture()
+
+    assert [r.direction for r in log.records()][-2:] == [DIR_RX, DIR_TX]
+    assert log.records()[-1].raw == b"SRF,10,255\r"
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert files == ["cap.log", "cap.log.1", "cap.log.2"]
+    last = open(path, encoding="ascii").read().splitlines()
+    ts, direction, raw = parse_capture_line(last[-1])
+    assert direction == DIR_TX and raw == b"SRF,10,255\r"
+    assert parse_capture_line(last[-2])[2] == payload
@@ -0,0 +1,100 @@
+import importlib.util
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+
+def _load():
+    path = Path(__file__).resolve().parents[1] / "iluflex_tools" / "widgets" / "waveform_lod.py"
+    spec = importlib.util.spec_from_file_location("_waveform_lod", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+lod = _load()
+HIGH, LOW = 12, 32
+
+
+def _capture(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice((350, 1050, 560, 1690)) for _ in range(n)] + [40000]
+
+
+def test_full_resolution_matches_square_wave():
+    pts = lod.track_points([100, 200, 300, 400], 0.1, HIGH, LOW)
+    assert pts == [10, LOW, 10, HIGH, 20, HIGH, 20, LOW, 40, LOW, 40, HIGH,
+                   70, HIGH, 70, LOW, 110, LOW]
+
+
+def test_sub_pixel_pulses_collapse_to_min_max_envelope():
+    pulses = [3] * 20000
+    pts = lod.track_points(pulses, 0.01, HIGH, LOW)
+    xs = pts[0::2]
+    width = sum(pulses) * 0.01
+    assert len(xs) <= 3 * (width + 2)
+    assert xs == sorted(xs)
+    # cada coluna com transições cobre os dois níveis
+    cols = {}
+    for x, y in zip(xs, pts[1::2]):
+        cols.setdefault(x, set()).add(y)
+    assert all(v == {HIGH, LOW} for v in list(cols.values())[:-1])
+
+
+def test_culling_keeps_only_visible_window_with_correct_levels():
+    pulses = [100, 200, 300, 400]
+    pts = lod.track_points(pulses, 0.1, HIGH, LOW, x_min=25, x_max=60)
+    assert pts == [25.0, LOW, 40, LOW, 40, HIGH, 60.0, HIGH]
+    # janela inteira dentro de um nível
+    assert lod.track_points(pulses, 0.1, HIGH, LOW, x_min=45, x_max=60) == [45.0, HIGH, 60.0, HIGH]
+    assert lod.track_points([], 0.1, HIGH, LOW) == []
+
+
+def test_largest_capture_is_bounded_per_pixel_column():
+    # o custo de desenho segue o número de pontos: no máximo 3 por coluna
+    # (tempo por quadro: python -m benchmarks.bench_waveform)
+    for seed in range(3):
+        pulses = _capture(900, seed)
+        for scale in (0.005, 0.05, 0.5):
+            pts = lod.track_points(pulses, scale, HIGH, LOW, x_min=0, x_max=3000)
+            por_coluna = Counter(pts[0:-2:2])
+            assert len(pts) // 2 <= 3 * 3002
+            assert max(por_coluna.values()) <= 3
+
+
+def test_wave_track_bisect_matches_linear_scan():
+    pulses = _capture(5000, seed=7)
+    track = lod.WaveTrack(pulses, source="sir,2,...")
+    assert track.total == sum(pulses) and len(track) == len(pulses)
+    for x_min, x_max in ((0, 500), (12345.6, 14000), (track.total * 0.05 - 50, track.total * 0.05 + 200)):
+        assert track.points(0.05, HIGH, LOW, x_min=x_min, x_max=x_max) == \
+            lod.track_points(pulses, 0.05, HIGH, LOW, x_min=x_min, x_max=x_max)
+    i0, i1 = track.visible_range(0.05, 12345.6, 14000)
+    xs = [10 + s * 0.05 for s in track.starts]
+    assert xs[i0] <= 12345.6 < xs[i0 + 1] and xs[i1 - 1] <= 14000 < xs[i1]
+    assert track.visible_range(0.05, 0, 5) == (0, 0)
+
+
+class _CountingStarts(list):
+    reads = 0
+
+    def __getitem__(self, i):
+        _CountingStarts.reads += 1
+        return list.__getitem__(self, i)
+
+
+def test_narrow_window_does_not_depend_on_capture_length():
+    longa = [350, 1050] * 200000
+    curta = longa[:80]
+    assert lod.WaveTrack(curta).points(0.05, HIGH, LOW, x_min=100, x_max=1300) == \
+        lod.WaveTrack(longa).points(0.05, HIGH, LOW, x_min=100, x_max=1300)
+
+    # no meio da captura: busca binária + só os pulsos visíveis são lidos
+    starts = _CountingStarts(lod.cumulative(longa))
+    mid = starts[-1] * 0.05 / 2
+    _CountingStarts.reads = 0
+    pts = lod.track_points(longa, 0.05, HIGH, LOW, x_min=mid, x_max=mid + 1200, starts=starts)
+    assert pts[0] == mid and pts[-2] == mid + 1200
+    assert _CountingStarts.reads <= len(pts) // 2 + 2 * len(longa).bit_length()